@@ -1,6 +1,14 @@
 import random
 from typing import Any, Dict, List, Optional
 
+import belief
+import engine
+import inference
+import search
+
+# Below this public chance of a draw with at most one liberal, enacting a fascist policy looks suspicious.
+POOR_COVER = 0.35
+
 
 def choose_chancellor(game_state: Dict[str, Any], role: str, known_fascists: List[str]) -> Optional[str]:
     """AI chooses a chancellor nominee from eligible candidates."""
@@ -26,7 +34,11 @@ def choose_chancellor(game_state: Dict[str, Any], role: str, known_fascists: Lis
         eligible.sort(key=lambda pid: suspicion.get(pid, 0))
         return eligible[0]
 
-    # Liberal: pick least suspicious player
+    # Liberal: pick least suspicious player, steering clear of a likely Hitler once that would lose
+    hitler_odds = game_state.get("hitler_odds")
+    if hitler_odds and fascist_policies >= 3:
+        eligible.sort(key=lambda pid: suspicion.get(pid, 0) + 2 * hitler_odds.get(pid, 0))
+        return eligible[0]
     eligible.sort(key=lambda pid: suspicion.get(pid, 0))
     return eligible[0]
 
@@ -59,6 +71,17 @@ def vote_government(game_state: Dict[str, Any], role: str, known_fascists: List[
     nominee_sus = suspicion.get(nominee_id, 0)
     president_sus = suspicion.get(president_id, 0)
 
+    hitler_odds = game_state.get("hitler_odds")
+    if hitler_odds:
+        # suspicion is a posterior probability of being on the fascist team
+        if game_state.get("fascist_policies", 0) >= 3 and hitler_odds.get(nominee_id, 0) > 0.25:
+            return False
+        if nominee_sus > 0.6 and president_sus > 0.5:
+            return False
+        if nominee_sus > 0.7:
+            return False
+        return random.random() < 0.8
+
     # If both are suspicious, vote no
     if nominee_sus > 1 and president_sus > 1:
         return False
@@ -69,14 +92,21 @@ def vote_government(game_state: Dict[str, Any], role: str, known_fascists: List[
     return random.random() < 0.8
 
 
-def choose_president_discard(policies: List[str], role: str) -> int:
-    """AI president chooses which policy to discard (0, 1, or 2)."""
+def choose_president_discard(policies: List[str], role: str, deck: Optional[Dict[str, float]] = None) -> int:
+    """AI president chooses which policy to discard (0, 1, or 2).
+
+    ``deck`` is the public deck belief (``belief.summary``), used to judge how suspicious a fascist hand looks.
+    """
     if role in ("fascist", "hitler"):
         # Fascist: discard liberal policies, but sometimes "accidentally" discard fascist
         # to build trust
         liberal_indices = [i for i, p in enumerate(policies) if p == "liberal"]
         fascist_indices = [i for i, p in enumerate(policies) if p == "fascist"]
 
+        # The table expects liberals from this deck; passing one keeps cover
+        if deck and deck["p_mostly_fascist"] < POOR_COVER and liberal_indices and fascist_indices:
+            if random.random() < 0.5:
+                return random.choice(fascist_indices)
         if liberal_indices:
             # Hitler is more cautious — sometimes passes liberal to avoid suspicion
             if role == "hitler" and len(liberal_indices) >= 2 and random.random() < 0.3:
@@ -92,12 +122,18 @@ def choose_president_discard(policies: List[str], role: str) -> int:
         return random.randrange(len(policies))
 
 
-def choose_chancellor_enact(policies: List[str], role: str) -> int:
-    """AI chancellor chooses which policy to enact (0 or 1)."""
+def choose_chancellor_enact(policies: List[str], role: str, deck: Optional[Dict[str, float]] = None) -> int:
+    """AI chancellor chooses which policy to enact (0 or 1).
+
+    ``deck`` is the public deck belief, as for ``choose_president_discard``.
+    """
     if role in ("fascist", "hitler"):
         fascist_indices = [i for i, p in enumerate(policies) if p == "fascist"]
-        # Hitler is more cautious early on
-        if role == "hitler" and random.random() < 0.25:
+        # Hitler is more cautious early on, and everyone is when a fascist policy would stand out
+        caution = 0.25 if role == "hitler" else 0.0
+        if deck and deck["p_mostly_fascist"] < POOR_COVER:
+            caution = max(caution, 0.5)
+        if random.random() < caution:
             liberal_indices = [i for i, p in enumerate(policies) if p == "liberal"]
             if liberal_indices:
                 return liberal_indices[0]
@@ -111,19 +147,27 @@ def choose_chancellor_enact(policies: List[str], role: str) -> int:
         return random.randrange(len(policies))
 
 
-def request_veto(policies: List[str], role: str) -> bool:
-    """AI chancellor decides whether to request a veto."""
+def request_veto(policies: List[str], role: str, deck: Optional[Dict[str, float]] = None) -> bool:
+    """AI chancellor decides whether to request a veto.
+
+    ``deck`` is this player's own deck belief; a liberal only burns an election
+    on a veto when the next draw is likely to hold a liberal policy.
+    """
     if role in ("fascist", "hitler"):
         # Veto if all policies are liberal (don't want to enact them)
         return all(p == "liberal" for p in policies)
     # Liberal: veto if all fascist
+    if deck and deck["p_liberal"] < 0.5:
+        return False
     return all(p == "fascist" for p in policies)
 
 
-def approve_veto(policies: List[str], role: str) -> bool:
-    """AI president decides whether to approve a veto request."""
+def approve_veto(policies: List[str], role: str, deck: Optional[Dict[str, float]] = None) -> bool:
+    """AI president decides whether to approve a veto request (``deck`` as for ``request_veto``)."""
     if role in ("fascist", "hitler"):
         return all(p == "liberal" for p in policies)
+    if deck and deck["p_liberal"] < 0.5:
+        return False
     return all(p == "fascist" for p in policies)
 
 
@@ -168,8 +212,9 @@ def choose_execution_target(game_state: Dict[str, Any], role: str, known_fascist
             return safe[0]
         return random.choice(candidates)
 
-    # Liberal: execute most suspicious player
-    candidates.sort(key=lambda pid: suspicion.get(pid, 0), reverse=True)
+    # Liberal: execute most suspicious player, Hitler above all
+    hitler_odds = game_state.get("hitler_odds") or {}
+    candidates.sort(key=lambda pid: suspicion.get(pid, 0) + hitler_odds.get(pid, 0), reverse=True)
     return candidates[0]
 
 
@@ -207,3 +252,171 @@ def choose_special_election_target(game_state: Dict[str, Any], role: str, known_
     # Liberal: pick a trusted player
     candidates.sort(key=lambda pid: suspicion.get(pid, 0))
     return candidates[0]
+
+
+def choose_action(game: Dict[str, Any], pid: str, use_inference: bool = True) -> Optional[Dict[str, Any]]:
+    """AI picks an engine action for whatever the game is waiting on it to do."""
+    prompt = engine.pending_action(game, pid)
+    if not prompt:
+        return None
+    role = game["roles"][pid]
+    known_fascists = engine.known_fascists_for(game, pid)
+    kind = prompt["type"]
+    action: Dict[str, Any] = {"type": kind, "player_id": pid}
+
+    # Posterior role odds replace the scalar suspicion counter when inference is available.
+    suspicion = game.get("suspicion", {})
+    hitler_odds = None
+    if use_inference and kind in ("nominate", "vote", "executive"):
+        odds = inference.role_odds(game, pid, known_fascists)
+        if odds:
+            suspicion, hitler_odds = odds
+
+    if kind == "nominate":
+        state = {
+            "eligible_chancellors": prompt["eligible"],
+            "fascist_policies": game.get("fascist_policies", 0),
+            "suspicion": suspicion,
+            "hitler_odds": hitler_odds,
+            "hitler_id": engine.hitler_id(game),
+        }
+        nominee = choose_chancellor(state, role, known_fascists)
+        if not nominee:
+            return None
+        action["chancellor_id"] = nominee
+    elif kind == "vote":
+        state = {
+            "nominee_id": game.get("nominee_id"),
+            "president_id": game.get("president_id"),
+            "fascist_policies": game.get("fascist_policies", 0),
+            "suspicion": suspicion,
+            "hitler_odds": hitler_odds,
+            "hitler_id": engine.hitler_id(game),
+        }
+        action["vote"] = bool(vote_government(state, role, known_fascists))
+    elif kind == "president_discard":
+        action["discard_index"] = choose_president_discard(prompt["policies"], role, belief.summary(game))
+    elif kind == "chancellor_enact":
+        policies = prompt["policies"]
+        if (prompt["veto_available"] and prompt["veto_allowed"]
+                and request_veto(policies, role, belief.summary(game, pid))):
+            action["veto"] = True
+        else:
+            action["enact_index"] = choose_chancellor_enact(policies, role, belief.summary(game))
+    elif kind == "veto_decision":
+        pending = list(game.get("pending_policies", []))
+        action["approve"] = approve_veto(pending, role, belief.summary(game, pid))
+    elif kind == "executive":
+        state = {
+            "alive_ids": engine.alive_ids(game),
+            "president_id": game.get("president_id"),
+            "suspicion": suspicion,
+            "hitler_odds": hitler_odds,
+            "hitler_id": engine.hitler_id(game),
+        }
+        power = prompt["power"]
+        target_id = None
+        if power == "investigate":
+            state["investigated"] = list(game.get("investigated", set()))
+            target_id = choose_investigation_target(state, role, known_fascists)
+        elif power == "special_election":
+            target_id = choose_special_election_target(state, role, known_fascists)
+        elif power == "execution":
+            target_id = choose_execution_target(state, role, known_fascists)
+        action["target_id"] = target_id
+    return action
+
+
+def heuristic_action(game: Dict[str, Any], pid: str) -> Optional[Dict[str, Any]]:
+    """The standard AI judging players by the scalar suspicion counter alone, without role inference."""
+    return choose_action(game, pid, use_inference=False)
+
+
+def random_action(game: Dict[str, Any], pid: str) -> Optional[Dict[str, Any]]:
+    """A uniformly random legal move: the floor any strategy should beat."""
+    actions = engine.legal_actions(game, pid)
+    return random.choice(actions) if actions else None
+
+
+def search_action(game: Dict[str, Any], pid: str, budget: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Information-set MCTS for ``budget`` seconds (default ``search.BUDGET``), playing worlds out
+    with ``heuristic_action``."""
+    return search.best_action(game, pid, budget, rollout=heuristic_action)
+
+
+# What an AI seat plays, by Player.strategy; seats without one play DEFAULT_STRATEGY.
+STRATEGIES = {
+    "standard": choose_action,
+    "heuristic": heuristic_action,
+    "random": random_action,
+    "ismcts": search_action,
+}
+DEFAULT_STRATEGY = "standard"
+# Strategies that think for a wall-clock budget; the server plans them off the game lock (plan_turn).
+# Not offered on the host form: benchmarks/ismcts.py has ismcts level with "standard", not stronger.
+SEARCH_STRATEGIES = {"ismcts": search_action}
+
+
+# The kind of decision an AI seat makes in each phase, as ai_decision_seconds labels it.
+DECISION_KINDS = {
+    "nominate": "nominate",
+    "vote": "vote",
+    "legislative_president": "legislate",
+    "legislative_chancellor": "legislate",
+    "veto_pending": "legislate",
+    "executive_action": "executive",
+}
+
+
+def decision_kind(game: Dict[str, Any], pid: str) -> str:
+    return DECISION_KINDS.get(game.get("phase"), "other")
+
+
+def strategy_action(game: Dict[str, Any], pid: str) -> Optional[Dict[str, Any]]:
+    return STRATEGIES[game["players"][pid].get("strategy") or DEFAULT_STRATEGY](game, pid)
+
+
+def searching_seats(game: Dict[str, Any]) -> List[str]:
+    """AI seats the game is waiting on that play one of SEARCH_STRATEGIES."""
+    return [
+        pid for pid in engine.waiting_on(game)
+        if engine.is_ai_player(game, pid) and game["players"][pid].get("strategy") in SEARCH_STRATEGIES
+    ]
+
+
+def plan_turn(game: Dict[str, Any], budget: float) -> Dict[str, Any]:
+    """Moves for the searching seats ``take_turn`` would play next, sharing ``budget`` seconds between them.
+
+    ``game`` is normally a ``search.snapshot`` of the room; pass the result to ``take_turn(planned=...)``.
+    """
+    seats = searching_seats(game)
+    if game.get("phase") != "vote":
+        seats = seats[:1]
+    planned = {}
+    for pid in seats:
+        strategy = SEARCH_STRATEGIES[game["players"][pid].get("strategy")]
+        planned[pid] = strategy(game, pid, budget / len(seats))
+    return planned
+
+
+def take_turn(game: Dict[str, Any], planned: Optional[Dict[str, Any]] = None) -> bool:
+    """Play every AI move the game is currently waiting on (all AI ballots in one go).
+
+    With ``planned`` (see ``plan_turn``), searching seats play the move planned for them, or
+    nothing if there is none, instead of searching here. Returns whether anything changed.
+    """
+    progressed = False
+    for pid in engine.waiting_on(game):
+        if not engine.is_ai_player(game, pid):
+            continue
+        if planned is not None and game["players"][pid].get("strategy") in SEARCH_STRATEGIES:
+            action = planned.get(pid)
+        else:
+            action = strategy_action(game, pid)
+        if action is None:
+            continue
+        engine.apply(game, action)
+        progressed = True
+        if game.get("phase") != "vote":
+            break
+    return progressed
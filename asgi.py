@@ -0,0 +1,397 @@
+"""Async (ASGI) serving mode: /events streams as coroutines instead of threads.
+
+Under the threaded server every open /events (or /spectate/events) stream
+holds an OS thread blocked in wait_for_change. Here a stream is a coroutine
+awaiting a future that locked_game resolves (through main.VERSION_LISTENERS) when its
+room changes, so an idle seat costs a socket and a few kilobytes. Frames come
+from main's EventStream classes (seats and spectators alike), and every other
+route is the Flask app itself run on a small thread pool, so game logic,
+sessions and templates are shared with the threaded server.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+    python asgi.py        # uvicorn when installed, otherwise the built-in server (127.0.0.1 unless HOST is set)
+
+The built-in server speaks just enough HTTP/1.1 for this app (keep-alive,
+Content-Length request bodies, chunked streaming responses). It is meant for
+LAN games and benchmarks/idle_connections.py, not for facing the internet.
+"""
+import asyncio
+import functools
+import io
+import os
+import re
+import sys
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import main
+
+# Threads running Flask views and building event frames; streams never hold one while idle.
+ASGI_THREADS = int(os.getenv("ASGI_THREADS", "32"))
+# Largest request body the built-in server reads; the app's forms and JSON bodies are far smaller.
+MAX_BODY = 64 * 1024
+# Streams served as coroutines, with the main.py function opening each.
+EVENTS_PATH = re.compile(r"/api/game/([^/]+)/(events|spectate/events)$")
+OPENERS = {"events": main.open_events, "spectate/events": main.open_spectate}
+EVENT_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+POOL = ThreadPoolExecutor(ASGI_THREADS, thread_name_prefix="asgi-view")
+
+
+class VersionWaiters:
+    """Futures per room, resolved on the event loop from whichever thread changed the room."""
+
+    def __init__(self):
+        self.loop = None
+        self._futures: dict = {}
+        self._lock = threading.Lock()
+
+    def bind(self, loop) -> None:
+        self.loop = loop
+        main.VERSION_LISTENERS.append(self.changed)
+
+    def subscribe(self, code: str) -> asyncio.Future:
+        future = self.loop.create_future()
+        with self._lock:
+            self._futures.setdefault(code, set()).add(future)
+        return future
+
+    def unsubscribe(self, code: str, future: asyncio.Future) -> None:
+        with self._lock:
+            futures = self._futures.get(code)
+            if futures is not None:
+                futures.discard(future)
+                if not futures:
+                    del self._futures[code]
+
+    def changed(self, code: str) -> None:
+        with self._lock:
+            futures = self._futures.pop(code, None)
+        if futures:
+            self.loop.call_soon_threadsafe(_resolve, futures)
+
+    def waiting(self) -> int:
+        with self._lock:
+            return sum(len(futures) for futures in self._futures.values())
+
+
+def _resolve(futures) -> None:
+    for future in futures:
+        if not future.done():
+            future.set_result(None)
+
+
+WAITERS = VersionWaiters()
+
+
+def run(fn, *args):
+    return asyncio.get_running_loop().run_in_executor(POOL, functools.partial(fn, *args))
+
+
+def startup() -> None:
+    WAITERS.bind(asyncio.get_running_loop())
+    main.start_background_workers()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    if WAITERS.loop is None:
+        startup()
+    match = EVENTS_PATH.match(scope["path"])
+    if match and scope["method"] == "GET":
+        await events(scope, receive, send, OPENERS[match.group(2)], match.group(1))
+    else:
+        await call_flask(scope, receive, send)
+
+
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            if WAITERS.loop is None:
+                startup()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def wsgi_environ(scope, body: bytes) -> dict:
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", ()):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+            continue
+        key = "HTTP_" + name
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def call_wsgi(environ: dict) -> tuple:
+    started = []
+
+    def start_response(status, headers, exc_info=None):
+        started[:] = [int(status.split(" ", 1)[0]), headers]
+
+    result = main.app(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    status, headers = started
+    return status, [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers], body
+
+
+async def call_flask(scope, receive, send) -> None:
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    status, headers, body = await run(call_wsgi, wsgi_environ(scope, body))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def open_stream(environ: dict, opener, code: str):
+    """``opener`` inside a request context; an error comes back as (status, headers, body)."""
+    with main.app.request_context(environ):
+        opened = opener(code)
+        if isinstance(opened, main.EventStream):
+            return opened
+        response = main.app.make_response(opened)
+        return response.status_code, [
+            (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in response.headers.items()
+        ], response.get_data()
+
+
+async def disconnected(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def events(scope, receive, send, opener, code: str) -> None:
+    stream = await run(open_stream, wsgi_environ(scope, b""), opener, code)
+    if not isinstance(stream, main.EventStream):
+        status, headers, body = stream
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+        return
+
+    loop = asyncio.get_running_loop()
+    # Other workers can't resolve our futures, so with a shared store look again every so often.
+    poll = main.STORE_POLL_INTERVAL if main.STORE.shared else main.EVENT_KEEPALIVE_SECONDS
+    await send({"type": "http.response.start", "status": 200, "headers": EVENT_HEADERS})
+    gone = asyncio.ensure_future(disconnected(receive))
+    quiet_since = loop.time()
+    try:
+        while not gone.done():
+            # Subscribe before reading the version, so a change in between still wakes us.
+            future = WAITERS.subscribe(code)
+            try:
+                frame = await run(stream.next)
+                if frame is not None:
+                    await send({"type": "http.response.body", "body": frame.encode(), "more_body": True})
+                    quiet_since = loop.time()
+                if frame is main.EVENT_GONE:
+                    break
+                await asyncio.wait((future, gone), timeout=poll, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                WAITERS.unsubscribe(code, future)
+            if not future.done() and loop.time() - quiet_since >= main.EVENT_KEEPALIVE_SECONDS:
+                await send({"type": "http.response.body", "body": b": keep-alive\n\n", "more_body": True})
+                quiet_since = loop.time()
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        gone.cancel()
+
+
+class _Response:
+    """Writes one ASGI response to the socket: Content-Length when the body comes in one piece, else chunked."""
+
+    def __init__(self, writer, keep_alive: bool):
+        self.writer = writer
+        self.keep_alive = keep_alive
+        self.start = None
+        self.written = False
+        self.chunked = False
+        self.done = False
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        out = []
+        if not self.written:
+            out.append(self._head(len(body), more))
+            self.written = True
+        if self.chunked:
+            if body:
+                out.append(b"%x\r\n%s\r\n" % (len(body), body))
+            if not more:
+                out.append(b"0\r\n\r\n")
+        else:
+            out.append(body)
+        self.writer.write(b"".join(out))
+        self.done = not more
+        await self.writer.drain()
+
+    def _head(self, length: int, more: bool) -> bytes:
+        status = self.start["status"]
+        headers = list(self.start.get("headers", ()))
+        if not any(name.lower() == b"content-length" for name, _ in headers):
+            if more:
+                self.chunked = True
+                headers.append((b"transfer-encoding", b"chunked"))
+            else:
+                headers.append((b"content-length", str(length).encode()))
+        if not self.keep_alive:
+            headers.append((b"connection", b"close"))
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ""
+        lines = [f"HTTP/1.1 {status} {reason}".encode("latin-1")]
+        lines.extend(name + b": " + value for name, value in headers)
+        return b"\r\n".join(lines) + b"\r\n\r\n"
+
+    async def finish(self) -> None:
+        if self.done:
+            return
+        if not self.written:
+            self.start = {"status": 500, "headers": [(b"content-type", b"text/plain")]}
+            await self.send({"type": "http.response.body", "body": b"Internal Server Error"})
+        # A half-sent response leaves the connection unusable.
+        self.keep_alive = False
+
+
+def _receiver(reader, body: bytes):
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        # Nothing else is read until the response is over, so data here is only EOF.
+        while await reader.read(4096):
+            pass
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def _reject(writer, status: int) -> None:
+    """Answer a request that will not be read with ``status``; the connection closes after it."""
+    response = _Response(writer, False)
+    response.start = {"status": status, "headers": [(b"content-type", b"text/plain")]}
+    await response.send({"type": "http.response.body", "body": HTTPStatus(status).phrase.encode()})
+
+
+async def _serve_connection(reader, writer) -> None:
+    client = writer.get_extra_info("peername")
+    server = writer.get_extra_info("sockname")
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+                method, target, version = head[:head.index(b"\r\n")].decode("latin-1").split(" ", 2)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                return
+            headers = []
+            for line in head.split(b"\r\n")[1:]:
+                name, sep, value = line.partition(b":")
+                if sep:
+                    headers.append((name.strip().lower(), value.strip()))
+            fields = dict(headers)
+            length = fields.get(b"content-length", b"0")
+            if not length.isdigit() or int(length) > MAX_BODY:
+                await _reject(writer, 400 if not length.isdigit() else 413)
+                return
+            body = await reader.readexactly(int(length))
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": version[5:],
+                "method": method,
+                "scheme": "http",
+                "path": urllib.parse.unquote(path),
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "root_path": "",
+                "headers": headers,
+                "client": client[:2] if client else None,
+                "server": server[:2] if server else None,
+            }
+            keep_alive = version == "HTTP/1.1" and fields.get(b"connection", b"").lower() != b"close"
+            response = _Response(writer, keep_alive)
+            await application(scope, _receiver(reader, body), response.send)
+            await response.finish()
+            if not response.keep_alive:
+                return
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve(host: str, port: int) -> None:
+    """Run the built-in asyncio server until interrupted."""
+    async def run_server():
+        server = await asyncio.start_server(_serve_connection, host, port, backlog=1024)
+        print(f" * ASGI (built-in server) on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run_server())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    HOST = os.getenv("HOST")
+    PORT = int(os.getenv("PORT", "5000"))
+    try:
+        import uvicorn
+    except ImportError:
+        # The built-in server is for trusted networks: it only listens beyond this machine when HOST says so.
+        serve(HOST or "127.0.0.1", PORT)
+    else:
+        uvicorn.run(application, host=HOST or "0.0.0.0", port=PORT, log_level="warning")
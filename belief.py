@@ -0,0 +1,123 @@
+"""Per-player belief about the policy deck.
+
+Everyone sees how many cards are in the deck and discard and which policies were
+enacted. On top of that each player remembers what they personally saw go into the
+discard pile and, after a Policy Peek, the top of the deck. The engine keeps that
+memory current through the ``note_*`` hooks below (plain dicts on the game, so
+it is persisted with everything else); queries turn it into exact draw odds.
+
+Cards whose whereabouts a player does not know are treated as equally likely to
+be anywhere in the deck or the unknown part of the discard pile, so the deck is
+a uniformly random subset of that pool.
+"""
+from functools import lru_cache
+
+from pretrain.probability import PERMUTATIONS, draw_distribution
+
+TOTAL_LIBERAL = 6
+TOTAL_FASCIST = 11
+LETTER = {"liberal": "L", "fascist": "F"}
+
+
+def note_reshuffle(game: dict) -> None:
+    # The discard pile went back into the deck: nobody knows where any of it is now.
+    game["known_discards"] = {}
+    game["known_top"] = {}
+
+
+def note_draw(game: dict, count: int) -> None:
+    for pid, top in list(game.get("known_top", {}).items()):
+        if len(top) > count:
+            game["known_top"][pid] = top[count:]
+        else:
+            del game["known_top"][pid]
+
+
+def note_discard(game: dict, witnesses, policies) -> None:
+    known = game.setdefault("known_discards", {})
+    for pid in witnesses:
+        if not pid:
+            continue
+        counts = known.setdefault(pid, [0, 0])
+        for policy in policies:
+            counts[policy == "fascist"] += 1
+
+
+def note_peek(game: dict, pid: str, policies: list) -> None:
+    game.setdefault("known_top", {})[pid] = list(policies)
+
+
+def known_hand(game: dict, pid: str | None) -> list:
+    """Cards in play that ``pid`` has seen (its own hand, or the hand it just passed on)."""
+    if pid is None or pid not in (game.get("president_id"), game.get("chancellor_id")):
+        return []
+    phase = game.get("phase")
+    if phase in ("legislative_chancellor", "veto_pending"):
+        return list(game.get("pending_policies", []))
+    if phase == "legislative_president" and pid == game.get("president_id"):
+        return list(game.get("pending_policies", []))
+    return []
+
+
+def deck_pool(game: dict, pid: str | None = None) -> tuple:
+    """(liberal, fascist) cards that could be in the next draw from ``pid``'s point of view.
+
+    ``pid=None`` is the public view. Applies the reshuffle the next draw would trigger.
+    """
+    liberal = TOTAL_LIBERAL - int(game.get("liberal_policies", 0))
+    fascist = TOTAL_FASCIST - int(game.get("fascist_policies", 0))
+    if len(game.get("policy_deck", ())) < 3 and game.get("policy_discard"):
+        # The next draw reshuffles; only cards still in a hand stay out of it.
+        out = known_hand(game, pid)
+    else:
+        seen = game.get("known_discards", {}).get(pid, (0, 0)) if pid else (0, 0)
+        out = ["liberal"] * seen[0] + ["fascist"] * seen[1] + known_hand(game, pid)
+    liberal -= out.count("liberal")
+    fascist -= out.count("fascist")
+    return max(0, liberal), max(0, fascist)
+
+
+@lru_cache(maxsize=None)
+def _float_odds(liberal: int, fascist: int) -> dict:
+    return {draw: float(p) for draw, p in draw_distribution(liberal, fascist).items()}
+
+
+def next_draw_odds(game: dict, pid: str | None = None) -> dict:
+    """Probability of each ordered three-card draw ("FFL", ...) coming off the deck next."""
+    top = game.get("known_top", {}).get(pid) if pid else None
+    if top and len(top) >= 3:
+        seen = "".join(LETTER[p] for p in top[:3])
+        return {draw: float(draw == seen) for draw in PERMUTATIONS}
+    return _float_odds(*deck_pool(game, pid))
+
+
+def liberal_count_odds(game: dict, pid: str | None = None) -> dict:
+    """Probability of 0-3 liberals in the next three-card draw."""
+    odds = {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0}
+    for draw, p in next_draw_odds(game, pid).items():
+        odds[draw.count("L")] += p
+    return odds
+
+
+def expected_deck(game: dict, pid: str | None = None) -> tuple:
+    """Expected (liberal, fascist) make-up of the deck as it stands."""
+    size = len(game.get("policy_deck", ()))
+    liberal, fascist = deck_pool(game, pid)
+    pool = liberal + fascist
+    if not pool:
+        return 0.0, 0.0
+    share = min(size, pool) / pool
+    return liberal * share, fascist * share
+
+
+def summary(game: dict, pid: str | None = None) -> dict:
+    """The figures the AI reads: P(FFF), P(at least one liberal) and expected deck make-up."""
+    counts = liberal_count_odds(game, pid)
+    liberal, fascist = expected_deck(game, pid)
+    return {
+        "p_fff": counts[0],
+        "p_liberal": 1.0 - counts[0],
+        "p_mostly_fascist": counts[0] + counts[1],
+        "expected_liberal": liberal,
+        "expected_fascist": fascist,
+    }
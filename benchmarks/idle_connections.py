@@ -0,0 +1,276 @@
+"""Memory and latency with thousands of idle /events streams: threaded server vs. ASGI.
+
+For each server (``--servers threaded,asgi``) and connection count
+(``--connections 1000,5000``) it starts a fresh server process, fills rooms of
+ten human seats over HTTP, starts every game, and opens one
+/api/game/<code>/events stream per seat. With all of them idle it reports:
+
+  rss          server resident memory, and the increase per open stream
+  threads      server OS threads
+  fan-out      time from a nominate POST until all ten seats of that room
+               have received the new version (p50/p95 over ``--probes`` rooms)
+  /state       latency of plain GETs while the streams are open (p50/p95)
+
+``threaded`` is werkzeug's threaded server (what ``python main.py`` runs);
+``asgi`` is asgi.py's built-in server. The client is a single asyncio process.
+
+    python benchmarks/idle_connections.py --connections 1000,5000 --output idle.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEATS_PER_ROOM = 10
+
+
+def serve(kind: str, port: int) -> None:
+    sys.path.insert(0, ROOT)
+    if kind == "asgi":
+        import asgi
+
+        asgi.serve("127.0.0.1", port)
+        return
+    import logging
+
+    import main
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    make_server("127.0.0.1", port, main.app, threaded=True).serve_forever()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def proc_status(pid: int) -> dict:
+    status = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            status[name] = value.split()[0] if value.split() else ""
+    return {"rss_kb": int(status["VmRSS"]), "threads": int(status["Threads"])}
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p * len(ordered)) - 1)]
+
+
+async def read_head(reader) -> tuple:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers.setdefault(name.strip().lower(), []).append(value.strip())
+    return int(lines[0].split(" ", 2)[1]), headers
+
+
+async def request(port: int, method: str, path: str, cookie: str | None = None, form: str | None = None,
+                  json_body: dict | None = None) -> tuple:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b""
+    lines = [f"{method} {path} HTTP/1.1", "Host: 127.0.0.1", "Connection: close"]
+    if form is not None:
+        body = form.encode()
+        lines.append("Content-Type: application/x-www-form-urlencoded")
+    elif json_body is not None:
+        body = json.dumps(json_body).encode()
+        lines.append("Content-Type: application/json")
+    if cookie:
+        lines.append(f"Cookie: {cookie}")
+    lines.append(f"Content-Length: {len(body)}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    status, headers = await read_head(reader)
+    if "content-length" in headers:
+        data = await reader.readexactly(int(headers["content-length"][0]))
+    else:
+        data = await reader.read()
+    writer.close()
+    return status, headers, data
+
+
+def session_cookie(headers: dict, cookie: str | None = None) -> str | None:
+    for value in headers.get("set-cookie", ()):
+        if value.startswith("session="):
+            return value.split(";", 1)[0]
+    return cookie
+
+
+async def open_room(port: int) -> tuple:
+    _, headers, _ = await request(port, "POST", "/host", form="name=Host")
+    host = session_cookie(headers)
+    code = headers["location"][0].rstrip("/").rsplit("/", 1)[-1]
+    cookies = [host]
+    for i in range(SEATS_PER_ROOM - 1):
+        _, headers, _ = await request(port, "POST", "/join", form=f"code={code}&name=Seat+{i + 2}")
+        cookies.append(session_cookie(headers))
+    await request(port, "POST", f"/api/game/{code}/start", cookie=host, json_body={})
+    return code, cookies
+
+
+class Stream:
+    """One idle seat: an open /events stream remembering the last version and pending action."""
+
+    def __init__(self, code: str, cookie: str):
+        self.code = code
+        self.cookie = cookie
+        self.version = 0
+        self.action = None
+        self.changed = asyncio.Event()
+        self.writer = None
+        self.task = None
+
+    async def open(self, port: int) -> None:
+        reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+        self.writer.write((f"GET /api/game/{self.code}/events HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                           f"Cookie: {self.cookie}\r\n\r\n").encode())
+        status, _ = await read_head(reader)
+        if status != 200:
+            raise RuntimeError(f"/events answered {status}")
+        self.task = asyncio.ensure_future(self.read(reader))
+        await self.changed.wait()
+
+    async def read(self, reader) -> None:
+        # Chunk-size lines and blank lines are skipped; every frame arrives as one chunk.
+        while line := await reader.readline():
+            if line.startswith(b"data: "):
+                data = json.loads(line[6:])
+                if "self" in data:
+                    self.action = (data["self"] or {}).get("action")
+                self.version = data["version"]
+                self.changed.set()
+
+    def close(self) -> None:
+        self.task.cancel()
+        self.writer.close()
+
+
+async def measure(port: int, pid: int, connections: int, probes: int, state_requests: int) -> dict:
+    limit = asyncio.Semaphore(32)
+
+    async def limited(coro):
+        async with limit:
+            return await coro
+
+    rooms_needed = math.ceil(connections / SEATS_PER_ROOM)
+    rooms = await asyncio.gather(*(limited(open_room(port)) for _ in range(rooms_needed)))
+    before = proc_status(pid)
+
+    streams = [Stream(code, cookie) for code, cookies in rooms for cookie in cookies][:connections]
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(stream.open(port)) for stream in streams))
+    opened_seconds = time.perf_counter() - started
+    await asyncio.sleep(2)
+    idle = proc_status(pid)
+
+    by_room: dict = {}
+    for stream in streams:
+        by_room.setdefault(stream.code, []).append(stream)
+    fan_out = []
+    full_rooms = [seats for seats in by_room.values() if len(seats) == SEATS_PER_ROOM]
+    for seats in full_rooms[:probes]:
+        president = next(seat for seat in seats if seat.action and seat.action["type"] == "nominate")
+        version = president.version
+        for seat in seats:
+            seat.changed.clear()
+        t0 = time.perf_counter()
+        await request(port, "POST", f"/api/game/{president.code}/nominate", cookie=president.cookie,
+                      json_body={"chancellor_id": president.action["eligible"][0]})
+        for seat in seats:
+            while seat.version <= version:
+                await seat.changed.wait()
+                seat.changed.clear()
+        fan_out.append(time.perf_counter() - t0)
+
+    code, cookie = rooms[0][0], rooms[0][1][0]
+    state = []
+    for _ in range(state_requests):
+        t0 = time.perf_counter()
+        await request(port, "GET", f"/api/game/{code}/state", cookie=cookie)
+        state.append(time.perf_counter() - t0)
+
+    for stream in streams:
+        stream.close()
+    return {
+        "connections": connections,
+        "open_seconds": opened_seconds,
+        "rss_mb": idle["rss_kb"] / 1024,
+        "rss_kb_per_stream": (idle["rss_kb"] - before["rss_kb"]) / connections,
+        "threads": idle["threads"],
+        "fan_out_p50_ms": percentile(fan_out, 0.5) * 1e3,
+        "fan_out_p95_ms": percentile(fan_out, 0.95) * 1e3,
+        "state_p50_ms": percentile(state, 0.5) * 1e3,
+        "state_p95_ms": percentile(state, 0.95) * 1e3,
+    }
+
+
+def run_one(kind: str, connections: int, args) -> dict:
+    port = free_port()
+    env = {key: value for key, value in os.environ.items() if key not in ("PERSIST_DIR", "GAME_STORE")}
+    env["METRICS"] = "0"
+    server = subprocess.Popen([sys.executable, __file__, "--serve", kind, "--port", str(port)], env=env,
+                              stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"{kind} server did not come up")
+                time.sleep(0.1)
+        result = asyncio.run(measure(port, server.pid, connections, args.probes, args.state_requests))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    result["server"] = kind
+    return result
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", default="1000,5000", help="comma-separated idle stream counts")
+    parser.add_argument("--servers", default="threaded,asgi", help="comma-separated: threaded, asgi")
+    parser.add_argument("--probes", type=int, default=20, help="rooms whose fan-out latency is measured")
+    parser.add_argument("--state-requests", type=int, default=200)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--serve", choices=("threaded", "asgi"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return 0
+
+    results = []
+    for connections in (int(n) for n in args.connections.split(",")):
+        for kind in args.servers.split(","):
+            result = run_one(kind, connections, args)
+            print(f"{kind:8} {connections:5} streams: rss {result['rss_mb']:7.1f} MB "
+                  f"({result['rss_kb_per_stream']:5.1f} KB/stream), {result['threads']:5} threads, "
+                  f"fan-out p50 {result['fan_out_p50_ms']:6.2f} / p95 {result['fan_out_p95_ms']:6.2f} ms, "
+                  f"/state p50 {result['state_p50_ms']:5.2f} / p95 {result['state_p95_ms']:5.2f} ms")
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "results": results}, f, indent=2)
+        print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,75 @@
+"""How well liberal AIs read the table: posterior role odds vs. the suspicion counter.
+
+Plays AI self-play games and, at every nomination, asks each living liberal AI
+to name the fascist team: the top-k players by posterior P(fascist team)
+against the top-k by ``suspicion`` (k = hidden fascists it has not ruled
+out). Reports precision of both and the cost of one posterior query.
+
+    python benchmarks/inference.py --games 300 --players 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import inference  # noqa: E402
+from ai import take_turn  # noqa: E402
+
+
+def precision(ranked: list, fascists: set, k: int) -> float:
+    return len(set(ranked[:k]) & fascists) / k
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--players", type=int, default=10, choices=sorted(engine.ROLE_COUNTS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if inference.np is None:
+        print("NumPy is not installed; role inference is unavailable.")
+        return 1
+
+    random.seed(args.seed)
+    posterior_hits = suspicion_hits = samples = 0.0
+    query_time = 0.0
+    for _ in range(args.games):
+        players: dict = {}
+        engine.add_ai_players(players, args.players)
+        game = engine.new_game("bench", None, players)
+        engine.start_game(game)
+        fascists = {pid for pid, role in game.roles.items() if role != "liberal"}
+        while game.phase != "game_over":
+            if game.phase == "nominate":
+                for pid in engine.alive_ids(game):
+                    if game.roles[pid] != "liberal":
+                        continue
+                    others = [o for o in engine.alive_ids(game) if o != pid]
+                    k = len(fascists & set(others))
+                    started = time.perf_counter()
+                    team, _ = inference.role_odds(game, pid, [])
+                    query_time += time.perf_counter() - started
+                    by_posterior = sorted(others, key=lambda o: team[o], reverse=True)
+                    by_suspicion = sorted(others, key=lambda o: game.suspicion.get(o, 0), reverse=True)
+                    posterior_hits += precision(by_posterior, fascists, k)
+                    suspicion_hits += precision(by_suspicion, fascists, k)
+                    samples += 1
+            if not take_turn(game):
+                raise RuntimeError(f"AI made no progress in phase {game.phase}")
+
+    team_size = args.players - engine.ROLE_COUNTS[args.players]["liberal"]
+    chance = team_size / (args.players - 1)
+    print(f"{args.games} games, {args.players} players, {int(samples)} liberal readings")
+    print(f"  random guess         {chance:7.1%}")
+    print(f"  suspicion counter    {suspicion_hits / samples:7.1%}")
+    print(f"  posterior            {posterior_hits / samples:7.1%}")
+    print(f"  posterior query      {query_time / samples * 1e6:7.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Search AI throughput (rollouts/second) and win rate against the heuristic AI.
+
+Throughput: ``--positions`` positions are taken from heuristic self-play, each
+at a random point of its own game where some seat has a real choice. Each is
+searched for ``--budget`` seconds and the iterations per second are reported.
+An iteration is one sampled world, a tree descent and a playout. Alongside are
+the parts on their own: sampling a world, and playing it out with the heuristic
+and with uniformly random moves.
+
+Win rate: ``--games`` deals of ``--players`` seats, each played twice from the
+same seed. Once seat 0 plays ``ismcts`` and once the default strategy; every
+other seat plays the default both times. It reports seat 0's win rate by role
+for each.
+
+    python benchmarks/ismcts.py --budget 0.05 --positions 50 --games 200 --players 7
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import search  # noqa: E402
+from ai import heuristic_action, take_turn  # noqa: E402
+
+
+def new_table(players: int, strategy: str | None = None):
+    roster: dict = {}
+    engine.add_ai_players(roster, 1, strategy)
+    engine.add_ai_players(roster, players - 1)
+    game = engine.new_game("bench", None, roster)
+    engine.start_game(game)
+    return game
+
+
+def position(players: int) -> tuple:
+    """(game, pid) somewhere in a heuristic self-play game where ``pid`` has more than one distinct move."""
+    while True:
+        game = new_table(players)
+        steps = random.randrange(60)
+        while game.phase != "game_over":
+            if steps <= 0:
+                for pid in engine.waiting_on(game):
+                    if len(search.moves(game, pid)) > 1:
+                        return game, pid
+            take_turn(game)
+            steps -= 1
+
+
+def run_throughput(args) -> None:
+    found = [position(args.players) for _ in range(args.positions)]
+    rates = []
+    for game, pid in found:
+        _, stats = search.search(game, pid, args.budget, heuristic_action)
+        rates.append(stats["iterations"] / stats["seconds"])
+    rates.sort()
+
+    samplers = [search.WorldSampler(game, pid) for game, pid in found]
+    started = time.perf_counter()
+    worlds = [sampler.sample() for sampler in samplers for _ in range(20)]
+    sample_us = (time.perf_counter() - started) / len(worlds) * 1e6
+
+    print(f"{len(found)} positions, {args.players} players, {args.budget * 1e3:.0f} ms per decision")
+    print(f"  search iterations/s     median {rates[len(rates) // 2]:8.0f}   min {rates[0]:8.0f}   "
+          f"max {rates[-1]:8.0f}")
+    print(f"  world sample            {sample_us:8.1f} us")
+    for name, policy in (("heuristic", heuristic_action), ("random", None)):
+        batch = [sampler.sample() for sampler in samplers for _ in range(5)]
+        started = time.perf_counter()
+        for world in batch:
+            search.playout(world, policy)
+        print(f"  {name + ' playouts/s':23} {len(batch) / (time.perf_counter() - started):8.0f}")
+
+
+def play(seed: int, players: int, strategy: str | None) -> tuple:
+    """Seat 0's (role, won) in the game dealt from ``seed``."""
+    random.seed(seed)
+    game = new_table(players, strategy)
+    for _ in range(2000):
+        if game.phase == "game_over" or not take_turn(game):
+            break
+    seat = next(iter(game.players))
+    role = game.roles[seat]
+    return role, game.winner == engine.party_for_role(role)
+
+
+def run_win_rate(args) -> None:
+    search.BUDGET = args.budget
+    seats = {"ismcts": Counter(), "standard": Counter()}
+    wins = {"ismcts": Counter(), "standard": Counter()}
+    started = time.perf_counter()
+    for game in range(args.games):
+        for name, strategy in (("ismcts", "ismcts"), ("standard", None)):
+            role, won = play(args.seed + game, args.players, strategy)
+            seats[name][role] += 1
+            wins[name][role] += won
+    print(f"{args.games} deals x 2, {args.players} players, {args.budget * 1e3:.0f} ms per decision, "
+          f"{time.perf_counter() - started:.0f} s")
+    print(f"  {'seat 0 plays':12} {'liberal':>16} {'fascist':>16} {'hitler':>16} {'overall':>16}")
+    for name in seats:
+        cells = []
+        for role in ("liberal", "fascist", "hitler", None):
+            n = sum(seats[name].values()) if role is None else seats[name][role]
+            won = sum(wins[name].values()) if role is None else wins[name][role]
+            cells.append(f"{won / n:6.1%} of {n:5}" if n else f"{'-':>16}")
+        print(f"  {name:12} " + " ".join(f"{cell:>16}" for cell in cells))
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=0.05, help="seconds of search per decision")
+    parser.add_argument("--positions", type=int, default=50, help="positions searched for throughput")
+    parser.add_argument("--games", type=int, default=200, help="deals played for the win rate (0 skips it)")
+    parser.add_argument("--players", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    run_throughput(args)
+    if args.games:
+        run_win_rate(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,82 @@
+"""Encode time of a full /state response: Flask's default provider vs. fastjson.
+
+Builds a 10-player game in play with a 300-entry log (tail raised to 300 so
+every entry is in the response) and encodes the seat-independent view the
+way each path would:
+
+  flask default     DefaultJSONProvider, players and log as plain lists
+  fastjson/json     stdlib backend, roster as a pre-encoded Fragment
+  fastjson/orjson   orjson backend, roster as a pre-encoded Fragment
+
+    python benchmarks/json_encode.py --repeat 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import fastjson  # noqa: E402
+import main  # noqa: E402
+from ai import take_turn  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+
+def build_game(players: int, log_entries: int):
+    roster: dict = {}
+    engine.add_ai_players(roster, players)
+    game = engine.new_game("bench", None, roster, log_tail=log_entries)
+    engine.start_game(game)
+    for _ in range(12):
+        if game.phase == "game_over" or not take_turn(game):
+            break
+    while game.announcement_seq < log_entries:
+        engine.announce(game, f"Filler announcement number {game.announcement_seq + 1} for the log.")
+    return game
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def stdlib_backend(obj, default) -> str:
+    return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False)
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5000)
+    parser.add_argument("--players", type=int, default=10, choices=sorted(engine.ROLE_COUNTS))
+    parser.add_argument("--log", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    game = build_game(args.players, args.log)
+    response = {"ok": True, "version": game.version, **main.public_state(game), "log": list(game.log)}
+    # What the old code handed to jsonify: the roster as plain dicts.
+    plain = dict(response, players=[dict(p) for p in engine.derived(game).players_view])
+    flask_default = DefaultJSONProvider(main.app)
+
+    results = [("flask default", timed(lambda: flask_default.dumps(plain), args.repeat))]
+    results.append(("fastjson/json", timed(lambda: fastjson._encode(response, stdlib_backend), args.repeat)))
+    if fastjson.orjson is not None:
+        results.append(("fastjson/orjson", timed(lambda: fastjson.dumps(response), args.repeat)))
+
+    size = len(fastjson.dumps(response).encode())
+    print(f"{args.players} players, {len(response['log'])} log entries, {size} bytes per /state view")
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"  {label:16} {seconds * 1e6:8.1f} us   {baseline / seconds:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
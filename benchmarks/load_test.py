@@ -0,0 +1,293 @@
+"""Load test: how many simultaneous rooms one server process can carry.
+
+For each room count in ``--rooms`` it keeps that many rooms busy for
+``--duration`` seconds. Each room is hosted and joined over HTTP, and its
+human seats behave like the browser's polling fallback: poll /state every
+``--poll`` seconds (with ?since=, log_since= and If-None-Match) and post a
+random legal move when ``self.action`` is set. AI seats are left to the
+server's scheduler. When a game ends the host leaves and a new room takes
+its place.
+
+It reports p50/p95/p99 latency per route, requests/second and games
+completed per minute for every room count. ``--output`` writes the same
+figures as JSON for comparing runs.
+
+Requests go through Flask's test client by default. ``--http`` serves the app
+on a local port and uses real sockets instead; ``--url`` drives a server that
+is already running (for example several workers sharing a GAME_STORE).
+
+    python benchmarks/load_test.py --rooms 1,5,10,20 --duration 60 --output load.json
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fastjson  # noqa: E402
+import main  # noqa: E402
+from stress_room import random_move  # noqa: E402
+
+
+class Recorder:
+    """Per-route latencies and error counts for one room count."""
+
+    def __init__(self):
+        self.latencies: dict = {}
+        self.errors = 0
+        self.games = 0
+        self.lock = threading.Lock()
+
+    def add(self, route: str, seconds: float, status: int) -> None:
+        with self.lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            if status >= 500:
+                self.errors += 1
+
+    def game_finished(self) -> None:
+        with self.lock:
+            self.games += 1
+
+
+class TestClientSeat:
+    """A browser session driven through Flask's test client."""
+
+    def __init__(self, recorder: Recorder):
+        self.client = main.app.test_client()
+        self.recorder = recorder
+
+    def request(self, route: str, method: str, path: str, headers=None, **kwargs) -> tuple:
+        started = time.perf_counter()
+        res = self.client.open(path, method=method, headers=headers or {}, **kwargs)
+        self.recorder.add(route, time.perf_counter() - started, res.status_code)
+        return res.status_code, res.headers, res.data
+
+    def get(self, route, path, headers=None):
+        return self.request(route, "GET", path, headers)
+
+    def post(self, route, path, form=None, json_body=None):
+        if form is not None:
+            return self.request(route, "POST", path, data=form)
+        return self.request(route, "POST", path, json=json_body or {})
+
+
+class HTTPSeat:
+    """A browser session over real sockets, with its own cookie jar."""
+
+    base = ""
+
+    def __init__(self, recorder: Recorder):
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+        self.recorder = recorder
+
+    def request(self, route: str, method: str, path: str, headers=None, body: bytes | None = None) -> tuple:
+        req = urllib.request.Request(self.base + path, data=body, method=method, headers=headers or {})
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=30) as res:
+                status, res_headers, data = res.status, res.headers, res.read()
+        except urllib.error.HTTPError as e:
+            status, res_headers, data = e.code, e.headers, e.read()
+        self.recorder.add(route, time.perf_counter() - started, status)
+        return status, res_headers, data
+
+    def get(self, route, path, headers=None):
+        return self.request(route, "GET", path, headers)
+
+    def post(self, route, path, form=None, json_body=None):
+        if form is not None:
+            body = urllib.parse.urlencode(form).encode()
+            return self.request(route, "POST", path, {"Content-Type": "application/x-www-form-urlencoded"}, body)
+        body = json.dumps(json_body or {}).encode()
+        return self.request(route, "POST", path, {"Content-Type": "application/json"}, body)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # /host and /join answer with a redirect whose Location carries the room code.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class MoveSender:
+    """Adapts a seat to the ``client.post(path, json=...)`` calls random_move makes."""
+
+    def __init__(self, seat):
+        self.seat = seat
+
+    def post(self, path: str, json: dict):
+        route = "POST /api/game/<code>/" + path.split("/", 4)[4]
+        self.seat.post(route, path, json_body=json)
+
+
+def open_room(make_seat, humans: int) -> tuple:
+    host = make_seat()
+    _, headers, _ = host.post("POST /host", "/host", form={"name": "Host"})
+    code = headers["Location"].rstrip("/").rsplit("/", 1)[-1]
+    seats = [host]
+    for i in range(humans - 1):
+        seat = make_seat()
+        seat.post("POST /join", "/join", form={"code": code, "name": f"Seat {i + 2}"})
+        seats.append(seat)
+    host.post("POST /api/game/<code>/start", f"/api/game/{code}/start", json_body={})
+    return code, seats
+
+
+def run_room(make_seat, recorder: Recorder, args, stop: threading.Event) -> None:
+    while not stop.is_set():
+        code, seats = open_room(make_seat, args.humans)
+        # Per seat: next poll time, last version and log id seen, last ETag.
+        polls = [time.monotonic() + random.uniform(0, args.poll) for _ in seats]
+        synced = [None] * len(seats)
+        etags = [None] * len(seats)
+        finished = False
+        while not stop.is_set() and not finished:
+            i = min(range(len(seats)), key=polls.__getitem__)
+            stop.wait(max(0.0, polls[i] - time.monotonic()))
+            if stop.is_set():
+                break
+            polls[i] += args.poll
+            path = f"/api/game/{code}/state"
+            if synced[i]:
+                path += f"?since={synced[i][0]}&log_since={synced[i][1]}"
+            headers = {"If-None-Match": etags[i]} if etags[i] else None
+            status, res_headers, body = seats[i].get("GET /api/game/<code>/state", path, headers)
+            if status == 304:
+                continue
+            if status != 200:
+                break
+            etags[i] = res_headers.get("ETag")
+            data = fastjson.loads(body)
+            log = data.get("log")
+            log_id = log[-1]["id"] if log else synced[i][1] if synced[i] else 0
+            synced[i] = (data["version"], log_id)
+            if data.get("winner"):
+                finished = True
+                recorder.game_finished()
+                break
+            action = (data.get("self") or {}).get("action")
+            if action:
+                random_move(MoveSender(seats[i]), code, action)
+        # The host leaving drops the room.
+        seats[0].post("POST /leave", "/leave", form={})
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p * len(ordered)) - 1)]
+
+
+def run_scale(rooms: int, make_seat_for, args) -> dict:
+    recorder = Recorder()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=run_room, args=(lambda: make_seat_for(recorder), recorder, args, stop), daemon=True)
+        for _ in range(rooms)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    for code in main.room_codes():
+        main.drop_game(code)
+
+    routes = {
+        route: {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1e3,
+            "p95_ms": percentile(values, 0.95) * 1e3,
+            "p99_ms": percentile(values, 0.99) * 1e3,
+        }
+        for route, values in sorted(recorder.latencies.items())
+    }
+    total = sum(route["count"] for route in routes.values())
+    return {
+        "rooms": rooms,
+        "seconds": elapsed,
+        "requests": total,
+        "requests_per_second": total / elapsed,
+        "games_completed": recorder.games,
+        "games_per_minute": recorder.games / elapsed * 60,
+        "errors": recorder.errors,
+        "routes": routes,
+    }
+
+
+def print_scale(result: dict) -> None:
+    print(f"{result['rooms']} rooms: {result['requests_per_second']:.0f} req/s, "
+          f"{result['games_per_minute']:.1f} games/min ({result['games_completed']} finished), "
+          f"{result['errors']} errors")
+    for route, stats in result["routes"].items():
+        print(f"  {route:40} {stats['count']:7}  p50 {stats['p50_ms']:7.2f} ms  "
+              f"p95 {stats['p95_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms")
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", default="1,5,10", help="comma-separated room counts to run in turn")
+    parser.add_argument("--humans", type=int, default=5, help="human seats per room (rest are AI)")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds per room count")
+    parser.add_argument("--poll", type=float, default=1.5, help="seconds between /state polls per seat")
+    parser.add_argument("--ai-delay", type=float, default=main.AI_STEP_DELAY, help="AI scheduler pacing")
+    parser.add_argument("--http", action="store_true", help="serve on a local port instead of the test client")
+    parser.add_argument("--url", help="drive an already-running server at this base URL")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    main.AI_SCHEDULER.delay = args.ai_delay
+    seat_class = TestClientSeat
+    if args.url:
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        HTTPSeat.base = args.url.rstrip("/")
+        seat_class = HTTPSeat
+    elif args.http:
+        from werkzeug.serving import make_server
+
+        # Per-request access logging would dominate the timings.
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = make_server("127.0.0.1", 0, main.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        HTTPSeat.base = f"http://127.0.0.1:{server.server_port}"
+        seat_class = HTTPSeat
+
+    results = []
+    for rooms in (int(n) for n in args.rooms.split(",")):
+        result = run_scale(rooms, seat_class, args)
+        print_scale(result)
+        results.append(result)
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "json_backend": fastjson.BACKEND,
+            "transport": args.url or ("http" if args.http else "test_client"),
+            "config": vars(args),
+            "scales": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}")
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
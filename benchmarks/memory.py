@@ -0,0 +1,80 @@
+"""Resident bytes per room: slotted Game/Player records vs. the old plain dicts.
+
+Builds N idle lobbies and N in-progress games (AI self-play stopped part way
+through), measures them with tracemalloc, then converts the same rooms to the
+plain-dict shape with ``Record.to_dict()``. Both forms are measured as deep
+copies so neither side shares containers with the rooms that were built.
+
+    python benchmarks/memory.py --rooms 2000 --players 10
+"""
+import argparse
+import copy
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from ai import take_turn  # noqa: E402
+from model import Player  # noqa: E402
+
+
+def lobby(player_count: int) -> engine.Game:
+    host_id = engine.secrets.token_urlsafe(12)
+    players = {host_id: Player(name="Host", is_host=True, seat=0)}
+    engine.add_ai_players(players, player_count - 1)
+    return engine.new_game(engine.secrets.token_hex(3).upper(), host_id, players)
+
+
+def in_progress(player_count: int, turns: int) -> engine.Game:
+    game = lobby(player_count)
+    engine.start_game(game)
+    for _ in range(turns):
+        if game["phase"] == "game_over" or not take_turn(game):
+            break
+    return game
+
+
+def measure(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    rooms = build()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return rooms, size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=10, choices=sorted(engine.ROLE_COUNTS))
+    parser.add_argument("--turns", type=int, default=12, help="AI steps played in each in-progress game")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    for label, make in (
+        ("idle lobby", lambda: lobby(args.players)),
+        ("in-progress game", lambda: in_progress(args.players, args.turns)),
+    ):
+        random.seed(args.seed)
+        rooms = [make() for _ in range(args.rooms)]
+        _, records = measure(lambda: [copy.deepcopy(game) for game in rooms])
+        _, dicts = measure(lambda: [copy.deepcopy(game.to_dict()) for game in rooms])
+        rows.append((label, dicts / args.rooms, records / args.rooms))
+
+    print(f"{args.rooms} rooms, {args.players} players")
+    print(f"  {'':<18} {'dicts':>10} {'records':>10} {'saved':>7}")
+    for label, before, after in rows:
+        print(f"  {label:<18} {before:>9.0f}B {after:>9.0f}B {1 - after / before:>6.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Per-action cost of journaling: AI self-play with and without a Journal.
+
+Plays the same seeded games twice through the engine, once bare and once
+journaling every transition the way main.locked_game does, and reports the
+hot-path overhead per action, journal bytes per entry and how many entries
+each fsync covered.
+
+    python benchmarks/persistence.py --games 500 --dir /tmp/sh-journal
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from ai import take_turn  # noqa: E402
+from persistence import Journal  # noqa: E402
+
+
+def play(games: int, players: int, seed: int, journal: Journal | None) -> tuple:
+    random.seed(seed)
+    actions = 0
+    elapsed = 0.0
+    for n in range(games):
+        code = f"{n:08d}"
+        ids: dict = {}
+        engine.add_ai_players(ids, players)
+        game = engine.new_game(code, None, ids)
+        engine.start_game(game)
+        if journal:
+            journal.put(code, game)
+        while game.phase != "game_over":
+            started = time.perf_counter()
+            if journal:
+                journal.watch(game)
+            version = game.version
+            engine.normalize_order(game)
+            take_turn(game)
+            if journal and game.version != version:
+                journal.record(code, game, version)
+            elapsed += time.perf_counter() - started
+            actions += 1
+        if journal:
+            journal.drop(code)
+    return actions, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--players", type=int, default=10, choices=sorted(engine.ROLE_COUNTS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dir", default=None, help="journal directory (default: a temp dir)")
+    parser.add_argument("--commit-interval", type=float, default=0.01)
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="sh-journal-")
+    shutil.rmtree(directory, ignore_errors=True)
+    journal = Journal(directory, snapshot_interval=0, commit_interval=args.commit_interval)
+    journal.start(lambda: [], None)
+
+    steps, bare = play(args.games, args.players, args.seed, None)
+    _, journaled = play(args.games, args.players, args.seed, journal)
+    flush_started = time.perf_counter()
+    journal.flush()
+    drain = time.perf_counter() - flush_started
+
+    stats = journal.stats
+    print(f"{args.games} games, {steps} AI steps, journal in {directory}")
+    print(f"  bare                 {bare / steps * 1e6:8.1f} us/step")
+    print(f"  journaled            {journaled / steps * 1e6:8.1f} us/step")
+    print(f"  overhead             {(journaled - bare) / steps * 1e6:8.1f} us/step")
+    print(f"  entries              {stats['entries']:8d}  ({stats['bytes'] / max(1, stats['entries']):.0f} B each)")
+    print(f"  fsyncs               {stats['batches']:8d}  ({stats['entries'] / max(1, stats['batches']):.1f} entries each)")
+    print(f"  final drain          {drain * 1e3:8.1f} ms")
+    if not args.dir:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Memoized draw odds (pretrain/probability.py) vs. the Node tree it replaced.
+
+The legacy tree is copied here verbatim except for one guard: as shipped it
+raised ZeroDivisionError once a branch emptied the deck, so it never finished
+building. It also has no reshuffle, so queries are limited to sequences that
+fit in one deck.
+
+    python benchmarks/probability.py --queries 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import product
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "pretrain"))
+
+import probability  # noqa: E402
+
+
+class Node:
+    def __init__(self, liberal_cards, fascist_cards, draw):
+        self.liberal_cards = liberal_cards
+        self.fascist_cards = fascist_cards
+        self.draw = draw
+        self.probability = 1
+        self.calculate_probability()
+        self.children = {
+            "FFF":0,
+            "FFL":0,
+            "FLF":0,
+            "LFF":0,
+            "FLL":0,
+            "LFL":0,
+            "LLF":0,
+            "LLL":0
+            }
+        if self.probability != 0:
+            for i in self.children:
+                self.children[i] = Node(self.liberal_cards, self.fascist_cards, i)
+
+    def calculate_probability(self):
+        total = self.liberal_cards + self.fascist_cards
+        for c in self.draw:
+            if total <= 0:  # added guard, see module docstring
+                self.probability = 0
+                return
+            if c == "F":
+                self.probability *= self.fascist_cards/total
+                self.fascist_cards -= 1
+            else:
+                self.probability *= self.liberal_cards/total
+                self.liberal_cards -= 1
+            total -= 1
+
+
+def legacy_sequence(roots: dict, draws: tuple) -> float:
+    node = roots[draws[0]]
+    p = node.probability
+    for draw in draws[1:]:
+        node = node.children[draw] if node.children[draw] else None
+        if node is None:
+            return 0.0
+        p *= node.probability
+    return p
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--depth", type=int, default=4, help="draws per query (at most 5 fit in one deck)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    queries = [tuple(random.choice(probability.PERMUTATIONS) for _ in range(args.depth)) for _ in range(args.queries)]
+    roots: dict = {}
+
+    legacy_build = timed(lambda: roots.update({d: Node(*probability.STANDARD_DECK, d) for d in probability.PERMUTATIONS}))
+    legacy_query = timed(lambda: [legacy_sequence(roots, q) for q in queries])
+
+    probability._sequence.cache_clear()
+    probability.draw_probability.cache_clear()
+    cold = timed(lambda: [probability.sequence_probability(q) for q in queries])
+    warm = timed(lambda: [probability.sequence_probability(q) for q in queries])
+
+    worst = max(abs(legacy_sequence(roots, q) - float(probability.sequence_probability(q))) for q in queries)
+    every = list(product(probability.PERMUTATIONS, repeat=args.depth))
+    mass = float(sum(probability.sequence_probability(q) for q in every))
+
+    print(f"{args.queries} queries of {args.depth} draws from a fresh {probability.STANDARD_DECK} deck")
+    print(f"  legacy tree build    {legacy_build * 1e3:10.1f} ms (8 roots)")
+    print(f"  legacy query         {legacy_query / args.queries * 1e6:10.2f} us")
+    print(f"  memoized, cold       {cold / args.queries * 1e6:10.2f} us")
+    print(f"  memoized, warm       {warm / args.queries * 1e6:10.2f} us")
+    print(f"  max |difference|     {worst:10.2e}")
+    print(f"  total probability    {mass:10.6f} over all {len(every)} sequences")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
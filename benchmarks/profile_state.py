@@ -0,0 +1,70 @@
+"""Profile GET /api/game/<code>/state on an in-progress 10-player room.
+
+Hosts a room through the Flask test client, lets the AI play a few rounds, then
+times ``--requests`` full-state polls from the host (no ``since``, so every
+call rebuilds the whole view). Prints the hottest functions under cProfile,
+then the game code alone (engine/main/model) by cumulative time.
+
+    python benchmarks/profile_state.py --requests 2000 --top 15
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20, help="AI steps played before profiling")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--filter", default=r"engine\.py|main\.py|model\.py",
+                        help="regex of files to show in the second, game-code-only table")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    client = main.app.test_client()
+    res = client.post("/host", data={"name": "Host"})
+    code = res.headers["Location"].rstrip("/").rsplit("/", 1)[-1]
+    client.post(f"/api/game/{code}/start")
+    with main.locked_game(code) as game:
+        # Hand the host seat to the AI while warming up, so play does not stall on it.
+        host = next(p for p in game["players"].values() if not p["is_ai"])
+        host["is_ai"] = True
+        for _ in range(args.rounds):
+            if game["phase"] == "game_over" or not main.take_turn(game):
+                break
+        host["is_ai"] = False
+        main.invalidate_index(game)
+        phase = game["phase"]
+
+    url = f"/api/game/{code}/state"
+    client.get(url)
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        client.get(url)
+    plain = time.perf_counter() - started
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(args.requests):
+        client.get(url)
+    profiler.disable()
+
+    print(f"{args.requests} full /state polls, phase {phase}: {plain / args.requests * 1e6:.0f} us/request\n")
+    stats = pstats.Stats(profiler).sort_stats("tottime")
+    stats.print_stats(args.top)
+    stats.sort_stats("cumulative").print_stats(args.filter, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
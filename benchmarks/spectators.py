@@ -0,0 +1,109 @@
+"""CPU per game version as a room's audience grows: shared spectator frames vs. one encode per viewer.
+
+Plays an all-AI 10-player game and, after every step, has each of N spectator
+streams (``main.SpectatorEvents``) fetch its next frame, the way /spectate/events
+does on a version change. For comparison the same audience is served by
+encoding the public view once per viewer. It reports CPU time per version,
+per viewer, and how many JSON encodes each version cost.
+
+    python benchmarks/spectators.py --audience 1,10,100,1000 --steps 200
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import fastjson  # noqa: E402
+import main  # noqa: E402
+from ai import take_turn  # noqa: E402
+
+CODE = "bench"
+
+
+def fresh_game():
+    roster: dict = {}
+    engine.add_ai_players(roster, 10)
+    game = engine.new_game(CODE, None, roster)
+    engine.start_game(game)
+    main.GAMES[CODE] = game
+    main.GAME_LOCKS.setdefault(CODE, threading.Condition(threading.RLock()))
+    return game
+
+
+class CountingDumps:
+    """Stands in for fastjson.dumps, counting calls."""
+
+    def __init__(self, dumps):
+        self.dumps = dumps
+        self.calls = 0
+
+    def __call__(self, obj) -> str:
+        self.calls += 1
+        return self.dumps(obj)
+
+
+def per_viewer_frame(game) -> str:
+    # What serving spectators through a per-connection encode would cost.
+    response = {"ok": True, "version": game.version, **main.public_state(game), "log": list(game.log)}
+    return f"id: {game.version}\ndata: {fastjson.dumps(response)}\n\n"
+
+
+def run(audience: int, steps: int, shared: bool, counter: CountingDumps) -> dict:
+    game = fresh_game()
+    streams = [main.SpectatorEvents(CODE, f"viewer-{i}") for i in range(audience)]
+    for stream in streams:
+        stream.next()
+    cpu = 0.0
+    encodes = 0
+    versions = 0
+    while versions < steps:
+        if game.phase == "game_over" or not take_turn(game):
+            game = fresh_game()
+            for stream in streams:
+                stream.sent = None
+            continue
+        counter.calls = 0
+        started = time.process_time()
+        if shared:
+            for stream in streams:
+                stream.next()
+        else:
+            for _ in streams:
+                per_viewer_frame(game)
+        cpu += time.process_time() - started
+        encodes += counter.calls
+        versions += 1
+    main.drop_game(CODE)
+    return {"cpu_per_version": cpu / versions, "encodes_per_version": encodes / versions}
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audience", default="1,10,100,1000", help="comma-separated spectator counts")
+    parser.add_argument("--steps", type=int, default=200, help="game versions measured per audience size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    counter = CountingDumps(fastjson.dumps)
+    fastjson.dumps = counter
+    print(f"{'viewers':>7}  {'shared ms/version':>18} {'us/viewer':>10} {'encodes':>8}   "
+          f"{'per-viewer ms/version':>22} {'us/viewer':>10} {'encodes':>8}")
+    for audience in (int(n) for n in args.audience.split(",")):
+        random.seed(args.seed)
+        shared = run(audience, args.steps, True, counter)
+        random.seed(args.seed)
+        naive = run(audience, args.steps, False, counter)
+        print(f"{audience:7}  {shared['cpu_per_version'] * 1e3:18.3f} "
+              f"{shared['cpu_per_version'] / audience * 1e6:10.2f} {shared['encodes_per_version']:8.2f}   "
+              f"{naive['cpu_per_version'] * 1e3:22.3f} "
+              f"{naive['cpu_per_version'] / audience * 1e6:10.2f} {naive['encodes_per_version']:8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,63 @@
+"""Cost of serving one game version to every seat, with and without the shared view cache.
+
+Plays AI self-play games in memory and, after every version change, builds the
+/state response for each player (``main.state_payload``). "uncached" drops the
+game's ``view_cache`` before every seat, which is what each poll paid before
+the public part was shared.
+
+    python benchmarks/state_view.py --games 20 --players 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import main  # noqa: E402
+from ai import take_turn  # noqa: E402
+
+
+def serve_all(game, shared: bool) -> float:
+    started = time.perf_counter()
+    for pid in game.players:
+        if not shared:
+            game.view_cache = None
+        main.state_payload(game, pid)
+    return time.perf_counter() - started
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, default=10, choices=sorted(engine.ROLE_COUNTS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    totals = {False: 0.0, True: 0.0}
+    versions = 0
+    for _ in range(args.games):
+        players: dict = {}
+        engine.add_ai_players(players, args.players)
+        game = engine.new_game("bench", None, players)
+        engine.start_game(game)
+        while game.phase != "game_over":
+            for shared in (False, True):
+                game.view_cache = None
+                totals[shared] += serve_all(game, shared)
+            versions += 1
+            if not take_turn(game):
+                raise RuntimeError(f"AI made no progress in phase {game.phase}")
+
+    print(f"{versions} versions, {args.players} seats each")
+    for shared, label in ((False, "uncached"), (True, "shared view")):
+        print(f"  {label:12} {totals[shared] / versions * 1e6:8.0f} us per version, all seats")
+    print(f"  speedup      {totals[False] / totals[True]:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,105 @@
+"""Throughput against the number of worker processes sharing one SQLite room store.
+
+For each count in ``--workers`` it starts ``main.py`` with WORKERS=<n> and
+GAME_STORE=sqlite:///<tmp file> on a free port, waits for it to answer, and
+drives ``--rooms`` rooms at it with the load test's polling seats for
+``--duration`` seconds. It reports requests/second, games per minute, /state
+p95 and the number of 5xx responses per worker count; ``--output`` writes the
+load test's full figures as JSON.
+
+Scaling is bounded by the host's cores (``os.cpu_count()`` is printed) and by
+the load generator itself, which runs in this one process.
+
+    python benchmarks/store_scaling.py --workers 1,2,4 --rooms 20 --duration 30
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import load_test  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, db_path: str, port: int, ai_delay: float) -> subprocess.Popen:
+    env = {key: value for key, value in os.environ.items() if key != "PERSIST_DIR"}
+    env.update(
+        WORKERS=str(workers),
+        GAME_STORE=f"sqlite:///{db_path}",
+        HOST="127.0.0.1",
+        PORT=str(port),
+        AI_STEP_DELAY=str(ai_delay),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    stop_server(server)
+    raise SystemExit(f"server with {workers} workers did not come up on port {port}")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    # The workers are forked children in the server's session.
+    os.killpg(server.pid, 15)
+    server.wait(timeout=10)
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts to run in turn")
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--humans", type=int, default=5, help="human seats per room (rest are AI)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per worker count")
+    parser.add_argument("--poll", type=float, default=1.5, help="seconds between /state polls per seat")
+    parser.add_argument("--ai-delay", type=float, default=0.2, help="AI scheduler pacing on the server")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.rooms} rooms, {args.duration:.0f} s per worker count")
+    results = []
+    for workers in (int(n) for n in args.workers.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            server = start_server(workers, os.path.join(tmp, "rooms.db"), port, args.ai_delay)
+            try:
+                load_test.HTTPSeat.base = f"http://127.0.0.1:{port}"
+                result = load_test.run_scale(args.rooms, load_test.HTTPSeat, args)
+            finally:
+                stop_server(server)
+        result["workers"] = workers
+        state = result["routes"].get("GET /api/game/<code>/state", {})
+        print(f"{workers} workers: {result['requests_per_second']:7.0f} req/s  "
+              f"{result['games_per_minute']:6.1f} games/min  "
+              f"state p95 {state.get('p95_ms', 0):7.2f} ms  {result['errors']} errors")
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cpus": os.cpu_count(), "config": vars(args), "runs": results}, f, indent=2)
+        print(f"wrote {args.output}")
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,175 @@
+"""Hammer single rooms from many threads and check game invariants.
+
+Every human seat gets an actor thread (polls /state and answers self.action
+with a random legal move) plus extra poller threads on the same session, while
+a checker thread inspects the game under its lock. Exits non-zero on any
+violation.
+
+    python benchmarks/stress_room.py --games 20 --humans 5 --pollers 3
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+TOTAL_POLICIES = 17
+
+
+def check_invariants(game: dict) -> list:
+    problems = []
+    if not game.get("started"):
+        return problems
+
+    cards = (
+        len(game.get("policy_deck", []))
+        + len(game.get("policy_discard", []))
+        + len(game.get("pending_policies", []))
+        + int(game.get("liberal_policies", 0))
+        + int(game.get("fascist_policies", 0))
+    )
+    if cards != TOTAL_POLICIES:
+        problems.append(f"deck + discard + pending + enacted = {cards}, expected {TOTAL_POLICIES}")
+
+    alive = set(main.alive_ids(game))
+    votes = game.get("votes", {})
+    if not set(votes) <= alive:
+        problems.append(f"votes from non-living seats: {set(votes) - alive}")
+
+    last_vote = game.get("last_vote")
+    if last_vote and last_vote["yes"] + last_vote["no"] != len(last_vote["votes"]):
+        problems.append(f"last vote counts {last_vote['yes']}+{last_vote['no']} != {len(last_vote['votes'])} ballots")
+
+    stats = game.get("stats", {})
+    if stats.get("elections", 0) != stats.get("successful_elections", 0) + stats.get("failed_elections", 0):
+        problems.append(f"election stats do not add up: {stats}")
+
+    if game.get("phase") != "game_over":
+        president_id = game.get("president_id")
+        if president_id not in alive:
+            problems.append(f"president {president_id} is not a living player")
+        if game.get("order", []).count(president_id) != 1:
+            problems.append("president is not seated exactly once in the order")
+        if game.get("phase") in ("legislative_chancellor", "veto_pending") and game.get("chancellor_id") == president_id:
+            problems.append("president is also chancellor")
+    return problems
+
+
+def random_move(client, code: str, action: dict) -> None:
+    kind = action["type"]
+    if kind == "nominate" and action["eligible"]:
+        client.post(f"/api/game/{code}/nominate", json={"chancellor_id": random.choice(action["eligible"])})
+    elif kind == "vote":
+        client.post(f"/api/game/{code}/vote", json={"vote": random.choice(["ja", "nein"])})
+    elif kind == "president_discard":
+        client.post(f"/api/game/{code}/legis/president", json={"discard_index": random.randrange(3)})
+    elif kind == "chancellor_enact":
+        if action.get("veto_available") and action.get("veto_allowed") and random.random() < 0.3:
+            client.post(f"/api/game/{code}/legis/chancellor", json={"veto": True})
+        else:
+            client.post(f"/api/game/{code}/legis/chancellor", json={"enact_index": random.randrange(2)})
+    elif kind == "veto_decision":
+        client.post(f"/api/game/{code}/veto", json={"approve": random.random() < 0.5})
+    elif kind == "executive":
+        targets = action.get("targets") or [None]
+        client.post(f"/api/game/{code}/executive", json={"target_id": random.choice(targets)})
+
+
+def clone_client(client):
+    twin = main.app.test_client()
+    cookie = client.get_cookie("session")
+    twin.set_cookie("session", cookie.value)
+    return twin
+
+
+def play_room(humans: int, pollers: int, timeout: float) -> tuple:
+    host = main.app.test_client()
+    res = host.post("/host", data={"name": "Host"})
+    code = res.headers["Location"].rstrip("/").rsplit("/", 1)[-1]
+    seats = [host]
+    for i in range(humans - 1):
+        seat = main.app.test_client()
+        seat.post("/join", data={"code": code, "name": f"Seat {i + 2}"})
+        seats.append(seat)
+    host.post(f"/api/game/{code}/start")
+
+    problems = []
+    requests = [0]
+    done = threading.Event()
+    deadline = time.monotonic() + timeout
+
+    def actor(client):
+        while not done.is_set() and time.monotonic() < deadline:
+            res = client.get(f"/api/game/{code}/state")
+            requests[0] += 1
+            data = res.get_json(silent=True) or {}
+            if res.status_code == 404 or data.get("winner"):
+                done.set()
+                return
+            action = (data.get("self") or {}).get("action")
+            if action:
+                random_move(client, code, action)
+                requests[0] += 1
+
+    def poller(client):
+        while not done.is_set() and time.monotonic() < deadline:
+            client.get(f"/api/game/{code}/state")
+            requests[0] += 1
+
+    def checker():
+        while not done.is_set() and time.monotonic() < deadline:
+            with main.locked_game(code) as game:
+                if game:
+                    problems.extend(check_invariants(game))
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=actor, args=(seat,)) for seat in seats]
+    threads += [threading.Thread(target=poller, args=(clone_client(seat),)) for seat in seats for _ in range(pollers)]
+    threads.append(threading.Thread(target=checker))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with main.locked_game(code) as game:
+        finished = bool(game and game.get("winner"))
+        if game:
+            problems.extend(check_invariants(game))
+    main.drop_game(code)
+    return finished, problems, requests[0]
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--humans", type=int, default=5, help="human seats per room (rest are AI)")
+    parser.add_argument("--pollers", type=int, default=2, help="extra /state pollers per human seat")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per game")
+    parser.add_argument("--ai-delay", type=float, default=0.0, help="AI scheduler pacing in seconds")
+    args = parser.parse_args()
+    main.AI_SCHEDULER.delay = args.ai_delay
+
+    started = time.perf_counter()
+    finished = total_requests = 0
+    violations = []
+    for _ in range(args.games):
+        ok, problems, reqs = play_room(args.humans, args.pollers, args.timeout)
+        finished += ok
+        total_requests += reqs
+        violations.extend(problems)
+    elapsed = time.perf_counter() - started
+
+    print(f"games: {args.games}  finished: {finished}  requests: {total_requests}  "
+          f"({total_requests / elapsed:.0f} req/s)  violations: {len(violations)}")
+    for problem in sorted(set(violations)):
+        print(f"  {problem}")
+    return 1 if violations or finished != args.games else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,834 @@
+"""Secret Hitler rules engine.
+
+Pure game logic over the game record built by ``new_game`` (see model.py), with
+no Flask or threading imports. The web handlers, the AI and offline tools all
+drive games through ``legal_actions`` / ``apply``.
+
+Actions are plain dicts carrying the acting ``player_id`` and a ``type``:
+
+    {"type": "nominate", "chancellor_id": ...}
+    {"type": "vote", "vote": True | False}
+    {"type": "president_discard", "discard_index": 0-2}
+    {"type": "chancellor_enact", "enact_index": 0-1} or {"type": "chancellor_enact", "veto": True}
+    {"type": "veto_decision", "approve": True | False}
+    {"type": "executive", "target_id": ...}          # target_id is ignored for policy_peek
+"""
+import random
+import secrets
+
+import belief
+import inference
+from model import Game, GameIndex, GameLog, Player, PolicyPile
+
+AI_NAMES = [
+    "Avery", "Blake", "Casey", "Drew", "Emery",
+    "Finley", "Gray", "Harper", "Indigo", "Jules",
+    "Kai", "Logan", "Micah", "Nico", "Oak",
+    "Parker", "Quinn", "Reese", "Sawyer", "Tate",
+    "Wren", "Zion"
+]
+
+ROLE_COUNTS = {
+    5: {"liberal": 3, "fascist": 1, "hitler": 1},
+    6: {"liberal": 4, "fascist": 1, "hitler": 1},
+    7: {"liberal": 4, "fascist": 2, "hitler": 1},
+    8: {"liberal": 5, "fascist": 2, "hitler": 1},
+    9: {"liberal": 5, "fascist": 3, "hitler": 1},
+    10: {"liberal": 6, "fascist": 3, "hitler": 1},
+}
+
+FASCIST_POWERS = {
+    "5-6": [None, None, "policy_peek", "execution", "execution"],
+    "7-8": [None, "investigate", "special_election", "execution", "execution"],
+    "9-10": ["investigate", "investigate", "special_election", "execution", "execution"],
+}
+
+
+# Log entries kept uncompressed and sent with a full /state; older ones are paged in.
+LOG_TAIL = 50
+
+
+class IllegalAction(Exception):
+    """Raised by ``apply`` when an action is not allowed in the current state."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def new_game(code: str, host_id: str | None, players: dict, log_tail: int = LOG_TAIL) -> Game:
+    return Game(code=code, host_id=host_id, players=players, stats=default_stats(),
+                seed=random.getrandbits(63), log=GameLog(tail=log_tail))
+
+
+def start_game(game: dict) -> None:
+    player_ids = list(game["players"].keys())
+    for seat, player in enumerate(game["players"].values()):
+        player["seat"] = seat
+    game["player_count"] = len(player_ids)
+    game["policy_deck"] = build_deck()
+    game["policy_discard"] = PolicyPile()
+    game["roles"] = assign_roles(player_ids)
+    order = player_ids[:]
+    random.shuffle(order)
+    game["order"] = order
+    game["president_index"] = 0
+    game["president_id"] = order[0] if order else None
+    game["chancellor_id"] = None
+    game["last_president_id"] = None
+    game["last_chancellor_id"] = None
+    game["nominee_id"] = None
+    game["votes"] = {}
+    game["phase"] = "nominate"
+    game["liberal_policies"] = 0
+    game["fascist_policies"] = 0
+    game["election_tracker"] = 0
+    game["pending_policies"] = []
+    game["executive_action"] = None
+    game["veto_unlocked"] = False
+    game["veto_requested"] = False
+    game["veto_denied"] = False
+    game["special_election_return_id"] = None
+    game["private_info"] = {}
+    game["private_seq"] = 0
+    game["suspicion"] = {pid: 0 for pid in player_ids}
+    game["winner"] = None
+    game["victory_reason"] = None
+    game["last_vote"] = None
+    game["announcement_seq"] = 0
+    game["announcement"] = None
+    game["stats"] = default_stats()
+    game["end_ack"] = set()
+    game["investigated"] = set()
+    game["known_discards"] = {}
+    game["known_top"] = {}
+    game["role_evidence"] = inference.new_evidence(game)
+    game["log"] = GameLog(tail=game.log.tail)
+    game["started"] = True
+    invalidate_index(game)
+    derived(game)
+    touch(game)
+
+
+def free_seat(players: dict) -> int:
+    """The lowest seat index nobody in ``players`` holds (seats index RoleEvidence's deal columns)."""
+    taken = {p["seat"] for p in players.values()}
+    return next(seat for seat in range(len(players) + 1) if seat not in taken)
+
+
+def joining_seat(game: dict) -> int:
+    """The seat for a player joining ``game``: the lowest free one in the lobby, and once the
+    roles are dealt one past every seat in the deal, so no RoleEvidence column changes hands."""
+    if not game.get("started"):
+        return free_seat(game["players"])
+    return max([player_count(game) - 1] + [p["seat"] for p in game["players"].values()]) + 1
+
+
+def add_ai_players(players: dict, count: int, strategy: str | None = None) -> list:
+    ai_ids = []
+    used_names = {p["name"] for p in players.values() if "name" in p}
+    for i in range(count):
+        base = random.choice(AI_NAMES)
+        name = base
+        suffix = 2
+        while name in used_names:
+            name = f"{base} {suffix}"
+            suffix += 1
+        used_names.add(name)
+        ai_id = f"ai_{secrets.token_urlsafe(8)}"
+        players[ai_id] = Player(name=name, is_ai=True, seat=free_seat(players), strategy=strategy)
+        ai_ids.append(ai_id)
+    return ai_ids
+
+
+def build_deck() -> PolicyPile:
+    deck = PolicyPile(["liberal"] * 6 + ["fascist"] * 11)
+    random.shuffle(deck)
+    return deck
+
+
+def assign_roles(player_ids: list) -> dict:
+    count = len(player_ids)
+    dist = ROLE_COUNTS.get(count)
+    if not dist:
+        raise ValueError(f"Unsupported player count: {count}")
+    roles = (["liberal"] * dist["liberal"]) + (["fascist"] * dist["fascist"]) + ["hitler"]
+    random.shuffle(roles)
+    return {pid: role for pid, role in zip(player_ids, roles)}
+
+
+def party_for_role(role: str) -> str:
+    return "fascist" if role in ("fascist", "hitler") else "liberal"
+
+
+def derived(game: Game) -> GameIndex:
+    """The game's derived lookups, built on first use after each invalidation."""
+    cached = game.index
+    if cached is not None:
+        return cached
+    roles = game.roles
+    alive = tuple(pid for pid, p in game.players.items() if p.alive)
+    fascists = tuple(pid for pid, r in roles.items() if r == "fascist")
+    hitler = next((pid for pid, r in roles.items() if r == "hitler"), None)
+    cached = game.index = GameIndex(
+        alive=alive,
+        alive_set=frozenset(alive),
+        hitler_id=hitler,
+        fascists=fascists,
+        team=tuple(pid for pid, r in roles.items() if r in ("fascist", "hitler")),
+        order_pos={pid: i for i, pid in enumerate(game.order)},
+        players_view=[{"id": pid, **p} for pid, p in game.players.items()],
+    )
+    return cached
+
+
+def invalidate_index(game: Game) -> None:
+    """Call after changing players (alive, names, seats), roles or the order."""
+    game.index = None
+    game.roster_version += 1
+
+
+def hitler_id(game: Game) -> str | None:
+    return derived(game).hitler_id
+
+
+def is_ai_player(game: Game, pid: str) -> bool:
+    player = game.players.get(pid)
+    return bool(player and player.is_ai)
+
+
+def is_alive(game: Game, pid: str) -> bool:
+    player = game.players.get(pid)
+    return player is None or player.alive
+
+
+def known_fascists_for(game: Game, pid: str) -> tuple:
+    role = game.roles.get(pid)
+    if role == "fascist":
+        return derived(game).team
+    if role == "hitler" and player_count(game) <= 6:
+        return derived(game).fascists
+    return ()
+
+
+def alive_ids(game: Game) -> tuple:
+    return derived(game).alive
+
+
+def player_count(game: dict) -> int:
+    return int(game.get("player_count") or len(game.get("players", {})))
+
+
+def fascist_track_key(count: int) -> str:
+    if count <= 6:
+        return "5-6"
+    if count <= 8:
+        return "7-8"
+    return "9-10"
+
+
+def fascist_power_for(game: dict, fascist_policies: int) -> str | None:
+    if fascist_policies <= 0 or fascist_policies >= 6:
+        return None
+    key = fascist_track_key(player_count(game))
+    return FASCIST_POWERS[key][fascist_policies - 1]
+
+
+def eligible_chancellors(game: Game) -> tuple:
+    cached = derived(game)
+    president_id = game.get("president_id")
+    last_president_id = game.get("last_president_id")
+    last_chancellor_id = game.get("last_chancellor_id")
+    # Term changes only move these three ids, so they key the cached answer.
+    key = (president_id, last_president_id, last_chancellor_id)
+    if cached.eligible_key == key:
+        return cached.eligible
+
+    alive = cached.alive
+    excluded = {president_id}
+    if len(alive) <= 5:
+        excluded.add(last_chancellor_id)
+    else:
+        excluded.update({last_president_id, last_chancellor_id})
+
+    cached.eligible = tuple(pid for pid in alive if pid not in excluded)
+    cached.eligible_key = key
+    return cached.eligible
+
+
+def executive_targets(game: dict) -> list:
+    president_id = game.get("president_id")
+    targets = [pid for pid in alive_ids(game) if pid != president_id]
+    if (game.get("executive_action") or {}).get("type") == "investigate":
+        targets = [pid for pid in targets if pid not in game.get("investigated", set())]
+    return targets
+
+
+def touch(game: dict) -> None:
+    game["version"] = int(game.get("version", 0)) + 1
+
+
+def announce(game: dict, message: str) -> None:
+    seq = int(game.get("announcement_seq", 0)) + 1
+    game["announcement_seq"] = seq
+    game["announcement"] = {"id": seq, "message": message}
+    game.log.append({"id": seq, "message": message})
+    touch(game)
+
+
+def set_private_info(game: dict, pid: str, info_type: str, data: dict) -> None:
+    seq = int(game.get("private_seq", 0)) + 1
+    game["private_seq"] = seq
+    game.setdefault("private_info", {})[pid] = {"id": seq, "type": info_type, "data": data}
+    touch(game)
+
+
+def default_stats() -> dict:
+    return {
+        "elections": 0,
+        "failed_elections": 0,
+        "successful_elections": 0,
+        "executions": 0,
+        "investigations": 0,
+        "special_elections": 0,
+        "policy_peeks": 0,
+        "vetos_requested": 0,
+        "vetos_approved": 0,
+    }
+
+
+def ensure_stats(game: dict) -> dict:
+    if game.get("stats") is None:
+        game["stats"] = default_stats()
+    return game["stats"]
+
+
+def ensure_policy_deck(game: dict, count: int) -> None:
+    deck = game.get("policy_deck", PolicyPile())
+    discard = game.get("policy_discard", PolicyPile())
+    if len(deck) < count and discard:
+        deck.extend(discard)
+        game["policy_discard"] = PolicyPile()
+        # Derived from the game's seed and version, so replaying the same actions reshuffles identically.
+        random.Random(f"{game.get('seed', 0)}:{game.get('version', 0)}").shuffle(deck)
+        belief.note_reshuffle(game)
+    game["policy_deck"] = deck
+
+
+def draw_policies(game: dict, count: int) -> list:
+    ensure_policy_deck(game, count)
+    deck = game["policy_deck"]
+    drawn = deck[:count]
+    del deck[:count]
+    belief.note_draw(game, len(drawn))
+    return drawn
+
+
+def reset_term_limits(game: dict) -> None:
+    game["last_president_id"] = None
+    game["last_chancellor_id"] = None
+
+
+def reset_election_tracker(game: dict) -> None:
+    game["election_tracker"] = 0
+
+
+def clear_government(game: dict) -> None:
+    game["nominee_id"] = None
+    game["votes"] = {}
+    game["pending_policies"] = []
+    game["veto_requested"] = False
+    game["veto_denied"] = False
+
+
+def check_win(game: dict) -> None:
+    if game.get("liberal_policies", 0) >= 5:
+        game["winner"] = "liberal"
+        game["phase"] = "game_over"
+        game["victory_reason"] = "liberal_policies"
+        announce(game, "Liberals win by enacting five Liberal Policies.")
+        return
+    if game.get("fascist_policies", 0) >= 6:
+        game["winner"] = "fascist"
+        game["phase"] = "game_over"
+        game["victory_reason"] = "fascist_policies"
+        announce(game, "Fascists win by enacting six Fascist Policies.")
+
+
+def apply_policy(game: dict, policy: str, anarchy: bool = False) -> None:
+    game["executive_action"] = None
+    if not anarchy:
+        inference.note_policy(game, policy)
+        pres = game.get("president_id")
+        chanc = game.get("chancellor_id")
+        delta = 1 if policy == "fascist" else -1
+        for pid in (pres, chanc):
+            if pid:
+                game.setdefault("suspicion", {})[pid] = game.get("suspicion", {}).get(pid, 0) + delta
+    if policy == "liberal":
+        game["liberal_policies"] = int(game.get("liberal_policies", 0)) + 1
+        announce(game, "A Liberal Policy was enacted.")
+        reset_election_tracker(game)
+        check_win(game)
+        return
+
+    game["fascist_policies"] = int(game.get("fascist_policies", 0)) + 1
+    announce(game, "A Fascist Policy was enacted.")
+    reset_election_tracker(game)
+    check_win(game)
+    if game.get("winner"):
+        return
+
+    if game.get("fascist_policies", 0) >= 5:
+        game["veto_unlocked"] = True
+
+    if anarchy:
+        return
+
+    power = fascist_power_for(game, game.get("fascist_policies", 0))
+    if power:
+        game["executive_action"] = {"type": power}
+        game["phase"] = "executive_action"
+
+
+def start_nomination(game: dict) -> None:
+    clear_government(game)
+    game["phase"] = "nominate"
+
+
+def start_vote(game: dict, nominee_id: str) -> None:
+    game["nominee_id"] = nominee_id
+    game["votes"] = {}
+    game["phase"] = "vote"
+    announce(game, f"{game['players'][game['president_id']]['name']} nominated "
+                   f"{game['players'][nominee_id]['name']} for Chancellor.")
+
+
+def begin_legislative_session(game: dict) -> None:
+    game["pending_policies"] = draw_policies(game, 3)
+    game["veto_requested"] = False
+    game["veto_denied"] = False
+    game["phase"] = "legislative_president"
+
+
+def enact_anarchy(game: dict) -> None:
+    policy = draw_policies(game, 1)
+    if policy:
+        announce(game, "Anarchy! The top policy was enacted.")
+        reset_term_limits(game)
+        apply_policy(game, policy[0], anarchy=True)
+    reset_election_tracker(game)
+
+
+def resolve_vote(game: dict) -> None:
+    alive = alive_ids(game)
+    votes = game.get("votes", {})
+    yes_votes = sum(1 for pid in alive if votes.get(pid) is True)
+    no_votes = sum(1 for pid in alive if votes.get(pid) is False)
+    passed = yes_votes > no_votes
+    nominee_id = game.get("nominee_id")
+    stats = ensure_stats(game)
+    stats["elections"] += 1
+    inference.note_vote(game)
+
+    game["last_vote"] = {"yes": yes_votes, "no": no_votes, "votes": dict(votes)}
+
+    if not passed:
+        stats["failed_elections"] += 1
+        announce(game, f"Election failed ({yes_votes} Ja / {no_votes} Nein).")
+        game["election_tracker"] = int(game.get("election_tracker", 0)) + 1
+        clear_government(game)
+        advance_presidency(game)
+        if game.get("election_tracker", 0) >= 3:
+            enact_anarchy(game)
+            if game.get("winner"):
+                return
+        start_nomination(game)
+        return
+
+    announce(game, f"Election passed ({yes_votes} Ja / {no_votes} Nein).")
+    stats["successful_elections"] += 1
+    reset_election_tracker(game)
+    game["chancellor_id"] = nominee_id
+    game["last_president_id"] = game.get("president_id")
+    game["last_chancellor_id"] = nominee_id
+    game["nominee_id"] = None
+    game["votes"] = {}
+
+    if game.get("fascist_policies", 0) >= 3 and game.get("roles", {}).get(nominee_id) == "hitler":
+        game["winner"] = "fascist"
+        game["phase"] = "game_over"
+        game["victory_reason"] = "hitler_elected"
+        announce(game, "Hitler was elected Chancellor. Fascists win.")
+        return
+    if game.get("fascist_policies", 0) >= 3:
+        announce(game, "The Chancellor is not Hitler.")
+        inference.note_not_hitler(game, nominee_id)
+
+    begin_legislative_session(game)
+
+
+def advance_presidency(game: dict) -> None:
+    normalize_order(game)
+    order = game.get("order") or list(game.get("players", {}).keys())
+    if not order:
+        return
+    return_id = game.get("special_election_return_id")
+    if return_id and return_id in order:
+        game["special_election_return_id"] = None
+        return_idx = derived(game).order_pos[return_id]
+        game["president_index"] = return_idx
+        game["president_id"] = return_id
+        return
+
+    current_president = game.get("president_id")
+    order_pos = derived(game).order_pos
+    if current_president in order_pos:
+        current_idx = order_pos[current_president]
+        next_idx = (current_idx + 1) % len(order)
+    else:
+        next_idx = 0
+
+    game["president_index"] = next_idx
+    game["president_id"] = order[next_idx]
+
+
+def normalize_order(game: Game) -> None:
+    cached = derived(game)
+    if cached.order_normalized and game.president_id in cached.alive_set:
+        return
+    players = cached.alive
+    seen = set()
+    order = []
+    for pid in (game.get("order") or []):
+        if pid in cached.alive_set and pid not in seen:
+            order.append(pid)
+            seen.add(pid)
+    for pid in players:
+        if pid not in seen:
+            order.append(pid)
+            seen.add(pid)
+    changed = order != game.get("order")
+    game["order"] = order
+    if game.get("president_id") not in order:
+        game["president_index"] = 0
+        game["president_id"] = order[0] if order else None
+        changed = True
+    if changed:
+        invalidate_index(game)
+        touch(game)
+    derived(game).order_normalized = True
+
+
+def waiting_on(game: dict) -> list:
+    """Players the game is currently waiting on, in seat order of ``players``."""
+    phase = game.get("phase")
+    if phase in (None, "lobby", "game_over"):
+        return []
+    if phase == "vote":
+        votes = game.get("votes", {})
+        return [pid for pid in alive_ids(game) if pid not in votes]
+    actor = game.get("chancellor_id") if phase == "legislative_chancellor" else game.get("president_id")
+    return [actor] if actor and is_alive(game, actor) else []
+
+
+def pending_action(game: dict, pid: str) -> dict | None:
+    """The prompt shown to ``pid``: what they must do now and the options they have."""
+    if not is_alive(game, pid) or game.get("phase") == "game_over":
+        return None
+
+    phase = game.get("phase")
+    if phase == "nominate" and pid == game.get("president_id"):
+        return {
+            "type": "nominate",
+            "eligible": eligible_chancellors(game),
+        }
+    if phase == "vote" and pid not in game.get("votes", {}):
+        return {"type": "vote"}
+    if phase == "legislative_president" and pid == game.get("president_id"):
+        return {
+            "type": "president_discard",
+            "policies": list(game.get("pending_policies", [])),
+        }
+    if phase == "legislative_chancellor" and pid == game.get("chancellor_id"):
+        return {
+            "type": "chancellor_enact",
+            "policies": list(game.get("pending_policies", [])),
+            "veto_available": bool(game.get("veto_unlocked")),
+            "veto_allowed": not bool(game.get("veto_denied")),
+        }
+    if phase == "veto_pending" and pid == game.get("president_id"):
+        return {"type": "veto_decision"}
+    if phase == "executive_action" and pid == game.get("president_id"):
+        return {
+            "type": "executive",
+            "power": (game.get("executive_action") or {}).get("type"),
+            "targets": executive_targets(game),
+        }
+    return None
+
+
+def legal_actions(game: dict, pid: str) -> list:
+    """Every concrete action ``pid`` may pass to ``apply`` right now."""
+    prompt = pending_action(game, pid)
+    if not prompt:
+        return []
+    kind = prompt["type"]
+    if kind == "nominate":
+        return [{"type": kind, "player_id": pid, "chancellor_id": c} for c in prompt["eligible"]]
+    if kind == "vote":
+        return [{"type": kind, "player_id": pid, "vote": v} for v in (True, False)]
+    if kind == "president_discard":
+        return [{"type": kind, "player_id": pid, "discard_index": i} for i in range(len(prompt["policies"]))]
+    if kind == "chancellor_enact":
+        actions = [{"type": kind, "player_id": pid, "enact_index": i} for i in range(len(prompt["policies"]))]
+        if prompt["veto_available"] and prompt["veto_allowed"]:
+            actions.append({"type": kind, "player_id": pid, "veto": True})
+        return actions
+    if kind == "veto_decision":
+        return [{"type": kind, "player_id": pid, "approve": v} for v in (True, False)]
+    if prompt["power"] == "policy_peek" or not prompt["targets"]:
+        return [{"type": kind, "player_id": pid, "target_id": None}]
+    return [{"type": kind, "player_id": pid, "target_id": t} for t in prompt["targets"]]
+
+
+def apply(game: dict, action: dict) -> None:
+    """Validate ``action`` against the current state and perform it.
+
+    Raises ``IllegalAction`` (with an HTTP-style status) and leaves the game
+    untouched when the action is not allowed.
+    """
+    if not game.get("started"):
+        raise IllegalAction("Game not started.")
+    kind = action.get("type")
+    handler = _HANDLERS.get(kind)
+    if handler is None:
+        raise IllegalAction(f"Unknown action: {kind}.")
+    before = game.get("version")
+    handler(game, action.get("player_id"), action)
+    touch(game)
+    applied = game.get("applied")
+    if applied is not None:
+        applied.append((before, game.get("version"), action))
+
+
+def _nominate(game: dict, pid: str, action: dict) -> None:
+    if game.get("phase") != "nominate":
+        raise IllegalAction("Not in nomination phase.")
+    if pid != game.get("president_id"):
+        raise IllegalAction("Only the President can nominate.", 403)
+    if not is_alive(game, pid):
+        raise IllegalAction("President is not alive.", 403)
+
+    nominee_id = action.get("chancellor_id")
+    if not nominee_id:
+        raise IllegalAction("Chancellor is required.")
+    if nominee_id not in game["players"]:
+        raise IllegalAction("Player not found.")
+    if nominee_id not in eligible_chancellors(game):
+        raise IllegalAction("Chancellor is not eligible.")
+
+    start_vote(game, nominee_id)
+
+
+def _vote(game: dict, pid: str, action: dict) -> None:
+    if game.get("phase") != "vote":
+        raise IllegalAction("Not in voting phase.")
+    if pid not in game["players"]:
+        raise IllegalAction("Not in this lobby.", 403)
+    if not is_alive(game, pid):
+        raise IllegalAction("You are not alive.", 403)
+    if pid in game.get("votes", {}):
+        raise IllegalAction("Vote already cast.")
+    if action.get("vote") not in (True, False):
+        raise IllegalAction("Vote must be Ja or Nein.")
+
+    game.setdefault("votes", {})[pid] = bool(action["vote"])
+    if len(game["votes"]) == len(alive_ids(game)):
+        resolve_vote(game)
+
+
+def _president_discard(game: dict, pid: str, action: dict) -> None:
+    if game.get("phase") != "legislative_president":
+        raise IllegalAction("Not in President legislative phase.")
+    if pid != game.get("president_id"):
+        raise IllegalAction("Only the President can discard.", 403)
+
+    discard_index = action.get("discard_index")
+    if discard_index is None:
+        raise IllegalAction("Discard choice required.")
+
+    policies = list(game.get("pending_policies", []))
+    if len(policies) != 3:
+        raise IllegalAction("No policies to discard.")
+    if not isinstance(discard_index, int) or discard_index < 0 or discard_index >= len(policies):
+        raise IllegalAction("Invalid discard choice.")
+
+    discarded = policies.pop(discard_index)
+    game.setdefault("policy_discard", []).append(discarded)
+    belief.note_discard(game, [pid], [discarded])
+    game["pending_policies"] = policies
+    game["phase"] = "legislative_chancellor"
+
+
+def _chancellor_enact(game: dict, pid: str, action: dict) -> None:
+    if game.get("phase") != "legislative_chancellor":
+        raise IllegalAction("Not in Chancellor legislative phase.")
+    if pid != game.get("chancellor_id"):
+        raise IllegalAction("Only the Chancellor can enact.", 403)
+
+    if action.get("veto"):
+        if not game.get("veto_unlocked"):
+            raise IllegalAction("Veto power not unlocked.")
+        if game.get("veto_denied"):
+            raise IllegalAction("Veto already denied.")
+        ensure_stats(game)["vetos_requested"] += 1
+        inference.note_veto_request(game)
+        game["veto_requested"] = True
+        game["phase"] = "veto_pending"
+        announce(game, "Chancellor requested a veto.")
+        return
+
+    enact_index = action.get("enact_index")
+    if enact_index is None:
+        raise IllegalAction("Enact choice required.")
+
+    policies = list(game.get("pending_policies", []))
+    if len(policies) != 2:
+        raise IllegalAction("No policies to enact.")
+    if not isinstance(enact_index, int) or enact_index < 0 or enact_index >= len(policies):
+        raise IllegalAction("Invalid enact choice.")
+
+    enacted = policies.pop(enact_index)
+    game.setdefault("policy_discard", []).extend(policies)
+    # The President saw both cards, so seeing one enacted tells them where the other went.
+    belief.note_discard(game, [game.get("president_id"), pid], policies)
+    game["pending_policies"] = []
+    apply_policy(game, enacted)
+
+    if game.get("phase") == "executive_action" or game.get("winner"):
+        return
+
+    advance_presidency(game)
+    start_nomination(game)
+
+
+def _veto_decision(game: dict, pid: str, action: dict) -> None:
+    if game.get("phase") != "veto_pending":
+        raise IllegalAction("No veto pending.")
+    if pid != game.get("president_id"):
+        raise IllegalAction("Only the President can decide the veto.", 403)
+
+    if not action.get("approve"):
+        game["veto_requested"] = False
+        game["veto_denied"] = True
+        game["phase"] = "legislative_chancellor"
+        announce(game, "Veto denied. Chancellor must enact a policy.")
+        return
+
+    ensure_stats(game)["vetos_approved"] += 1
+    game.setdefault("policy_discard", []).extend(game.get("pending_policies", []))
+    belief.note_discard(game, [pid, game.get("chancellor_id")], game.get("pending_policies", []))
+    game["pending_policies"] = []
+    game["veto_requested"] = False
+    game["veto_denied"] = False
+    game["election_tracker"] = int(game.get("election_tracker", 0)) + 1
+    announce(game, "Veto approved. The agenda was discarded.")
+    if game.get("election_tracker", 0) >= 3:
+        enact_anarchy(game)
+        if game.get("winner"):
+            return
+    advance_presidency(game)
+    start_nomination(game)
+
+
+def _executive(game: dict, pid: str, action: dict) -> None:
+    if game.get("phase") != "executive_action":
+        raise IllegalAction("No executive action pending.")
+    if pid != game.get("president_id"):
+        raise IllegalAction("Only the President can act.", 403)
+
+    power = (game.get("executive_action") or {}).get("type")
+    target_id = action.get("target_id")
+    # A power with nobody left to target (e.g. everyone already investigated) is skipped.
+    skipped = power in ("investigate", "special_election", "execution") and not executive_targets(game)
+
+    if skipped:
+        pass
+    elif power == "policy_peek":
+        ensure_policy_deck(game, 3)
+        top = game.get("policy_deck", [])[:3]
+        belief.note_peek(game, pid, top)
+        set_private_info(game, pid, "policy_peek", {"policies": top})
+        ensure_stats(game)["policy_peeks"] += 1
+        announce(game, "President used Policy Peek.")
+    elif power == "investigate":
+        if not target_id or target_id not in game["players"]:
+            raise IllegalAction("Target required.")
+        if not is_alive(game, target_id):
+            raise IllegalAction("Target is not alive.")
+        if target_id in game.get("investigated", set()):
+            raise IllegalAction("That player has already been investigated.")
+        party = party_for_role(game["roles"][target_id])
+        set_private_info(game, pid, "investigation", {"target_id": target_id, "party": party})
+        inference.note_investigation(game, pid, target_id, party)
+        game.setdefault("investigated", set()).add(target_id)
+        ensure_stats(game)["investigations"] += 1
+        announce(game, f"President investigated {game['players'][target_id]['name']}.")
+    elif power == "special_election":
+        if not target_id or target_id not in game["players"]:
+            raise IllegalAction("Target required.")
+        if not is_alive(game, target_id):
+            raise IllegalAction("Target is not alive.")
+        ensure_stats(game)["special_elections"] += 1
+        order = game.order
+        order_pos = derived(game).order_pos
+        if game.get("president_id") in order_pos:
+            idx = order_pos[game.get("president_id")]
+            return_id = order[(idx + 1) % len(order)]
+        else:
+            return_id = order[0] if order else None
+        game["special_election_return_id"] = return_id
+        game["president_id"] = target_id
+        game["president_index"] = order_pos.get(target_id, 0)
+        announce(game, f"Special Election: {game['players'][target_id]['name']} is next President.")
+        game["executive_action"] = None
+        start_nomination(game)
+        return
+    elif power == "execution":
+        if not target_id or target_id not in game["players"]:
+            raise IllegalAction("Target required.")
+        if target_id == pid:
+            raise IllegalAction("Cannot execute yourself.")
+        if not is_alive(game, target_id):
+            raise IllegalAction("Target is not alive.")
+        ensure_stats(game)["executions"] += 1
+        game["players"][target_id]["alive"] = False
+        invalidate_index(game)
+        announce(game, f"{game['players'][target_id]['name']} was executed.")
+        if game.get("roles", {}).get(target_id) == "hitler":
+            game["winner"] = "liberal"
+            game["phase"] = "game_over"
+            game["victory_reason"] = "hitler_executed"
+            announce(game, "Hitler was executed. Liberals win.")
+            return
+        inference.note_execution(game, target_id)
+    else:
+        raise IllegalAction("Unknown executive action.")
+
+    game["executive_action"] = None
+    if game.get("winner"):
+        return
+    advance_presidency(game)
+    start_nomination(game)
+
+
+_HANDLERS = {
+    "nominate": _nominate,
+    "vote": _vote,
+    "president_discard": _president_discard,
+    "chancellor_enact": _chancellor_enact,
+    "veto_decision": _veto_decision,
+    "executive": _executive,
+}
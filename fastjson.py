@@ -0,0 +1,111 @@
+"""JSON encoding for game responses.
+
+Uses orjson when it is installed and the standard library otherwise; both
+produce the same compact output. Game types encode directly: sets as sorted
+lists, ``Record``s as their fields, policy piles as policy names and a
+``GameLog`` as its recent tail.
+
+``Fragment`` wraps JSON that was encoded once (a roster, an archived log
+page) so later responses embed the text instead of re-encoding the objects.
+``JSONProvider`` plugs all of this into Flask's ``jsonify``.
+"""
+import json
+import secrets
+
+from flask.json.provider import JSONProvider as _FlaskJSONProvider
+
+from model import GameLog, PolicyPile, Record
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+class Fragment:
+    """Already-encoded JSON, embedded verbatim wherever the object appears."""
+
+    __slots__ = ("encoded",)
+
+    def __init__(self, value=None, encoded: str | None = None):
+        self.encoded = encoded if encoded is not None else dumps(value)
+
+    def __eq__(self, other):
+        return isinstance(other, Fragment) and other.encoded == self.encoded
+
+    def __hash__(self):
+        return hash(self.encoded)
+
+    def __repr__(self):
+        return f"Fragment({self.encoded[:40]!r})"
+
+
+def _default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, PolicyPile):
+        return list(obj)
+    if isinstance(obj, GameLog):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Fragments become marker strings while encoding and are swapped for their text
+# afterwards. The nonce keeps a player-typed string from ever matching one.
+_NONCE = secrets.token_hex(8)
+
+
+def _encode(obj, encode) -> str:
+    fragments = []
+
+    def default(value):
+        if isinstance(value, Fragment):
+            fragments.append(value.encoded)
+            return f"\x00{_NONCE}:{len(fragments) - 1}\x00"
+        return _default(value)
+
+    text = encode(obj, default)
+    for i, encoded in enumerate(fragments):
+        text = text.replace(f'"\\u0000{_NONCE}:{i}\\u0000"', encoded, 1)
+    return text
+
+
+if orjson is not None:
+    # Dataclass and non-str-key handling match what the stdlib fallback produces.
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def _backend(obj, default) -> str:
+        return orjson.dumps(obj, default=default, option=_OPTIONS).decode()
+else:
+    def _backend(obj, default) -> str:
+        return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps(obj) -> str:
+    return _encode(obj, _backend)
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JSONProvider(_FlaskJSONProvider):
+    """Flask JSON provider backed by ``dumps``; install with ``app.json = JSONProvider(app)``."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
@@ -0,0 +1,288 @@
+"""Bayesian role inference for the AI.
+
+Every way of dealing the hidden roles to the seats is enumerated once per player
+count (840 deals for 10 players). Each game keeps one log-likelihood per deal,
+updated by the engine on public events: votes, enacted policies, veto
+requests, executions and "the Chancellor is not Hitler". An AI's posterior is
+that vector restricted to the deals consistent with what it privately knows:
+its own role, the fascists it was shown, and its investigation results.
+
+The likelihoods model how players (the AI in ai.py, mostly) behave; the
+constants below are those assumptions. NumPy is optional: without it
+``new_evidence`` returns None and the AI falls back to the scalar
+``suspicion`` counter.
+"""
+import base64
+from functools import lru_cache
+from itertools import combinations
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+import belief
+
+ROLE_CODES = {"liberal": 0, "fascist": 1, "hitler": 2}
+
+# Chance a government with a fascist in it enacts a fascist policy when the draw allows either.
+FASCIST_ENACTS = 0.85
+# Ja-vote rates: a fascist for a government holding a fascist, a fascist otherwise, and a liberal.
+FASCIST_JA_WITH_ALLY = 0.9
+FASCIST_JA_OTHERWISE = 0.5
+LIBERAL_JA = 0.75
+# Chance a fascist President executes a liberal (a liberal President's pick carries no signal).
+FASCIST_EXECUTES_LIBERAL = 0.9
+# Floor on any modelled probability, so one odd move never rules a deal out completely.
+FLOOR = 0.02
+
+
+@lru_cache(maxsize=None)
+def deals(player_count: int, fascists: int) -> "np.ndarray":
+    """Every role assignment as rows of ROLE_CODES, one column per seat."""
+    rows = []
+    seats = range(player_count)
+    for hitler in seats:
+        others = [s for s in seats if s != hitler]
+        for team in combinations(others, fascists):
+            row = [0] * player_count
+            row[hitler] = 2
+            for s in team:
+                row[s] = 1
+            rows.append(row)
+    table = np.array(rows, dtype=np.int8)
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=None)
+def _tables(player_count: int, fascists: int) -> tuple:
+    """Deal table, fascist-team mask and float team/Hitler indicators, shared by every game of this size."""
+    roles = deals(player_count, fascists)
+    team = roles > 0
+    # Float copies for the posterior marginals (matmul is much faster on floats).
+    tables = (roles, team, team.astype(float), (roles == 2).astype(float))
+    for table in tables:
+        table.flags.writeable = False
+    return tables
+
+
+class RoleEvidence:
+    """Public log-likelihood of every deal, plus each player's private investigation results."""
+
+    __slots__ = ("roles", "team", "team_f", "hitler_f", "loglik", "investigations", "_masks")
+
+    def __init__(self, player_count: int, fascists: int):
+        self.roles, self.team, self.team_f, self.hitler_f = _tables(player_count, fascists)
+        self.loglik = np.zeros(len(self.roles))
+        # observer seat -> {target seat: is fascist team}
+        self.investigations: dict = {}
+        self._masks: dict = {}
+
+    def __deepcopy__(self, memo):
+        # The deal tables are read-only and shared; only the evidence itself is copied.
+        twin = RoleEvidence.__new__(RoleEvidence)
+        twin.roles, twin.team, twin.team_f, twin.hitler_f = self.roles, self.team, self.team_f, self.hitler_f
+        twin.loglik = self.loglik.copy()
+        twin.investigations = {seat: dict(found) for seat, found in self.investigations.items()}
+        twin._masks = {}
+        return twin
+
+    def mask(self, known: tuple) -> "np.ndarray":
+        """Deals consistent with ``known``, a tuple of (seat, role code) pairs; cached."""
+        mask = self._masks.get(known)
+        if mask is None:
+            mask = np.ones(len(self.roles), dtype=bool)
+            for seat, code in known:
+                mask &= self.roles[:, seat] == code
+            self._masks[known] = mask
+        return mask
+
+    def _add(self, likelihood) -> None:
+        self.loglik += np.log(np.maximum(likelihood, FLOOR))
+
+    def on_team(self, seat: int | None) -> "np.ndarray":
+        """Whether ``seat`` is on the fascist team in each deal; a seat of None (not dealt) never is."""
+        if seat is None:
+            return np.zeros(len(self.roles), dtype=bool)
+        return self.team[:, seat]
+
+    def vote(self, ballots: dict, president: int | None, chancellor: int | None) -> None:
+        seats = np.fromiter(ballots, dtype=np.intp, count=len(ballots))
+        ja = np.fromiter(ballots.values(), dtype=bool, count=len(ballots))
+        gov_fascist = self.on_team(president) | self.on_team(chancellor)
+        p_ja = np.where(
+            self.team[:, seats],
+            np.where(gov_fascist[:, None], FASCIST_JA_WITH_ALLY, FASCIST_JA_OTHERWISE),
+            LIBERAL_JA,
+        )
+        self.loglik += np.log(np.maximum(np.where(ja, p_ja, 1.0 - p_ja), FLOOR)).sum(axis=1)
+
+    def policy(self, president: int | None, chancellor: int | None, fascist: bool, p_fff: float,
+               p_lll: float) -> None:
+        gov_fascist = self.on_team(president) | self.on_team(chancellor)
+        p_fascist = np.where(gov_fascist, p_fff + (1.0 - p_fff - p_lll) * FASCIST_ENACTS, p_fff)
+        self._add(p_fascist if fascist else 1.0 - p_fascist)
+
+    def veto_request(self, chancellor: int | None, p_fff: float, p_lll: float) -> None:
+        # Liberals veto an all-fascist hand, fascists an all-liberal one.
+        self._add(np.where(self.on_team(chancellor), p_lll, p_fff))
+
+    def execution(self, president: int | None, target: int | None) -> None:
+        fascist_pick = np.where(self.on_team(target), 1.0 - FASCIST_EXECUTES_LIBERAL, FASCIST_EXECUTES_LIBERAL)
+        self._add(np.where(self.on_team(president), fascist_pick, 0.5))
+
+    def not_hitler(self, seat: int | None) -> None:
+        if seat is not None:
+            self.loglik[self.roles[:, seat] == 2] = -np.inf
+
+    def investigation(self, observer: int, target: int, fascist: bool) -> None:
+        self.investigations.setdefault(observer, {})[target] = fascist
+        self._masks.clear()
+
+    def posterior(self, mask) -> "np.ndarray":
+        weights = np.where(mask, self.loglik, -np.inf)
+        top = weights.max()
+        if not np.isfinite(top):
+            # Public evidence contradicts everything this player knows; trust the private part.
+            weights = np.where(mask, 0.0, -np.inf)
+            top = 0.0
+        weights = np.exp(weights - top)
+        return weights / weights.sum()
+
+
+def deal_seat(game: dict, pid: str | None) -> int | None:
+    """``pid``'s column in the deal table; None for a player who joined after the deal (a liberal)."""
+    player = game.get("players", {}).get(pid) if pid else None
+    if player is None or player["seat"] >= (game.get("player_count") or len(game["players"])):
+        return None
+    return player["seat"]
+
+
+def new_evidence(game: dict) -> RoleEvidence | None:
+    if np is None or not game.get("roles"):
+        return None
+    count = len(game["players"])
+    fascists = sum(1 for role in game["roles"].values() if role == "fascist")
+    return RoleEvidence(count, fascists)
+
+
+def encode_evidence(evidence: RoleEvidence | None) -> dict | None:
+    """JSON-safe form of ``evidence`` for persistence; the log-likelihoods (-inf included) as base64 float64s."""
+    if evidence is None:
+        return None
+    return {
+        "loglik": base64.b64encode(evidence.loglik.astype("<f8").tobytes()).decode("ascii"),
+        "investigations": {
+            str(observer): {str(target): fascist for target, fascist in found.items()}
+            for observer, found in evidence.investigations.items()
+        },
+    }
+
+
+def decode_evidence(game: dict, data: dict | None) -> RoleEvidence | None:
+    """``game``'s evidence from ``encode_evidence`` output; the prior when there is none or it does not fit."""
+    evidence = new_evidence(game)
+    if evidence is None or not data:
+        return evidence
+    loglik = np.frombuffer(base64.b64decode(data["loglik"]), dtype="<f8")
+    if len(loglik) != len(evidence.loglik):
+        return evidence
+    evidence.loglik = loglik.astype(float)
+    evidence.investigations = {
+        int(observer): {int(target): bool(fascist) for target, fascist in found.items()}
+        for observer, found in (data.get("investigations") or {}).items()
+    }
+    return evidence
+
+
+def _evidence(game: dict) -> RoleEvidence | None:
+    return game.get("role_evidence")
+
+
+def note_vote(game: dict) -> None:
+    evidence = _evidence(game)
+    # With anarchy one failure away, everyone votes Ja and the ballot says nothing.
+    if evidence is None or int(game.get("election_tracker", 0)) >= 2:
+        return
+    # Late joiners are liberals in every deal, so their ballots say nothing about it.
+    ballots = {deal_seat(game, pid): vote for pid, vote in game.get("votes", {}).items()}
+    ballots.pop(None, None)
+    evidence.vote(ballots, deal_seat(game, game.get("president_id")), deal_seat(game, game.get("nominee_id")))
+
+
+def note_policy(game: dict, policy: str) -> None:
+    evidence = _evidence(game)
+    if evidence is None:
+        return
+    odds = belief.liberal_count_odds(game)
+    evidence.policy(deal_seat(game, game.get("president_id")), deal_seat(game, game.get("chancellor_id")),
+                    policy == "fascist", odds[0], odds[3])
+
+
+def note_veto_request(game: dict) -> None:
+    evidence = _evidence(game)
+    if evidence is None:
+        return
+    odds = belief.liberal_count_odds(game)
+    evidence.veto_request(deal_seat(game, game.get("chancellor_id")), odds[0], odds[3])
+
+
+def note_execution(game: dict, target_id: str) -> None:
+    evidence = _evidence(game)
+    if evidence is None:
+        return
+    evidence.execution(deal_seat(game, game.get("president_id")), deal_seat(game, target_id))
+    evidence.not_hitler(deal_seat(game, target_id))
+
+
+def note_not_hitler(game: dict, pid: str) -> None:
+    evidence = _evidence(game)
+    if evidence is not None:
+        evidence.not_hitler(deal_seat(game, pid))
+
+
+def note_investigation(game: dict, observer_id: str, target_id: str, party: str) -> None:
+    evidence = _evidence(game)
+    observer, target = deal_seat(game, observer_id), deal_seat(game, target_id)
+    if evidence is not None and observer is not None and target is not None:
+        evidence.investigation(observer, target, party == "fascist")
+
+
+def knowledge_mask(evidence: RoleEvidence, game: dict, pid: str, known_fascists) -> "np.ndarray":
+    """Deals consistent with what ``pid`` privately knows: its role, the fascists it was shown and
+    its investigation results."""
+    roles = game["roles"]
+    known = [(deal_seat(game, pid), ROLE_CODES[roles[pid]])]
+    known += [(deal_seat(game, fid), ROLE_CODES[roles[fid]]) for fid in known_fascists if fid != pid]
+    mask = evidence.mask(tuple((seat, code) for seat, code in known if seat is not None))
+    for target, fascist in evidence.investigations.get(deal_seat(game, pid), {}).items():
+        mask = mask & (evidence.team[:, target] == fascist)
+    return mask
+
+
+def role_odds(game: dict, pid: str, known_fascists: list) -> tuple | None:
+    """(P(fascist team), P(Hitler)) for every player, from ``pid``'s point of view.
+
+    None when inference is unavailable for this game.
+    """
+    evidence = _evidence(game)
+    if evidence is None:
+        return None
+    players = game["players"]
+    roles = game["roles"]
+    if roles[pid] == "fascist":
+        # Fascists are shown the whole team; nothing left to infer.
+        return (
+            {other: float(roles[other] != "liberal") for other in players},
+            {other: float(roles[other] == "hitler") for other in players},
+        )
+
+    weights = evidence.posterior(knowledge_mask(evidence, game, pid, known_fascists))
+    team = (weights @ evidence.team_f).tolist()
+    hitler = (weights @ evidence.hitler_f).tolist()
+    seats = [(other, deal_seat(game, other)) for other in players]
+    return (
+        {other: team[s] if s is not None else 0.0 for other, s in seats},
+        {other: hitler[s] if s is not None else 0.0 for other, s in seats},
+    )
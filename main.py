@@ -1,53 +1,105 @@
+import abc
+import functools
+import heapq
 import os
 import random
 import string
 import secrets
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Dict
 
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-
-from ai import (
-    approve_veto,
-    choose_chancellor,
-    choose_chancellor_enact,
-    choose_execution_target,
-    choose_investigation_target,
-    choose_president_discard,
-    choose_special_election_target,
-    request_veto,
-    vote_government,
+from flask import Flask, Response, render_template, request, redirect, url_for, session, flash, jsonify, has_request_context
+
+import ai
+import engine
+import fastjson
+import metrics
+import search
+import tracing
+from ai import take_turn
+from model import Player
+from persistence import Journal
+from store import StaleGame, open_store
+from tournament import Tournament
+from engine import (
+    IllegalAction,
+    add_ai_players,
+    alive_ids,
+    default_stats,
+    derived,
+    eligible_chancellors,
+    invalidate_index,
+    new_game,
+    normalize_order,
+    party_for_role,
+    pending_action,
+    player_count,
+    start_game,
+    touch,
 )
 
 app = Flask(__name__)
+app.json = fastjson.JSONProvider(app)
 app.secret_key = os.getenv("SECRET_KEY", secrets.token_hex(32))
 
-# In-memory game store (perfectly fine for LAN + single server process)
-# If you restart the server, games reset.
+# Rooms this process is working on. With the default in-memory store this is the
+# only copy; with GAME_STORE=sqlite:///... it caches the shared one (see store.py).
+# Games reset on restart unless PERSIST_DIR is set (see persistence.py).
 GAMES: Dict[str, dict] = {}
+STORE = open_store(os.getenv("GAME_STORE"))
+# Retries of a request that lost a save race to another worker.
+STALE_RETRIES = 5
+# How often an /events stream checks a shared store for changes made by other workers.
+STORE_POLL_INTERVAL = 0.25
+# One condition per game: its (reentrant) lock serializes every state transition,
+# and /events streams wait on it until the version moves.
+GAME_LOCKS: Dict[str, threading.Condition] = {}
+# Guards adding/removing entries in GAMES and GAME_LOCKS.
+GAMES_LOCK = threading.Lock()
+# Called as listener(code) after every change to a room (and when it is dropped);
+# asgi.py registers one to wake its /events streams.
+VERSION_LISTENERS: list = []
+EVENT_KEEPALIVE_SECONDS = 15
+# A spectator counts towards a room's viewers until this long after its last poll
+# (open streams refresh it at least every EVENT_KEEPALIVE_SECONDS).
+SPECTATOR_WINDOW = 30.0
+# Pause between consecutive AI steps in one game, so humans can follow along.
+AI_STEP_DELAY = float(os.getenv("AI_STEP_DELAY", "0.75"))
 MAX_PLAYERS = 10
-AI_NAMES = [
-    "Avery", "Blake", "Casey", "Drew", "Emery",
-    "Finley", "Gray", "Harper", "Indigo", "Jules",
-    "Kai", "Logan", "Micah", "Nico", "Oak",
-    "Parker", "Quinn", "Reese", "Sawyer", "Tate",
-    "Wren", "Zion"
-]
-
-ROLE_COUNTS = {
-    5: {"liberal": 3, "fascist": 1, "hitler": 1},
-    6: {"liberal": 4, "fascist": 1, "hitler": 1},
-    7: {"liberal": 4, "fascist": 2, "hitler": 1},
-    8: {"liberal": 5, "fascist": 2, "hitler": 1},
-    9: {"liberal": 5, "fascist": 3, "hitler": 1},
-    10: {"liberal": 6, "fascist": 3, "hitler": 1},
-}
-
-FASCIST_POWERS = {
-    "5-6": [None, None, "policy_peek", "execution", "execution"],
-    "7-8": [None, "investigate", "special_election", "execution", "execution"],
-    "9-10": ["investigate", "investigate", "special_election", "execution", "execution"],
+# Seconds of search per AI scheduler step, shared by every searching seat the room waits on.
+# Planned on a snapshot by SEARCH_WORKERS threads, off the room's lock.
+search.BUDGET = float(os.getenv("SEARCH_BUDGET", str(search.BUDGET)))
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "1"))
+# Longest wait before planning again for a room whose plans keep failing.
+SEARCH_RETRY_MAX = 60.0
+# Idle seconds before a room is evicted, by phase; 0 disables eviction for that phase.
+ROOM_TTLS = {
+    "lobby": float(os.getenv("ROOM_TTL_LOBBY", "1800")),
+    "in_progress": float(os.getenv("ROOM_TTL_IN_PROGRESS", "7200")),
+    "game_over": float(os.getenv("ROOM_TTL_GAME_OVER", "600")),
 }
+# Upper bound on resident rooms; the least recently active is evicted first. 0 means no cap.
+MAX_GAMES = int(os.getenv("MAX_GAMES", "0"))
+SWEEP_INTERVAL = float(os.getenv("SWEEP_INTERVAL", "30"))
+# Directory for the journal and snapshots; persistence is off when unset.
+PERSIST_DIR = os.getenv("PERSIST_DIR")
+# Announcement log entries kept uncompressed per game and included in a full /state.
+LOG_TAIL = int(os.getenv("LOG_TAIL", str(engine.LOG_TAIL)))
+LOG_PAGE_LIMIT = 200
+# Prometheus metrics at /metrics; METRICS=0 removes the endpoint and every timing hook.
+METRICS_ENABLED = os.getenv("METRICS", "1") != "0"
+# Enables the /admin endpoints (room tracing) for requests sending it as X-Admin-Token.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# A shared store is already durable, so the journal only runs with the in-memory one.
+JOURNAL = (
+    Journal(PERSIST_DIR, float(os.getenv("SNAPSHOT_INTERVAL", "300")))
+    if PERSIST_DIR and not STORE.shared else None
+)
 
 
 def gen_8_digit_code() -> str:
@@ -56,15 +108,59 @@ def gen_8_digit_code() -> str:
 
 
 def create_unique_code() -> str:
-    for _ in range(50):
-        code = gen_8_digit_code()
-        if code not in GAMES:
-            return code
-    # Fallback (extremely unlikely)
-    while True:
+    # Reserves the code by registering its lock before the game itself exists.
+    with GAMES_LOCK:
         code = gen_8_digit_code()
-        if code not in GAMES:
-            return code
+        while code in GAME_LOCKS or STORE.version(code) is not None:
+            code = gen_8_digit_code()
+        GAME_LOCKS[code] = threading.Condition(threading.RLock())
+        return code
+
+
+@contextmanager
+def locked_game(code: str):
+    with GAMES_LOCK:
+        cond = GAME_LOCKS.get(code)
+    if cond is None and STORE.shared and STORE.version(code) is not None:
+        # A room created by another worker.
+        with GAMES_LOCK:
+            cond = GAME_LOCKS.setdefault(code, threading.Condition(threading.RLock()))
+    if cond is None:
+        yield None
+        return
+    with cond:
+        game = GAMES.get(code)
+        if STORE.shared:
+            game = STORE.load(code, game)
+            with GAMES_LOCK:
+                if game is None:
+                    GAMES.pop(code, None)
+                else:
+                    GAMES[code] = game
+        version = game.get("version") if game else None
+        if game is not None and has_request_context():
+            game["last_active"] = time.monotonic()
+        if game is not None and JOURNAL:
+            JOURNAL.watch(game)
+        try:
+            yield game
+        finally:
+            if game is not None and game.get("version") != version:
+                if STORE.shared and code in GAMES and not STORE.save(code, game, version):
+                    # Another worker moved the room on first; drop our copy so the retry reloads it.
+                    with GAMES_LOCK:
+                        GAMES.pop(code, None)
+                    raise StaleGame(code)
+                if JOURNAL and code in GAMES:
+                    JOURNAL.record(code, game, version)
+                trace = tracing.TRACES.get(code)
+                if trace is not None:
+                    trace.event("transition", game.get("phase"), version=game.get("version"), previous=version)
+                # Wake /events streams and let the AI scheduler look at the new state.
+                cond.notify_all()
+                for listener in VERSION_LISTENERS:
+                    listener(code)
+                AI_SCHEDULER.notify(code)
 
 
 def ensure_player_id() -> str:
@@ -77,550 +173,593 @@ def default_player_name() -> str:
     return f"Player {random.randint(100, 999)}"
 
 
-def build_deck() -> list:
-    deck = ["liberal"] * 6 + ["fascist"] * 11
-    random.shuffle(deck)
-    return deck
-
-
-def assign_roles(player_ids: list) -> dict:
-    count = len(player_ids)
-    dist = ROLE_COUNTS.get(count)
-    if not dist:
-        raise ValueError(f"Unsupported player count: {count}")
-    roles = (["liberal"] * dist["liberal"]) + (["fascist"] * dist["fascist"]) + ["hitler"]
-    random.shuffle(roles)
-    return {pid: role for pid, role in zip(player_ids, roles)}
-
-
-def party_for_role(role: str) -> str:
-    return "fascist" if role in ("fascist", "hitler") else "liberal"
-
-
-def hitler_id(game: dict) -> str | None:
-    return next((pid for pid, r in game.get("roles", {}).items() if r == "hitler"), None)
-
-
-def is_ai_player(game: dict, pid: str) -> bool:
-    return bool(game.get("players", {}).get(pid, {}).get("is_ai"))
-
-
-def is_alive(game: dict, pid: str) -> bool:
-    return bool(game.get("players", {}).get(pid, {}).get("alive", True))
-
-
-def known_fascists_for(game: dict, pid: str) -> list:
-    role = game.get("roles", {}).get(pid)
-    if role == "fascist":
-        return [fid for fid, r in game.get("roles", {}).items() if r in ("fascist", "hitler")]
-    if role == "hitler" and player_count(game) <= 6:
-        return [fid for fid, r in game.get("roles", {}).items() if r == "fascist"]
-    return []
-
-def alive_ids(game: dict) -> list:
-    return [pid for pid, p in game.get("players", {}).items() if p.get("alive", True)]
-
-
-def player_count(game: dict) -> int:
-    return int(game.get("player_count") or len(game.get("players", {})))
-
-
-def fascist_track_key(count: int) -> str:
-    if count <= 6:
-        return "5-6"
-    if count <= 8:
-        return "7-8"
-    return "9-10"
-
-
-def fascist_power_for(game: dict, fascist_policies: int) -> str | None:
-    if fascist_policies <= 0 or fascist_policies >= 6:
-        return None
-    key = fascist_track_key(player_count(game))
-    return FASCIST_POWERS[key][fascist_policies - 1]
-
-
-def eligible_chancellors(game: dict) -> list:
+def drop_game(code: str) -> None:
+    game = forget_game(code)
+    STORE.delete(code)
+    if game is not None and JOURNAL:
+        JOURNAL.drop(code)
+
+
+def forget_game(code: str):
+    """Drop this process's copy of a room (with a shared store, the room itself lives on)."""
+    with GAMES_LOCK:
+        game = GAMES.pop(code, None)
+        cond = GAME_LOCKS.pop(code, None)
+    AUDIENCE.forget(code)
+    if cond is not None:
+        with cond:
+            cond.notify_all()
+        for listener in VERSION_LISTENERS:
+            listener(code)
+    return game
+
+
+def wait_for_change(code: str, version: int, timeout: float) -> bool:
+    cond = GAME_LOCKS.get(code)
+    if cond is None:
+        return True
+    if STORE.shared:
+        # Other workers can't notify our condition, so look at the store between short waits.
+        deadline = time.monotonic() + timeout
+        while STORE.version(code) == version:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with cond:
+                cond.wait(min(remaining, STORE_POLL_INTERVAL))
+        return True
+    with cond:
+        return cond.wait_for(
+            lambda: code not in GAMES or GAMES[code].get("version", 0) != version,
+            timeout=timeout,
+        )
+
+
+def roster_json(game: dict) -> fastjson.Fragment:
+    """The public player list, encoded once per roster change."""
+    fragments = derived(game).fragments
+    roster = fragments.get("players")
+    if roster is None:
+        roster = fragments["players"] = fastjson.Fragment(derived(game).players_view)
+    return roster
+
+
+def public_state(game: dict) -> dict:
+    players = roster_json(game)
     alive = alive_ids(game)
-    president_id = game.get("president_id")
-    last_president_id = game.get("last_president_id")
-    last_chancellor_id = game.get("last_chancellor_id")
-    excluded = {president_id}
-
-    if len(alive) <= 5:
-        excluded.add(last_chancellor_id)
-    else:
-        excluded.update({last_president_id, last_chancellor_id})
-
-    return [pid for pid in alive if pid not in excluded]
-
-
-def announce(game: dict, message: str) -> None:
-    seq = int(game.get("announcement_seq", 0)) + 1
-    game["announcement_seq"] = seq
-    game["announcement"] = {"id": seq, "message": message}
-    game.setdefault("log", []).append({"id": seq, "message": message})
+    votes = game.get("votes", {})
+    vote_cast = len(votes)
+    vote_total = len(alive)
+    vote_complete = vote_cast == vote_total and game.get("phase") == "vote"
 
+    state = {
+        "phase": game.get("phase"),
+        "players": players,
+        "order": list(game.get("order") or []),
+        "president_id": game.get("president_id"),
+        "chancellor_id": game.get("chancellor_id"),
+        "nominee_id": game.get("nominee_id"),
+        "last_president_id": game.get("last_president_id"),
+        "last_chancellor_id": game.get("last_chancellor_id"),
+        "liberal_policies": game.get("liberal_policies", 0),
+        "fascist_policies": game.get("fascist_policies", 0),
+        "election_tracker": game.get("election_tracker", 0),
+        "policy_deck_count": len(game.get("policy_deck", [])),
+        "policy_discard_count": len(game.get("policy_discard", [])),
+        "veto_unlocked": game.get("veto_unlocked", False),
+        "executive_action": game.get("executive_action"),
+        "eligible_chancellors": eligible_chancellors(game),
+        "vote": {
+            "total": vote_total,
+            "cast": vote_cast,
+            "revealed": vote_complete,
+            "votes": dict(votes) if vote_complete else None,
+        },
+        "last_vote": game.get("last_vote"),
+        "announcement": game.get("announcement"),
+        "winner": game.get("winner"),
+        "victory_reason": game.get("victory_reason"),
+        "stats": dict(game.get("stats") or default_stats()),
+    }
 
-def set_private_info(game: dict, pid: str, info_type: str, data: dict) -> None:
-    seq = int(game.get("private_seq", 0)) + 1
-    game["private_seq"] = seq
-    game.setdefault("private_info", {})[pid] = {"id": seq, "type": info_type, "data": data}
+    if game.get("winner"):
+        state["final_roles"] = [
+            {
+                "id": pid,
+                "name": p.get("name"),
+                "role": game.get("roles", {}).get(pid),
+                "party": party_for_role(game.get("roles", {}).get(pid, "")),
+                "alive": p.get("alive", True),
+                "is_ai": p.get("is_ai", False),
+            }
+            for pid, p in game.get("players", {}).items()
+        ]
+    return state
+
+
+def record_state_versions(game: dict, state: dict) -> dict:
+    # field -> (version it last changed at, value), used to answer ?since= deltas. Only the
+    # bookkeeping is written: every mutation bumps the version itself through touch().
+    fields = game.setdefault("state_fields", {})
+    version = game.get("version", 0)
+    for key, value in state.items():
+        if key not in fields or fields[key][1] != value:
+            fields[key] = (version, value)
+    return fields
+
+
+def log_since(game: dict, after: int) -> list:
+    # Only the tail is in memory; a client further behind pages the rest from /log.
+    return [entry for entry in game.log if entry["id"] > after]
+
+
+def public_payload(game: dict, since: int | None, log_after: int) -> str:
+    """The seat-independent part of a /state response as JSON, minus its closing brace.
+
+    Encoded once per game version and (since, log_after) pair, then shared by
+    every player polling or streaming at that version.
+    """
+    version = game.get("version", 0)
+    if since is not None and since > version:
+        since = None
+    key = (since, log_after if since is not None else 0)
+    cache = game.get("view_cache")
+    if cache is None or cache["version"] != version:
+        cache = game["view_cache"] = {"version": version}
+    encoded = cache.get(key)
+    if encoded is not None:
+        return encoded
+
+    state = public_state(game)
+    fields = record_state_versions(game, state)
+    response = {"ok": True, "version": version}
+    if since is None:
+        response.update(state)
+        response["log"] = list(game.log)
+    else:
+        response["delta"] = True
+        response.update({key: value for key, (changed_at, value) in fields.items() if changed_at > since})
+        response["log"] = log_since(game, log_after)
+    encoded = cache[key] = fastjson.dumps(response)[:-1]
+    return encoded
+
+
+def state_payload(game: dict, pid: str, since: int | None = None, log_after: int = 0) -> str:
+    """The full /state response for ``pid`` as JSON: the shared public part plus this seat's own."""
+    mine = {"action": pending_action(game, pid), "private_info": game.get("private_info", {}).get(pid)}
+    return f'{public_payload(game, since, log_after)},"you_id":{fastjson.dumps(pid)},"self":{fastjson.dumps(mine)}}}'
+
+
+def spectator_payload(game: dict, since: int | None = None, log_after: int = 0) -> str:
+    """The /spectate response: the public view with nothing seat-specific, encoded once per version."""
+    public = public_payload(game, since, log_after)
+    key = ("spectate", since, log_after)
+    cache = game["view_cache"]
+    encoded = cache.get(key)
+    if encoded is None:
+        encoded = cache[key] = public + "}"
+    return encoded
+
+
+def spectator_frame(game: dict, since: int | None, log_after: int) -> str:
+    """spectator_payload as an SSE frame, shared by every spectator stream at that version."""
+    payload = spectator_payload(game, since, log_after)
+    key = ("spectate-sse", since, log_after)
+    cache = game["view_cache"]
+    frame = cache.get(key)
+    if frame is None:
+        frame = cache[key] = f"id: {cache['version']}\ndata: {payload}\n\n"
+    return frame
+
+
+def conditional(tag: str, build) -> Response:
+    """304 if the client already holds ETag ``tag``, else the response from ``build()``."""
+    if request.if_none_match.contains(tag):
+        response = app.response_class(status=304)
+    else:
+        response = build()
+    response.set_etag(tag)
+    # Let browsers keep the body but check back every time.
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
-def default_stats() -> dict:
+def lobby_payload(game: dict) -> dict:
+    players = roster_json(game)
     return {
-        "elections": 0,
-        "failed_elections": 0,
-        "successful_elections": 0,
-        "executions": 0,
-        "investigations": 0,
-        "special_elections": 0,
-        "policy_peeks": 0,
-        "vetos_requested": 0,
-        "vetos_approved": 0,
+        "ok": True,
+        "code": game["code"],
+        "host_id": game["host_id"],
+        "started": game.get("started", False),
+        "players": players,
     }
 
 
-def ensure_stats(game: dict) -> dict:
-    if "stats" not in game:
-        game["stats"] = default_stats()
-    return game["stats"]
-
-
-def ensure_policy_deck(game: dict, count: int) -> None:
-    deck = game.get("policy_deck", [])
-    discard = game.get("policy_discard", [])
-    if len(deck) < count and discard:
-        deck.extend(discard)
-        game["policy_discard"] = []
-        random.shuffle(deck)
-    game["policy_deck"] = deck
-
-
-def draw_policies(game: dict, count: int) -> list:
-    ensure_policy_deck(game, count)
-    deck = game.get("policy_deck", [])
-    drawn = deck[:count]
-    game["policy_deck"] = deck[count:]
-    return drawn
-
-
-def reset_term_limits(game: dict) -> None:
-    game["last_president_id"] = None
-    game["last_chancellor_id"] = None
-
-
-def reset_election_tracker(game: dict) -> None:
-    game["election_tracker"] = 0
-
-
-def clear_government(game: dict) -> None:
-    game["nominee_id"] = None
-    game["votes"] = {}
-    game["pending_policies"] = []
-    game["veto_requested"] = False
-    game["veto_denied"] = False
-
-
-def check_win(game: dict) -> None:
-    if game.get("liberal_policies", 0) >= 5:
-        game["winner"] = "liberal"
-        game["phase"] = "game_over"
-        game["victory_reason"] = "liberal_policies"
-        announce(game, "Liberals win by enacting five Liberal Policies.")
-        return
-    if game.get("fascist_policies", 0) >= 6:
-        game["winner"] = "fascist"
-        game["phase"] = "game_over"
-        game["victory_reason"] = "fascist_policies"
-        announce(game, "Fascists win by enacting six Fascist Policies.")
-
-
-def apply_policy(game: dict, policy: str, anarchy: bool = False) -> None:
-    game["executive_action"] = None
-    if not anarchy:
-        pres = game.get("president_id")
-        chanc = game.get("chancellor_id")
-        delta = 1 if policy == "fascist" else -1
-        for pid in (pres, chanc):
-            if pid:
-                game.setdefault("suspicion", {})[pid] = game.get("suspicion", {}).get(pid, 0) + delta
-    if policy == "liberal":
-        game["liberal_policies"] = int(game.get("liberal_policies", 0)) + 1
-        announce(game, "A Liberal Policy was enacted.")
-        reset_election_tracker(game)
-        check_win(game)
-        return
-
-    game["fascist_policies"] = int(game.get("fascist_policies", 0)) + 1
-    announce(game, "A Fascist Policy was enacted.")
-    reset_election_tracker(game)
-    check_win(game)
-    if game.get("winner"):
-        return
-
-    if game.get("fascist_policies", 0) >= 5:
-        game["veto_unlocked"] = True
-
-    if anarchy:
-        return
-
-    power = fascist_power_for(game, game.get("fascist_policies", 0))
-    if power:
-        game["executive_action"] = {"type": power}
-        game["phase"] = "executive_action"
+class AIScheduler:
+    """Advances AI-owned phases in a background thread, one paced step per game at a time.
+
+    touch() marks a game ready; a game that just made an AI step is not stepped
+    again until ``delay`` seconds later. Games waiting on a human drop out of
+    the queue until their next change.
+    """
+
+    def __init__(self, delay: float, search_workers: int = 1):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._ready: set = set()
+        self._due: Dict[str, float] = {}
+        self._heap: list = []
+        self._thread = None
+        # Searching AI seats (ai.SEARCH_STRATEGIES) are planned here, on a snapshot of the room.
+        self._search = ThreadPoolExecutor(search_workers, thread_name_prefix="ai-search",
+                                          initializer=lower_priority)
+        # Rooms with a plan in progress; the scheduler leaves them alone until it lands.
+        self._planning: set = set()
+        # Plans that raised in a row, by room, for the retry backoff.
+        self._failures: Dict[str, int] = {}
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="ai-scheduler", daemon=True)
+        self._thread.start()
 
+    def notify(self, code: str | None) -> None:
+        # Tournament tables are stepped by their own workers.
+        if not code or code in TOURNAMENT.active:
+            return
+        with self._lock:
+            self._ready.add(code)
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._timeout())
+            self._wake.clear()
+            self._tick()
+
+    def _timeout(self) -> float | None:
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            ready, self._ready = self._ready, set()
+            while self._heap and self._heap[0][0] <= now:
+                ready.add(heapq.heappop(self._heap)[1])
+        for code in ready:
+            with self._lock:
+                if self._due.get(code, 0) > now:
+                    continue
+            if self.step(code):
+                self._schedule(code, now + self.delay)
+            else:
+                with self._lock:
+                    self._due.pop(code, None)
+
+    def _schedule(self, code: str, due: float) -> None:
+        """Step ``code`` again at ``due`` (monotonic), and not before."""
+        with self._lock:
+            self._due[code] = due
+            heapq.heappush(self._heap, (due, code))
+        self._wake.set()
+
+    def step(self, code: str) -> bool:
+        try:
+            return self._step(code)
+        except StaleGame:
+            # A worker that got there first schedules the room from its new state.
+            return False
+
+    def _step(self, code: str) -> bool:
+        with locked_game(code) as game:
+            if not game or not game.get("started"):
+                return False
+            with self._lock:
+                if code in self._planning:
+                    return False
+            normalize_order(game)
+            if ai.searching_seats(game):
+                with self._lock:
+                    self._planning.add(code)
+                self._search.submit(self._plan, code, search.snapshot(game), game.version)
+                return False
+            with tracing.span(code, "ai", "step"):
+                if not METRICS_ENABLED:
+                    return take_turn(game)
+                started = time.perf_counter()
+                progressed = take_turn(game)
+            AI_STEP_SECONDS.observe(time.perf_counter() - started)
+            if progressed:
+                AI_STEPS.inc()
+            return progressed
+
+    def _plan(self, code: str, position, version: int) -> None:
+        """Search on ``position`` (the room at ``version``), then play the plan if the room has not moved on."""
+        try:
+            with tracing.span(code, "ai", "search"):
+                started = time.perf_counter()
+                planned = ai.plan_turn(position, search.BUDGET)
+            if METRICS_ENABLED:
+                AI_SEARCH_SECONDS.observe(time.perf_counter() - started)
+            # Paced like any other step; set before the move so its own notify does not step it early.
+            due = time.monotonic() + self.delay
+            with self._lock:
+                self._due[code] = due
+                self._planning.discard(code)
+            with locked_game(code) as game:
+                if not game or game.version != version:
+                    # Someone moved in the meantime: plan again from the new position.
+                    with self._lock:
+                        self._due.pop(code, None)
+                    self.notify(code)
+                    return
+                with tracing.span(code, "ai", "step"):
+                    started = time.perf_counter()
+                    progressed = take_turn(game, planned)
+                if METRICS_ENABLED:
+                    AI_STEP_SECONDS.observe(time.perf_counter() - started)
+                    if progressed:
+                        AI_STEPS.inc()
+            with self._lock:
+                self._failures.pop(code, None)
+            self._schedule(code, due)
+        except StaleGame:
+            self.notify(code)
+        except Exception:
+            app.logger.exception("AI search failed in room %s", code)
+            # Try again later rather than leave the seat stuck, backing off while it keeps failing.
+            with self._lock:
+                failures = self._failures[code] = self._failures.get(code, 0) + 1
+                self._planning.discard(code)
+            self._schedule(code, time.monotonic() + min(SEARCH_RETRY_MAX, 2.0 ** failures))
+        finally:
+            with self._lock:
+                self._planning.discard(code)
+
+
+def lower_priority() -> None:
+    try:
+        # Linux schedules threads individually, so this lowers just the calling thread.
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+AI_SCHEDULER = AIScheduler(AI_STEP_DELAY, SEARCH_WORKERS)
+
+
+def room_phase(game) -> str:
+    if not game.get("started"):
+        return "lobby"
+    if game.get("phase") == "game_over":
+        return "game_over"
+    return "in_progress"
+
+
+class RoomSweeper:
+    """Evicts rooms nobody has touched for longer than their phase's TTL, and
+    the least recently active rooms once more than ``max_games`` are resident.
+
+    Activity is any request that locks the game plus open /events streams, so
+    AI moves alone never keep an abandoned room alive.
+    """
+
+    def __init__(self, ttls: dict, max_games: int, interval: float):
+        self.ttls = ttls
+        self.max_games = max_games
+        self.interval = interval
+        self.evicted: Counter = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="room-sweeper", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.sweep()
+            self.enforce_cap()
+
+    def _evict(self, code: str, reason: str, expired=None) -> bool:
+        with locked_game(code) as game:
+            if not game or (expired is not None and not expired(game)):
+                return False
+            # Idle here is not idle everywhere when workers share rooms; the store purges
+            # rooms by their last save instead (see sweep).
+            if STORE.shared:
+                forget_game(code)
+            else:
+                drop_game(code)
+        with self._lock:
+            self.evicted[reason] += 1
+        return True
+
+    def _expired(self, game, now: float) -> bool:
+        ttl = self.ttls.get(room_phase(game), 0)
+        return ttl > 0 and now - game.get("last_active", now) > ttl
+
+    def sweep(self, now: float | None = None) -> int:
+        now = time.monotonic() if now is None else now
+        if STORE.shared and any(self.ttls.values()):
+            for code in STORE.purge(max(self.ttls.values())):
+                forget_game(code)
+        with GAMES_LOCK:
+            rooms = list(GAMES.items())
+        evicted = 0
+        for code, game in rooms:
+            if self._expired(game, now):
+                # Re-checked under the game lock in case a request just came in.
+                evicted += self._evict(code, room_phase(game), lambda g: self._expired(g, now))
+        return evicted
+
+    def enforce_cap(self, reserve: int = 0) -> int:
+        """Evicts least recently active rooms until ``reserve`` more fit under the cap."""
+        if self.max_games <= 0:
+            return 0
+        with GAMES_LOCK:
+            excess = len(GAMES) + reserve - self.max_games
+            if excess <= 0:
+                return 0
+            oldest = sorted(GAMES, key=lambda c: GAMES[c].get("last_active", 0))[:excess]
+        return sum(self._evict(code, "capacity") for code in oldest)
+
+    def counters(self) -> dict:
+        with self._lock:
+            return {reason: self.evicted[reason] for reason in (*self.ttls, "capacity")}
+
+
+ROOM_SWEEPER = RoomSweeper(ROOM_TTLS, MAX_GAMES, SWEEP_INTERVAL)
+
+
+class Audience:
+    """Spectators per room, by session: each counts until ``window`` seconds after it was last seen."""
+
+    def __init__(self, window: float):
+        self.window = window
+        # code -> {viewer: monotonic time last seen}
+        self._rooms: Dict[str, Dict[str, float]] = {}
+        # code -> monotonic time of the last pass dropping expired viewers
+        self._pruned: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def seen(self, code: str, viewer: str) -> None:
+        with self._lock:
+            self._rooms.setdefault(code, {})[viewer] = time.monotonic()
+
+    def count(self, code: str) -> int:
+        now = time.monotonic()
+        with self._lock:
+            viewers = self._rooms.get(code)
+            if not viewers:
+                return 0
+            # At most one pass per room a second, however many spectators ask.
+            if now - self._pruned.get(code, 0.0) >= 1.0:
+                self._pruned[code] = now
+                cutoff = now - self.window
+                for viewer in [v for v, seen in viewers.items() if seen < cutoff]:
+                    del viewers[viewer]
+            return len(viewers)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            codes = list(self._rooms)
+        return {code: count for code in codes if (count := self.count(code))}
+
+    def forget(self, code: str) -> None:
+        with self._lock:
+            self._rooms.pop(code, None)
+            self._pruned.pop(code, None)
+
+
+AUDIENCE = Audience(SPECTATOR_WINDOW)
+
+# Background AI-vs-AI tables (see tournament.py); off unless TOURNAMENT_TABLES is set.
+TOURNAMENT = Tournament(
+    int(os.getenv("TOURNAMENT_TABLES", "0")),
+    players=int(os.getenv("TOURNAMENT_PLAYERS", "7")),
+    strategies=[name for name in os.getenv("TOURNAMENT_STRATEGIES", "").split(",") if name] or None,
+    step_delay=float(os.getenv("TOURNAMENT_STEP_DELAY", "0.25")),
+    max_yield=float(os.getenv("TOURNAMENT_MAX_YIELD", "1.0")),
+)
+# Requests being handled right now (streams count until their response starts);
+# tournament tables hold back while any are.
+REQUESTS_IN_FLIGHT = 0
+IN_FLIGHT_LOCK = threading.Lock()
 
-def start_nomination(game: dict) -> None:
-    clear_government(game)
-    game["phase"] = "nominate"
 
+def open_tournament_table(players: dict) -> str | None:
+    # Tables never push human rooms out: no new table once the room cap is reached.
+    if MAX_GAMES and len(GAMES) >= MAX_GAMES:
+        return None
+    code = create_unique_code()
+    game = new_game(code, None, players, log_tail=LOG_TAIL)
+    start_game(game)
+    return register_game(game)
 
-def start_vote(game: dict, nominee_id: str) -> None:
-    game["nominee_id"] = nominee_id
-    game["votes"] = {}
-    game["phase"] = "vote"
-    announce(game, f"{game['players'][game['president_id']]['name']} nominated "
-                   f"{game['players'][nominee_id]['name']} for Chancellor.")
 
+def close_tournament_table(code: str) -> None:
+    # A watched table stays up for its audience until the sweeper's game-over TTL.
+    if not AUDIENCE.count(code):
+        drop_game(code)
 
-def begin_legislative_session(game: dict) -> None:
-    game["pending_policies"] = draw_policies(game, 3)
-    game["veto_requested"] = False
-    game["veto_denied"] = False
-    game["phase"] = "legislative_president"
 
+def humans_waiting() -> bool:
+    return REQUESTS_IN_FLIGHT > 0
 
-def enact_anarchy(game: dict) -> None:
-    policy = draw_policies(game, 1)
-    if policy:
-        announce(game, "Anarchy! The top policy was enacted.")
-        reset_term_limits(game)
-        apply_policy(game, policy[0], anarchy=True)
-    reset_election_tracker(game)
 
+def register_game(game) -> str:
+    """Make a new room live: in the store, in GAMES and, with persistence on, in the journal.
 
-def resolve_vote(game: dict) -> None:
-    alive = alive_ids(game)
-    votes = game.get("votes", {})
-    yes_votes = sum(1 for pid in alive if votes.get(pid) is True)
-    no_votes = sum(1 for pid in alive if votes.get(pid) is False)
-    passed = yes_votes > no_votes
-    nominee_id = game.get("nominee_id")
-    stats = ensure_stats(game)
-    stats["elections"] += 1
-
-    game["last_vote"] = {"yes": yes_votes, "no": no_votes, "votes": dict(votes)}
-
-    if not passed:
-        stats["failed_elections"] += 1
-        announce(game, f"Election failed ({yes_votes} Ja / {no_votes} Nein).")
-        game["election_tracker"] = int(game.get("election_tracker", 0)) + 1
-        clear_government(game)
-        advance_presidency(game)
-        if game.get("election_tracker", 0) >= 3:
-            enact_anarchy(game)
-            if game.get("winner"):
-                return
-        start_nomination(game)
-        return
+    Returns its code: ``game.code`` unless another worker sharing the store created a room
+    with that code first, in which case the game gets a fresh one.
+    """
+    while not STORE.create(game.code, game):
+        with GAMES_LOCK:
+            GAME_LOCKS.pop(game.code, None)
+        game.code = create_unique_code()
+    code = game.code
+    # One step under GAMES_LOCK, which room_codes() also takes: a journal snapshot either lists
+    # the room or was started before the put, which then replays on top of it.
+    with GAMES_LOCK:
+        GAMES[code] = game
+        if JOURNAL:
+            JOURNAL.put(code, game)
+    return code
 
-    announce(game, f"Election passed ({yes_votes} Ja / {no_votes} Nein).")
-    stats["successful_elections"] += 1
-    reset_election_tracker(game)
-    game["chancellor_id"] = nominee_id
-    game["last_president_id"] = game.get("president_id")
-    game["last_chancellor_id"] = nominee_id
-    game["nominee_id"] = None
-    game["votes"] = {}
-
-    if game.get("fascist_policies", 0) >= 3 and game.get("roles", {}).get(nominee_id) == "hitler":
-        game["winner"] = "fascist"
-        game["phase"] = "game_over"
-        game["victory_reason"] = "hitler_elected"
-        announce(game, "Hitler was elected Chancellor. Fascists win.")
-        return
-    if game.get("fascist_policies", 0) >= 3:
-        announce(game, "The Chancellor is not Hitler.")
 
-    begin_legislative_session(game)
+def room_codes() -> list:
+    with GAMES_LOCK:
+        return list(GAMES)
 
 
-def build_player_action(game: dict, pid: str) -> dict | None:
-    if not is_alive(game, pid) or game.get("phase") == "game_over":
-        return None
+def restore_games() -> None:
+    for code, game in JOURNAL.load().items():
+        GAMES[code] = game
+        GAME_LOCKS[code] = threading.Condition(threading.RLock())
+        # Rooms restored mid-game may be waiting on an AI seat.
+        AI_SCHEDULER.notify(code)
 
-    phase = game.get("phase")
-    if phase == "nominate" and pid == game.get("president_id"):
-        return {
-            "type": "nominate",
-            "eligible": eligible_chancellors(game),
-        }
-    if phase == "vote" and pid not in game.get("votes", {}):
-        return {"type": "vote"}
-    if phase == "legislative_president" and pid == game.get("president_id"):
-        return {
-            "type": "president_discard",
-            "policies": list(game.get("pending_policies", [])),
-        }
-    if phase == "legislative_chancellor" and pid == game.get("chancellor_id"):
-        return {
-            "type": "chancellor_enact",
-            "policies": list(game.get("pending_policies", [])),
-            "veto_available": bool(game.get("veto_unlocked")),
-            "veto_allowed": not bool(game.get("veto_denied")),
-        }
-    if phase == "veto_pending" and pid == game.get("president_id"):
-        return {"type": "veto_decision"}
-    if phase == "executive_action" and pid == game.get("president_id"):
-        action = (game.get("executive_action") or {}).get("type")
-        alive = [pid2 for pid2 in alive_ids(game) if pid2 != pid]
-        if action == "investigate":
-            alive = [pid2 for pid2 in alive if pid2 not in game.get("investigated", set())]
-        return {
-            "type": "executive",
-            "power": action,
-            "targets": alive,
-        }
-    return None
 
+if JOURNAL:
+    restore_games()
 
-def run_ai_turns(game: dict) -> None:
-    for _ in range(8):
-        if game.get("phase") == "game_over":
-            return
-        phase = game.get("phase")
-        president_id = game.get("president_id")
-
-        progressed = False
-        if phase == "nominate":
-            if president_id and is_ai_player(game, president_id):
-                state = {
-                    "eligible_chancellors": eligible_chancellors(game),
-                    "fascist_policies": game.get("fascist_policies", 0),
-                    "suspicion": game.get("suspicion", {}),
-                    "hitler_id": hitler_id(game),
-                }
-                nominee = choose_chancellor(state, game["roles"][president_id], known_fascists_for(game, president_id))
-                if nominee:
-                    start_vote(game, nominee)
-                    progressed = True
-
-        elif phase == "vote":
-            for pid, player in game.get("players", {}).items():
-                if not player.get("alive", True):
-                    continue
-                if pid in game.get("votes", {}):
-                    continue
-                if not player.get("is_ai"):
-                    continue
-                state = {
-                    "nominee_id": game.get("nominee_id"),
-                    "president_id": president_id,
-                    "fascist_policies": game.get("fascist_policies", 0),
-                    "suspicion": game.get("suspicion", {}),
-                    "hitler_id": hitler_id(game),
-                }
-                vote = vote_government(state, game["roles"][pid], known_fascists_for(game, pid))
-                game.setdefault("votes", {})[pid] = bool(vote)
-                progressed = True
-            if len(game.get("votes", {})) == len(alive_ids(game)):
-                resolve_vote(game)
-                progressed = True
-
-        elif phase == "legislative_president":
-            if president_id and is_ai_player(game, president_id):
-                policies = list(game.get("pending_policies", []))
-                if len(policies) == 3:
-                    discard_idx = choose_president_discard(policies, game["roles"][president_id])
-                    discarded = policies.pop(discard_idx)
-                    game.setdefault("policy_discard", []).append(discarded)
-                    game["pending_policies"] = policies
-                    game["phase"] = "legislative_chancellor"
-                    progressed = True
-
-        elif phase == "legislative_chancellor":
-            chancellor_id = game.get("chancellor_id")
-            if chancellor_id and is_ai_player(game, chancellor_id):
-                policies = list(game.get("pending_policies", []))
-                if len(policies) == 2:
-                    if game.get("veto_unlocked") and not game.get("veto_denied"):
-                        if request_veto(policies, game["roles"][chancellor_id]):
-                            ensure_stats(game)["vetos_requested"] += 1
-                            game["veto_requested"] = True
-                            game["phase"] = "veto_pending"
-                            announce(game, "Chancellor requested a veto.")
-                            progressed = True
-                            continue
-                    enact_idx = choose_chancellor_enact(policies, game["roles"][chancellor_id])
-                    enacted = policies.pop(enact_idx)
-                    game.setdefault("policy_discard", []).extend(policies)
-                    game["pending_policies"] = []
-                    apply_policy(game, enacted)
-                    if game.get("phase") == "executive_action" or game.get("winner"):
-                        progressed = True
-                        continue
-                    advance_presidency(game)
-                    start_nomination(game)
-                    progressed = True
-
-        elif phase == "veto_pending":
-            if president_id and is_ai_player(game, president_id):
-                policies = list(game.get("pending_policies", []))
-                approve = approve_veto(policies, game["roles"][president_id])
-                if approve:
-                    ensure_stats(game)["vetos_approved"] += 1
-                    game.setdefault("policy_discard", []).extend(policies)
-                    game["pending_policies"] = []
-                    game["veto_requested"] = False
-                    game["veto_denied"] = False
-                    game["election_tracker"] = int(game.get("election_tracker", 0)) + 1
-                    announce(game, "Veto approved. The agenda was discarded.")
-                    if game.get("election_tracker", 0) >= 3:
-                        enact_anarchy(game)
-                        if game.get("winner"):
-                            return
-                    advance_presidency(game)
-                    start_nomination(game)
-                else:
-                    game["veto_requested"] = False
-                    game["veto_denied"] = True
-                    game["phase"] = "legislative_chancellor"
-                    announce(game, "Veto denied. Chancellor must enact a policy.")
-                progressed = True
-
-        elif phase == "executive_action":
-            if president_id and is_ai_player(game, president_id):
-                action = (game.get("executive_action") or {}).get("type")
-                state = {
-                    "alive_ids": alive_ids(game),
-                    "president_id": president_id,
-                    "suspicion": game.get("suspicion", {}),
-                    "hitler_id": hitler_id(game),
-                }
-                if action == "policy_peek":
-                    ensure_policy_deck(game, 3)
-                    top = game.get("policy_deck", [])[:3]
-                    set_private_info(game, president_id, "policy_peek", {"policies": top})
-                    ensure_stats(game)["policy_peeks"] += 1
-                    announce(game, "President used Policy Peek.")
-                elif action == "investigate":
-                    state["investigated"] = list(game.get("investigated", set()))
-                    target_id = choose_investigation_target(
-                        state, game["roles"][president_id], known_fascists_for(game, president_id)
-                    )
-                    if target_id:
-                        party = party_for_role(game["roles"][target_id])
-                        set_private_info(game, president_id, "investigation", {"target_id": target_id, "party": party})
-                        game.setdefault("investigated", set()).add(target_id)
-                        ensure_stats(game)["investigations"] += 1
-                        announce(game, f"President investigated {game['players'][target_id]['name']}.")
-                elif action == "special_election":
-                    target_id = choose_special_election_target(
-                        state, game["roles"][president_id], known_fascists_for(game, president_id)
-                    )
-                    if target_id:
-                        ensure_stats(game)["special_elections"] += 1
-                        order = game.get("order") or alive_ids(game)
-                        if president_id in order:
-                            idx = order.index(president_id)
-                            return_id = order[(idx + 1) % len(order)]
-                        else:
-                            return_id = order[0] if order else None
-                        game["special_election_return_id"] = return_id
-                        game["president_id"] = target_id
-                        game["president_index"] = order.index(target_id) if target_id in order else 0
-                        announce(game, f"Special Election: {game['players'][target_id]['name']} is next President.")
-                        game["executive_action"] = None
-                        start_nomination(game)
-                        progressed = True
-                        continue
-                elif action == "execution":
-                    target_id = choose_execution_target(
-                        state, game["roles"][president_id], known_fascists_for(game, president_id)
-                    )
-                    if target_id:
-                        ensure_stats(game)["executions"] += 1
-                        game["players"][target_id]["alive"] = False
-                        announce(game, f"{game['players'][target_id]['name']} was executed.")
-                        if game.get("roles", {}).get(target_id) == "hitler":
-                            game["winner"] = "liberal"
-                            game["phase"] = "game_over"
-                            game["victory_reason"] = "hitler_executed"
-                            announce(game, "Hitler was executed. Liberals win.")
-                            return
-                else:
-                    return
 
-                game["executive_action"] = None
-                if game.get("winner"):
-                    return
-                advance_presidency(game)
-                start_nomination(game)
-                progressed = True
+@app.before_request
+def start_background_workers():
+    AI_SCHEDULER.start()
+    ROOM_SWEEPER.start()
+    if JOURNAL:
+        JOURNAL.start(room_codes, locked_game)
+    if TOURNAMENT:
+        TOURNAMENT.start(open_tournament_table, locked_game, close_tournament_table, humans_waiting)
 
-        if not progressed:
-            return
 
-def advance_presidency(game: dict) -> None:
-    normalize_order(game)
-    order = game.get("order") or list(game.get("players", {}).keys())
-    if not order:
-        return
-    return_id = game.get("special_election_return_id")
-    if return_id and return_id in order:
-        game["special_election_return_id"] = None
-        return_idx = order.index(return_id)
-        game["president_index"] = return_idx
-        game["president_id"] = return_id
-        return
+if TOURNAMENT:
+    @app.before_request
+    def count_request():
+        global REQUESTS_IN_FLIGHT
+        request.environ["tournament.counted"] = True
+        with IN_FLIGHT_LOCK:
+            REQUESTS_IN_FLIGHT += 1
 
-    current_president = game.get("president_id")
-    if current_president in order:
-        current_idx = order.index(current_president)
-        next_idx = (current_idx + 1) % len(order)
-    else:
-        next_idx = 0
-
-    game["president_index"] = next_idx
-    game["president_id"] = order[next_idx]
-
-
-def normalize_order(game: dict) -> None:
-    players = [pid for pid, p in game.get("players", {}).items() if p.get("alive", True)]
-    seen = set()
-    order = []
-    for pid in (game.get("order") or []):
-        if pid in players and pid not in seen:
-            order.append(pid)
-            seen.add(pid)
-    for pid in players:
-        if pid not in seen:
-            order.append(pid)
-            seen.add(pid)
-    game["order"] = order
-    if game.get("president_id") not in order:
-        game["president_index"] = 0
-        game["president_id"] = order[0] if order else None
-
-
-
-def add_ai_players(players: dict, count: int) -> list:
-    ai_ids = []
-    used_names = {p["name"] for p in players.values() if "name" in p}
-    for i in range(count):
-        base = random.choice(AI_NAMES)
-        name = base
-        suffix = 2
-        while name in used_names:
-            name = f"{base} {suffix}"
-            suffix += 1
-        used_names.add(name)
-        ai_id = f"ai_{secrets.token_urlsafe(8)}"
-        players[ai_id] = {"name": name, "is_host": False, "is_ai": True, "alive": True}
-        ai_ids.append(ai_id)
-    return ai_ids
+    @app.teardown_request
+    def uncount_request(exc):
+        global REQUESTS_IN_FLIGHT
+        # Teardown also runs for requests that never reached count_request.
+        if request.environ.pop("tournament.counted", False):
+            with IN_FLIGHT_LOCK:
+                REQUESTS_IN_FLIGHT -= 1
 
 
 @app.get("/")
@@ -633,60 +772,23 @@ def index():
 @app.post("/host")
 def host():
     player_id = ensure_player_id()
-    code = create_unique_code()
 
     host_name = request.form.get("name", "").strip()
     if not host_name:
         flash("Enter a host name.")
         return redirect(url_for("index"))
+    ROOM_SWEEPER.enforce_cap(reserve=1)
+    code = create_unique_code()
 
     players = {
-        player_id: {"name": host_name, "is_host": True, "is_ai": False, "alive": True}
+        player_id: Player(name=host_name, is_host=True, seat=0)
     }
     ai_count = max(0, MAX_PLAYERS - len(players))
     add_ai_players(players, ai_count)
     player_ids = list(players.keys())
 
-    GAMES[code] = {
-        "code": code,
-        "host_id": player_id,
-        "players": players,
-        "player_count": 0,
-        "policy_deck": [],
-        "policy_discard": [],
-        "roles": {},
-        "president_id": None,
-        "order": [],
-        "president_index": 0,
-        "chancellor_id": None,
-        "last_president_id": None,
-        "last_chancellor_id": None,
-        "nominee_id": None,
-        "votes": {},
-        "phase": "lobby",
-        "liberal_policies": 0,
-        "fascist_policies": 0,
-        "election_tracker": 0,
-        "pending_policies": [],
-        "executive_action": None,
-        "veto_unlocked": False,
-        "veto_requested": False,
-        "veto_denied": False,
-        "special_election_return_id": None,
-        "private_info": {},
-        "private_seq": 0,
-        "suspicion": {},
-        "winner": None,
-        "victory_reason": None,
-        "last_vote": None,
-        "announcement_seq": 0,
-        "announcement": None,
-        "stats": default_stats(),
-        "end_ack": set(),
-        "investigated": set(),
-        "started": False,
-        "log": [],
-    }
+    game = new_game(code, player_id, players, log_tail=LOG_TAIL)
+    code = register_game(game)
 
     session["game_code"] = code
     session["is_host"] = True
@@ -708,31 +810,35 @@ def join():
         flash("Enter a player name.")
         return redirect(url_for("index"))
 
-    game = GAMES.get(code)
-    if not game:
-        flash("Game not found. Check the code and try again.")
-        return redirect(url_for("index"))
-
-    # Enforce max players, replacing AI slots when possible
-    if player_id not in game["players"] and len(game["players"]) >= MAX_PLAYERS:
-        ai_id = next((pid for pid, p in game["players"].items() if p.get("is_ai")), None)
-        if ai_id:
-            game["players"].pop(ai_id, None)
-            if "roles" in game:
-                ai_role = game["roles"].pop(ai_id, None)
-                if ai_role:
-                    game["roles"][player_id] = ai_role
-        else:
-            flash("That lobby is full (max 10 players).")
+    with locked_game(code) as game:
+        if not game:
+            flash("Game not found. Check the code and try again.")
             return redirect(url_for("index"))
 
-    # Add/update player
-    if player_id not in game["players"]:
-        game["players"][player_id] = {"name": name, "is_host": False, "is_ai": False, "alive": True}
-        if "roles" in game and player_id not in game["roles"]:
-            game["roles"][player_id] = "liberal"
-    else:
-        game["players"][player_id]["name"] = name
+        # Enforce max players, replacing AI slots when possible
+        seat = engine.joining_seat(game)
+        if player_id not in game["players"] and len(game["players"]) >= MAX_PLAYERS:
+            ai_id = next((pid for pid, p in game["players"].items() if p.get("is_ai")), None)
+            if ai_id:
+                seat = game["players"].pop(ai_id)["seat"]
+                if "roles" in game:
+                    ai_role = game["roles"].pop(ai_id, None)
+                    if ai_role:
+                        game["roles"][player_id] = ai_role
+            else:
+                flash("That lobby is full (max 10 players).")
+                return redirect(url_for("index"))
+
+        # Add/update player
+        if player_id not in game["players"]:
+            # A replaced AI's seat and role are taken over; anyone else gets engine.joining_seat.
+            game["players"][player_id] = Player(name=name, seat=seat)
+            if "roles" in game and player_id not in game["roles"]:
+                game["roles"][player_id] = "liberal"
+        else:
+            game["players"][player_id]["name"] = name
+        invalidate_index(game)
+        touch(game)
 
     session["game_code"] = code
     session["is_host"] = False
@@ -742,38 +848,39 @@ def join():
 
 @app.get("/lobby/<code>")
 def lobby(code: str):
-    game = GAMES.get(code)
-    if not game:
-        flash("That game no longer exists.")
-        return redirect(url_for("index"))
+    with locked_game(code) as game:
+        if not game:
+            flash("That game no longer exists.")
+            return redirect(url_for("index"))
 
-    # Prevent accidental cross-lobby viewing if user isn't in this game
-    pid = ensure_player_id()
-    if pid not in game["players"]:
-        flash("You are not in that lobby. Join with the code first.")
-        return redirect(url_for("index"))
+        # Prevent accidental cross-lobby viewing if user isn't in this game
+        pid = ensure_player_id()
+        if pid not in game["players"]:
+            flash("You are not in that lobby. Join with the code first.")
+            return redirect(url_for("index"))
+
+        is_host = (pid == game["host_id"])
+        return render_template("lobby.html", game=game, is_host=is_host, player_id=pid)
 
-    is_host = (pid == game["host_id"])
-    return render_template("lobby.html", game=game, is_host=is_host, player_id=pid)
 
 @app.get("/room/<code>")
 def room(code: str):
-    game = GAMES.get(code)
-    if not game:
-        flash("That game no longer exists.")
-        return redirect(url_for("index"))
+    with locked_game(code) as game:
+        if not game:
+            flash("That game no longer exists.")
+            return redirect(url_for("index"))
 
-    if not game.get("started"):
-        flash("Game has not started yet.")
-        return redirect(url_for("lobby", code=code))
+        if not game.get("started"):
+            flash("Game has not started yet.")
+            return redirect(url_for("lobby", code=code))
 
-    pid = ensure_player_id()
-    if pid not in game["players"]:
-        flash("You are not in that room.")
-        return redirect(url_for("index"))
+        pid = ensure_player_id()
+        if pid not in game["players"]:
+            flash("You are not in that room.")
+            return redirect(url_for("index"))
 
-    is_host = (pid == game["host_id"])
-    return render_template("room.html", game=game, is_host=is_host, player_id=pid)
+        is_host = (pid == game["host_id"])
+        return render_template("room.html", game=game, is_host=is_host, player_id=pid)
 
 
 @app.post("/leave")
@@ -781,17 +888,20 @@ def leave():
     code = session.get("game_code")
     pid = session.get("player_id")
 
-    if code and pid and code in GAMES:
-        game = GAMES[code]
-        game["players"].pop(pid, None)
+    if code and pid:
+        with locked_game(code) as game:
+            if game:
+                game["players"].pop(pid, None)
+                invalidate_index(game)
+                touch(game)
 
-        # If host leaves, delete the game (simple rule for now)
-        if pid == game["host_id"]:
-            GAMES.pop(code, None)
-        else:
-            # If no players left, delete
-            if not game["players"]:
-                GAMES.pop(code, None)
+                # If host leaves, delete the game (simple rule for now)
+                if pid == game["host_id"]:
+                    drop_game(code)
+                else:
+                    # If no players left, delete
+                    if not game["players"]:
+                        drop_game(code)
 
     session.pop("game_code", None)
     session.pop("is_host", None)
@@ -799,435 +909,464 @@ def leave():
     return redirect(url_for("index"))
 
 
-@app.get("/api/game/<code>")
-def api_game(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False}), 404
+HTTP_REQUESTS = metrics.REGISTRY.register(metrics.Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")))
+HTTP_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "http_request_duration_seconds", "Time to build each response (streams: until the first byte).",
+    ("method", "route")))
+STATE_BYTES = metrics.REGISTRY.register(metrics.Histogram(
+    "state_response_bytes", "Body size of /state responses (0 for 304).", (), metrics.SIZE_BUCKETS))
+AI_STEP_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "ai_step_seconds", "Time in each AI scheduler step, game lock held.", (), metrics.FAST_BUCKETS))
+AI_STEPS = metrics.REGISTRY.register(metrics.Counter(
+    "ai_steps_total", "AI scheduler steps that moved a game; divide by /state requests for steps per poll."))
+AI_SEARCH_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "ai_search_seconds", "Time planning searching AI seats for one step, off the game lock.", (),
+    metrics.LATENCY_BUCKETS))
+AI_DECISION_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "ai_decision_seconds", "Time for each AI seat's move in take_turn, by the kind of decision.", ("decision",),
+    metrics.FAST_BUCKETS))
+# The per-seat entry point, labelled by ai.decision_kind: search playouts call the decision
+# functions below it thousands of times a move, and must neither be counted nor pay for the timing.
+AI_DECISIONS = ("strategy_action",)
+
+
+def games_by_phase() -> dict:
+    with GAMES_LOCK:
+        phases = Counter(game.phase for game in GAMES.values())
+    return {(phase,): count for phase, count in phases.items()}
+
+
+metrics.REGISTRY.register(metrics.Gauge("games", "Live games by phase.", ("phase",), games_by_phase))
+metrics.REGISTRY.register(
+    metrics.Gauge("spectators", "Spectators watching, all rooms.", (), lambda: {(): sum(AUDIENCE.counts().values())})
+)
 
-    players = [{"id": pid, **p} for pid, p in game["players"].items()]
-    return jsonify({
-        "ok": True,
-        "code": code,
-        "host_id": game["host_id"],
-        "started": game.get("started", False),
-        "players": players
-    })
+if METRICS_ENABLED:
+    metrics.instrument(ai, AI_DECISIONS, AI_DECISION_SECONDS, ai.decision_kind)
+
+    @app.before_request
+    def start_request_timer():
+        request.environ["metrics.started"] = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        # One proxy lookup; werkzeug's context locals cost a few microseconds each.
+        req = request._get_current_object()
+        started = req.environ.get("metrics.started")
+        if started is None:
+            return response
+        route = req.url_rule.rule if req.url_rule else "unmatched"
+        HTTP_SECONDS.observe(time.perf_counter() - started, req.method, route)
+        HTTP_REQUESTS.inc(req.method, route, response.status_code)
+        if route == "/api/game/<code>/state":
+            STATE_BYTES.observe(response.content_length or 0)
+        return response
+
+    @app.get("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.before_request
+def start_room_trace():
+    if not tracing.TRACES or request.endpoint in ADMIN_ENDPOINTS:
+        return
+    trace = tracing.TRACES.get((request.view_args or {}).get("code"))
+    if trace is not None:
+        trace.enter()
+        request.environ["trace.started"] = time.perf_counter()
+
+
+@app.after_request
+def note_traced_status(response):
+    if "trace.started" in request.environ:
+        request.environ["trace.status"] = response.status_code
+    return response
+
+
+@app.teardown_request
+def finish_room_trace(exc=None):
+    # A teardown hook, unlike after_request, also runs when the view raised: the thread must
+    # leave the trace either way, or later engine calls on it are sampled into this room.
+    started = request.environ.pop("trace.started", None)
+    if started is not None:
+        trace = tracing.TRACES.get(request.view_args["code"])
+        if trace is not None:
+            trace.leave()
+            trace.event("request", request.endpoint, time.perf_counter() - started,
+                        method=request.method, status=request.environ.get("trace.status", 500))
+
+
+def admin_denied():
+    """Error response unless the request carries the configured admin token."""
+    if not ADMIN_TOKEN:
+        return jsonify({"ok": False, "message": "Admin endpoints are disabled."}), 404
+    if not secrets.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        return jsonify({"ok": False, "message": "Admin token required."}), 403
+    return None
 
 
-@app.post("/api/game/<code>/start")
-def api_start_game(code: str):
-    game = GAMES.get(code)
-    if not game:
+@app.route("/admin/game/<code>/trace", methods=["POST", "DELETE"])
+def admin_trace(code: str):
+    denied = admin_denied()
+    if denied:
+        return denied
+    if request.method == "DELETE":
+        trace = tracing.disable(code)
+        if trace is None:
+            return jsonify({"ok": False, "message": "That room is not being traced."}), 404
+        return jsonify({"ok": True, "trace": trace.summary()})
+
+    # {"profile": true, "interval_ms": 5} starts (or retunes) tracing for this room.
+    data = request.get_json(silent=True) or {}
+    if code not in GAMES:
         return jsonify({"ok": False, "message": "Game not found."}), 404
+    interval = max(float(data.get("interval_ms", 5)), 1.0) / 1000
+    trace = tracing.enable(code, profile=bool(data.get("profile", True)), interval=interval)
+    return jsonify({"ok": True, "trace": trace.summary()})
+
+
+@app.get("/admin/game/<code>/timeline")
+def admin_timeline(code: str):
+    denied = admin_denied()
+    if denied:
+        return denied
+    trace = tracing.TRACES.get(code)
+    if trace is None:
+        return jsonify({"ok": False, "message": "That room is not being traced."}), 404
+    return jsonify({"ok": True, "trace": trace.summary(), "events": list(trace.timeline)})
+
 
-    pid = ensure_player_id()
-    if pid != game["host_id"]:
-        return jsonify({"ok": False, "message": "Only the host can start the game."}), 403
-
-    player_ids = list(game["players"].keys())
-    game["player_count"] = len(player_ids)
-    game["policy_deck"] = build_deck()
-    game["policy_discard"] = []
-    game["roles"] = assign_roles(player_ids)
-    order = player_ids[:]
-    random.shuffle(order)
-    game["order"] = order
-    game["president_index"] = 0
-    game["president_id"] = order[0] if order else None
-    game["chancellor_id"] = None
-    game["last_president_id"] = None
-    game["last_chancellor_id"] = None
-    game["nominee_id"] = None
-    game["votes"] = {}
-    game["phase"] = "nominate"
-    game["liberal_policies"] = 0
-    game["fascist_policies"] = 0
-    game["election_tracker"] = 0
-    game["pending_policies"] = []
-    game["executive_action"] = None
-    game["veto_unlocked"] = False
-    game["veto_requested"] = False
-    game["veto_denied"] = False
-    game["special_election_return_id"] = None
-    game["private_info"] = {}
-    game["private_seq"] = 0
-    game["suspicion"] = {pid: 0 for pid in player_ids}
-    game["winner"] = None
-    game["victory_reason"] = None
-    game["last_vote"] = None
-    game["announcement_seq"] = 0
-    game["announcement"] = None
-    game["stats"] = default_stats()
-    game["end_ack"] = set()
-    game["investigated"] = set()
-    game["log"] = []
-    game["started"] = True
+@app.get("/admin/game/<code>/profile")
+def admin_profile(code: str):
+    denied = admin_denied()
+    if denied:
+        return denied
+    trace = tracing.TRACES.get(code)
+    if trace is None:
+        return jsonify({"ok": False, "message": "That room is not being traced."}), 404
+    # Folded stacks, one "frame;frame;frame count" per line (flamegraph.pl, speedscope).
+    return Response(trace.folded(), mimetype="text/plain")
 
+
+ADMIN_ENDPOINTS = {"admin_trace", "admin_timeline", "admin_profile"}
+
+
+@app.get("/api/stats")
+def api_stats():
+    with GAMES_LOCK:
+        phases = Counter(room_phase(game) for game in GAMES.values())
     return jsonify({
         "ok": True,
-        "started": True,
+        "games": sum(phases.values()),
+        "phases": {phase: phases[phase] for phase in ROOM_TTLS},
+        "evicted": ROOM_SWEEPER.counters(),
+        "spectators": AUDIENCE.counts(),
     })
 
 
-@app.get("/api/game/<code>/state")
-def api_state(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False, "message": "Game not found."}), 404
-    if not game.get("started"):
-        return jsonify({"ok": False, "message": "Game not started."}), 400
+@app.get("/api/tournament")
+def api_tournament():
+    return jsonify({"ok": True, "enabled": bool(TOURNAMENT), **TOURNAMENT.summary()})
 
-    pid = ensure_player_id()
-    if pid not in game["players"]:
-        return jsonify({"ok": False, "message": "Not in this lobby."}), 403
 
-    normalize_order(game)
-    run_ai_turns(game)
-    ensure_stats(game)
+@app.get("/api/game/<code>")
+def api_game(code: str):
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False}), 404
 
-    players = [{"id": pid2, **p} for pid2, p in game["players"].items()]
-    alive = alive_ids(game)
-    votes = game.get("votes", {})
-    vote_cast = len(votes)
-    vote_total = len(alive)
-    vote_complete = vote_cast == vote_total and game.get("phase") == "vote"
+        return conditional(f"lobby-{game['version']}", lambda: jsonify(lobby_payload(game)))
 
-    response = {
-        "ok": True,
-        "phase": game.get("phase"),
-        "players": players,
-        "order": game.get("order"),
-        "president_id": game.get("president_id"),
-        "chancellor_id": game.get("chancellor_id"),
-        "nominee_id": game.get("nominee_id"),
-        "last_president_id": game.get("last_president_id"),
-        "last_chancellor_id": game.get("last_chancellor_id"),
-        "liberal_policies": game.get("liberal_policies", 0),
-        "fascist_policies": game.get("fascist_policies", 0),
-        "election_tracker": game.get("election_tracker", 0),
-        "policy_deck_count": len(game.get("policy_deck", [])),
-        "policy_discard_count": len(game.get("policy_discard", [])),
-        "veto_unlocked": game.get("veto_unlocked", False),
-        "executive_action": game.get("executive_action"),
-        "eligible_chancellors": eligible_chancellors(game),
-        "vote": {
-            "total": vote_total,
-            "cast": vote_cast,
-            "revealed": vote_complete,
-            "votes": votes if vote_complete else None,
-        },
-        "last_vote": game.get("last_vote"),
-        "announcement": game.get("announcement"),
-        "winner": game.get("winner"),
-        "victory_reason": game.get("victory_reason"),
-        "stats": game.get("stats", {}),
-        "you_id": pid,
-        "log": game.get("log", []),
-    }
 
-    if game.get("winner"):
-        response["final_roles"] = [
-            {
-                "id": pid2,
-                "name": p.get("name"),
-                "role": game.get("roles", {}).get(pid2),
-                "party": party_for_role(game.get("roles", {}).get(pid2, "")),
-                "alive": p.get("alive", True),
-                "is_ai": p.get("is_ai", False),
-            }
-            for pid2, p in game.get("players", {}).items()
-        ]
+@app.post("/api/game/<code>/start")
+def api_start_game(code: str):
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False, "message": "Game not found."}), 404
 
-    action = build_player_action(game, pid)
-    private_info = game.get("private_info", {}).get(pid)
-    response["self"] = {"action": action, "private_info": private_info}
-    return jsonify(response)
+        pid = ensure_player_id()
+        if pid != game["host_id"]:
+            return jsonify({"ok": False, "message": "Only the host can start the game."}), 403
 
+        engine.start_game(game)
 
-@app.post("/api/game/<code>/nominate")
-def api_nominate(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False, "message": "Game not found."}), 404
-    if not game.get("started"):
-        return jsonify({"ok": False, "message": "Game not started."}), 400
-    if game.get("phase") != "nominate":
-        return jsonify({"ok": False, "message": "Not in nomination phase."}), 400
+        return jsonify({
+            "ok": True,
+            "started": True,
+        })
 
-    pid = ensure_player_id()
-    if pid != game.get("president_id"):
-        return jsonify({"ok": False, "message": "Only the President can nominate."}), 403
-    if not game["players"][pid].get("alive", True):
-        return jsonify({"ok": False, "message": "President is not alive."}), 403
 
-    data = request.get_json(silent=True) or {}
-    nominee_id = data.get("chancellor_id")
-    if not nominee_id:
-        return jsonify({"ok": False, "message": "Chancellor is required."}), 400
-    if nominee_id not in game["players"]:
-        return jsonify({"ok": False, "message": "Player not found."}), 400
-    if nominee_id not in eligible_chancellors(game):
-        return jsonify({"ok": False, "message": "Chancellor is not eligible."}), 400
+@app.get("/api/game/<code>/state")
+def api_state(code: str):
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False, "message": "Game not found."}), 404
+        if not game.get("started"):
+            return jsonify({"ok": False, "message": "Game not started."}), 400
+
+        pid = ensure_player_id()
+        if pid not in game["players"]:
+            return jsonify({"ok": False, "message": "Not in this lobby."}), 403
+
+        # ?since=<version>&log_since=<announcement id> returns only what changed.
+        since = request.args.get("since", type=int)
+        log_after = request.args.get("log_since", 0, type=int)
+        # Private info and pending actions only change through touch(), so the version covers them.
+        return conditional(
+            f"state-{game['version']}-{since}-{log_after}-{pid}",
+            lambda: app.response_class(state_payload(game, pid, since, log_after), mimetype="application/json"),
+        )
+
+
+@app.get("/api/game/<code>/log")
+def api_log(code: str):
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False, "message": "Game not found."}), 404
+
+        pid = ensure_player_id()
+        if pid not in game["players"]:
+            return jsonify({"ok": False, "message": "Not in this lobby."}), 403
+
+        # ?before=<id>&limit=N pages backwards from the newest entry (or from before).
+        before = request.args.get("before", type=int)
+        limit = min(max(request.args.get("limit", LOG_PAGE_LIMIT, type=int), 1), LOG_PAGE_LIMIT)
+        entries = game.log.page(before, limit)
+        return jsonify({"ok": True, "entries": entries, "more": bool(entries) and entries[0]["id"] > 1})
+
+
+EVENT_GONE = "event: gone\ndata: {}\n\n"
+
+
+class EventStream(abc.ABC):
+    """Frames for one /events connection. ``next()`` returns the frame for whatever
+    changed since version ``sent`` (None if nothing, EVENT_GONE once the room or
+    seat is gone); the server waits for the version to move between calls.
+    """
+
+    def __init__(self, code: str):
+        self.code = code
+        self.sent = None
+        self.log_after = 0
+
+    @abc.abstractmethod
+    def next(self) -> str | None:
+        pass
+
+
+class SeatEvents(EventStream):
+    """A seat's stream: its full view first, then deltas against the last version sent."""
+
+    def __init__(self, code: str, pid: str, lobby_view: bool):
+        super().__init__(code)
+        self.pid = pid
+        self.lobby_view = lobby_view
+
+    def next(self) -> str | None:
+        with locked_game(self.code) as game:
+            if not game or self.pid not in game["players"]:
+                return EVENT_GONE
+            # An open stream counts as activity even when nothing is posted.
+            game["last_active"] = time.monotonic()
+            version = game.get("version", 0)
+            if version == self.sent:
+                return None
+            # Encode under the lock; the socket write happens outside it.
+            if self.lobby_view:
+                payload = fastjson.dumps(lobby_payload(game))
+            else:
+                payload = state_payload(game, self.pid, self.sent, self.log_after)
+                if game.get("log"):
+                    self.log_after = game["log"][-1]["id"]
+            self.sent = version
+        return f"id: {version}\ndata: {payload}\n\n"
+
+
+class SpectatorEvents(EventStream):
+    """A spectator's stream: the shared spectator frames, plus a ``viewers`` event when the count changes."""
+
+    def __init__(self, code: str, viewer: str):
+        super().__init__(code)
+        self.viewer = viewer
+        self.shown = None
+
+    def next(self) -> str | None:
+        with locked_game(self.code) as game:
+            if not game:
+                return EVENT_GONE
+            AUDIENCE.seen(self.code, self.viewer)
+            frame = None
+            version = game.get("version", 0)
+            if version != self.sent:
+                frame = spectator_frame(game, self.sent, self.log_after)
+                if game.get("log"):
+                    self.log_after = game["log"][-1]["id"]
+                self.sent = game.get("version", 0)
+        viewers = AUDIENCE.count(self.code)
+        if viewers != self.shown:
+            self.shown = viewers
+            frame = f'event: viewers\ndata: {{"spectators":{viewers}}}\n\n' + (frame or "")
+        return frame
+
+
+def stream_events(events: EventStream):
+    while True:
+        frame = events.next()
+        if frame is not None:
+            yield frame
+        if frame is EVENT_GONE:
+            return
+        if not wait_for_change(events.code, events.sent, EVENT_KEEPALIVE_SECONDS):
+            yield ": keep-alive\n\n"
+
+
+def event_response(events: EventStream) -> Response:
+    return Response(
+        stream_events(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def open_events(code: str):
+    """A SeatEvents for this session's seat, or an error response."""
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False, "message": "Game not found."}), 404
+
+        pid = ensure_player_id()
+        if pid not in game["players"]:
+            return jsonify({"ok": False, "message": "Not in this lobby."}), 403
+        lobby_view = request.args.get("view") == "lobby"
+        if not lobby_view and not game.get("started"):
+            return jsonify({"ok": False, "message": "Game not started."}), 400
+    return SeatEvents(code, pid, lobby_view)
+
+
+@app.get("/api/game/<code>/events")
+def api_events(code: str):
+    events = open_events(code)
+    if not isinstance(events, EventStream):
+        return events
+    return event_response(events)
+
+
+@app.get("/api/game/<code>/spectate")
+def api_spectate(code: str):
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False, "message": "Game not found."}), 404
+        if not game.get("started"):
+            return jsonify({"ok": False, "message": "Game not started."}), 400
+
+        AUDIENCE.seen(code, ensure_player_id())
+        since = request.args.get("since", type=int)
+        log_after = request.args.get("log_since", 0, type=int)
+        response = conditional(
+            f"spectate-{game['version']}-{since}-{log_after}",
+            lambda: app.response_class(spectator_payload(game, since, log_after), mimetype="application/json"),
+        )
+    response.headers["X-Spectators"] = str(AUDIENCE.count(code))
+    return response
+
+
+def open_spectate(code: str):
+    """A SpectatorEvents for this session, or an error response."""
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False, "message": "Game not found."}), 404
+        if not game.get("started"):
+            return jsonify({"ok": False, "message": "Game not started."}), 400
+    return SpectatorEvents(code, ensure_player_id())
+
+
+@app.get("/api/game/<code>/spectate/events")
+def api_spectate_events(code: str):
+    events = open_spectate(code)
+    if not isinstance(events, EventStream):
+        return events
+    return event_response(events)
+
+
+def apply_action(code: str, action: dict):
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False, "message": "Game not found."}), 404
+        try:
+            engine.apply(game, action)
+        except IllegalAction as e:
+            return jsonify({"ok": False, "message": e.message}), e.status
+        return jsonify({"ok": True})
+
 
-    start_vote(game, nominee_id)
-    return jsonify({"ok": True})
+@app.post("/api/game/<code>/nominate")
+def api_nominate(code: str):
+    data = request.get_json(silent=True) or {}
+    return apply_action(code, {
+        "type": "nominate",
+        "player_id": ensure_player_id(),
+        "chancellor_id": data.get("chancellor_id"),
+    })
 
 
 @app.post("/api/game/<code>/vote")
 def api_vote(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False, "message": "Game not found."}), 404
-    if not game.get("started"):
-        return jsonify({"ok": False, "message": "Game not started."}), 400
-    if game.get("phase") != "vote":
-        return jsonify({"ok": False, "message": "Not in voting phase."}), 400
-
-    pid = ensure_player_id()
-    if pid not in game["players"]:
-        return jsonify({"ok": False, "message": "Not in this lobby."}), 403
-    if not game["players"][pid].get("alive", True):
-        return jsonify({"ok": False, "message": "You are not alive."}), 403
-    if pid in game.get("votes", {}):
-        return jsonify({"ok": False, "message": "Vote already cast."}), 400
-
     data = request.get_json(silent=True) or {}
     vote_raw = data.get("vote")
     if isinstance(vote_raw, str):
         vote_raw = vote_raw.lower()
-    if vote_raw not in ("ja", "nein", True, False):
-        return jsonify({"ok": False, "message": "Vote must be Ja or Nein."}), 400
-
-    game.setdefault("votes", {})[pid] = (vote_raw is True) or (vote_raw == "ja")
-    if len(game["votes"]) == len(alive_ids(game)):
-        resolve_vote(game)
-    return jsonify({"ok": True})
+    vote = None
+    # Lists and objects can't be looked up; left as None, the engine rejects them with a 400.
+    # 1 and 0 match the True and False keys, so clients sending them keep working.
+    if isinstance(vote_raw, (str, int)):
+        vote = {"ja": True, "nein": False, True: True, False: False}.get(vote_raw)
+    return apply_action(code, {"type": "vote", "player_id": ensure_player_id(), "vote": vote})
 
 
 @app.post("/api/game/<code>/legis/president")
 def api_legis_president(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False, "message": "Game not found."}), 404
-    if not game.get("started"):
-        return jsonify({"ok": False, "message": "Game not started."}), 400
-    if game.get("phase") != "legislative_president":
-        return jsonify({"ok": False, "message": "Not in President legislative phase."}), 400
-
-    pid = ensure_player_id()
-    if pid != game.get("president_id"):
-        return jsonify({"ok": False, "message": "Only the President can discard."}), 403
-
     data = request.get_json(silent=True) or {}
-    discard_index = data.get("discard_index")
-    if discard_index is None:
-        return jsonify({"ok": False, "message": "Discard choice required."}), 400
-
-    policies = list(game.get("pending_policies", []))
-    if len(policies) != 3:
-        return jsonify({"ok": False, "message": "No policies to discard."}), 400
-
-    if not isinstance(discard_index, int) or discard_index < 0 or discard_index >= len(policies):
-        return jsonify({"ok": False, "message": "Invalid discard choice."}), 400
-
-    discarded = policies.pop(discard_index)
-    game.setdefault("policy_discard", []).append(discarded)
-    game["pending_policies"] = policies
-    game["phase"] = "legislative_chancellor"
-    return jsonify({"ok": True})
+    return apply_action(code, {
+        "type": "president_discard",
+        "player_id": ensure_player_id(),
+        "discard_index": data.get("discard_index"),
+    })
 
 
 @app.post("/api/game/<code>/legis/chancellor")
 def api_legis_chancellor(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False, "message": "Game not found."}), 404
-    if not game.get("started"):
-        return jsonify({"ok": False, "message": "Game not started."}), 400
-    if game.get("phase") != "legislative_chancellor":
-        return jsonify({"ok": False, "message": "Not in Chancellor legislative phase."}), 400
-
-    pid = ensure_player_id()
-    if pid != game.get("chancellor_id"):
-        return jsonify({"ok": False, "message": "Only the Chancellor can enact."}), 403
-
     data = request.get_json(silent=True) or {}
-    if data.get("veto"):
-        if not game.get("veto_unlocked"):
-            return jsonify({"ok": False, "message": "Veto power not unlocked."}), 400
-        if game.get("veto_denied"):
-            return jsonify({"ok": False, "message": "Veto already denied."}), 400
-        ensure_stats(game)["vetos_requested"] += 1
-        game["veto_requested"] = True
-        game["phase"] = "veto_pending"
-        announce(game, "Chancellor requested a veto.")
-        return jsonify({"ok": True})
-
-    enact_index = data.get("enact_index")
-    if enact_index is None:
-        return jsonify({"ok": False, "message": "Enact choice required."}), 400
-
-    policies = list(game.get("pending_policies", []))
-    if len(policies) != 2:
-        return jsonify({"ok": False, "message": "No policies to enact."}), 400
-    if not isinstance(enact_index, int) or enact_index < 0 or enact_index >= len(policies):
-        return jsonify({"ok": False, "message": "Invalid enact choice."}), 400
-
-    enacted = policies.pop(enact_index)
-    game.setdefault("policy_discard", []).extend(policies)
-    game["pending_policies"] = []
-    apply_policy(game, enacted)
-    game["executive_action"] = game.get("executive_action")
-
-    if game.get("phase") == "executive_action" or game.get("winner"):
-        return jsonify({"ok": True})
-
-    advance_presidency(game)
-    start_nomination(game)
-    return jsonify({"ok": True})
+    return apply_action(code, {
+        "type": "chancellor_enact",
+        "player_id": ensure_player_id(),
+        "enact_index": data.get("enact_index"),
+        "veto": bool(data.get("veto")),
+    })
 
 
 @app.post("/api/game/<code>/veto")
 def api_veto(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False, "message": "Game not found."}), 404
-    if not game.get("started"):
-        return jsonify({"ok": False, "message": "Game not started."}), 400
-    if game.get("phase") != "veto_pending":
-        return jsonify({"ok": False, "message": "No veto pending."}), 400
-
-    pid = ensure_player_id()
-    if pid != game.get("president_id"):
-        return jsonify({"ok": False, "message": "Only the President can decide the veto."}), 403
-
     data = request.get_json(silent=True) or {}
-    approve = bool(data.get("approve"))
-
-    if approve:
-        ensure_stats(game)["vetos_approved"] += 1
-        game.setdefault("policy_discard", []).extend(game.get("pending_policies", []))
-        game["pending_policies"] = []
-        game["veto_requested"] = False
-        game["veto_denied"] = False
-        game["election_tracker"] = int(game.get("election_tracker", 0)) + 1
-        announce(game, "Veto approved. The agenda was discarded.")
-        if game.get("election_tracker", 0) >= 3:
-            enact_anarchy(game)
-            if game.get("winner"):
-                return jsonify({"ok": True})
-        advance_presidency(game)
-        start_nomination(game)
-        return jsonify({"ok": True})
-
-    game["veto_requested"] = False
-    game["veto_denied"] = True
-    game["phase"] = "legislative_chancellor"
-    announce(game, "Veto denied. Chancellor must enact a policy.")
-    return jsonify({"ok": True})
+    return apply_action(code, {
+        "type": "veto_decision",
+        "player_id": ensure_player_id(),
+        "approve": bool(data.get("approve")),
+    })
 
 
 @app.post("/api/game/<code>/executive")
 def api_executive(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False, "message": "Game not found."}), 404
-    if not game.get("started"):
-        return jsonify({"ok": False, "message": "Game not started."}), 400
-    if game.get("phase") != "executive_action":
-        return jsonify({"ok": False, "message": "No executive action pending."}), 400
-
-    pid = ensure_player_id()
-    if pid != game.get("president_id"):
-        return jsonify({"ok": False, "message": "Only the President can act."}), 403
-
-    action = (game.get("executive_action") or {}).get("type")
     data = request.get_json(silent=True) or {}
+    return apply_action(code, {
+        "type": "executive",
+        "player_id": ensure_player_id(),
+        "target_id": data.get("target_id"),
+    })
 
-    if action == "policy_peek":
-        ensure_policy_deck(game, 3)
-        top = game.get("policy_deck", [])[:3]
-        set_private_info(game, pid, "policy_peek", {"policies": top})
-        ensure_stats(game)["policy_peeks"] += 1
-        announce(game, "President used Policy Peek.")
-    elif action == "investigate":
-        target_id = data.get("target_id")
-        if not target_id or target_id not in game["players"]:
-            return jsonify({"ok": False, "message": "Target required."}), 400
-        if not game["players"][target_id].get("alive", True):
-            return jsonify({"ok": False, "message": "Target is not alive."}), 400
-        if target_id in game.get("investigated", set()):
-            return jsonify({"ok": False, "message": "That player has already been investigated."}), 400
-        party = party_for_role(game["roles"][target_id])
-        set_private_info(game, pid, "investigation", {"target_id": target_id, "party": party})
-        game.setdefault("investigated", set()).add(target_id)
-        ensure_stats(game)["investigations"] += 1
-        announce(game, f"President investigated {game['players'][target_id]['name']}.")
-    elif action == "special_election":
-        target_id = data.get("target_id")
-        if not target_id or target_id not in game["players"]:
-            return jsonify({"ok": False, "message": "Target required."}), 400
-        if not game["players"][target_id].get("alive", True):
-            return jsonify({"ok": False, "message": "Target is not alive."}), 400
-        ensure_stats(game)["special_elections"] += 1
-        order = game.get("order") or alive_ids(game)
-        if game.get("president_id") in order:
-            idx = order.index(game.get("president_id"))
-            return_id = order[(idx + 1) % len(order)]
-        else:
-            return_id = order[0] if order else None
-        game["special_election_return_id"] = return_id
-        game["president_id"] = target_id
-        game["president_index"] = order.index(target_id) if target_id in order else 0
-        announce(game, f"Special Election: {game['players'][target_id]['name']} is next President.")
-        game["executive_action"] = None
-        start_nomination(game)
-        return jsonify({"ok": True})
-    elif action == "execution":
-        target_id = data.get("target_id")
-        if not target_id or target_id not in game["players"]:
-            return jsonify({"ok": False, "message": "Target required."}), 400
-        if target_id == pid:
-            return jsonify({"ok": False, "message": "Cannot execute yourself."}), 400
-        if not game["players"][target_id].get("alive", True):
-            return jsonify({"ok": False, "message": "Target is not alive."}), 400
-        ensure_stats(game)["executions"] += 1
-        game["players"][target_id]["alive"] = False
-        announce(game, f"{game['players'][target_id]['name']} was executed.")
-        if game.get("roles", {}).get(target_id) == "hitler":
-            game["winner"] = "liberal"
-            game["phase"] = "game_over"
-            game["victory_reason"] = "hitler_executed"
-            announce(game, "Hitler was executed. Liberals win.")
-            return jsonify({"ok": True})
-    else:
-        return jsonify({"ok": False, "message": "Unknown executive action."}), 400
-
-    game["executive_action"] = None
-    if game.get("winner"):
-        return jsonify({"ok": True})
-    advance_presidency(game)
-    start_nomination(game)
-    return jsonify({"ok": True})
-
-
-@app.get("/api/game/<code>/role")
-def api_role(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False, "message": "Game not found."}), 404
-    if not game.get("started"):
-        return jsonify({"ok": False, "message": "Game not started."}), 400
-
-    pid = ensure_player_id()
-    if pid not in game["players"]:
-        return jsonify({"ok": False, "message": "Not in this lobby."}), 403
-
-    role = game.get("roles", {}).get(pid)
-    if not role:
-        return jsonify({"ok": False, "message": "Role not assigned."}), 400
 
+def role_payload(game: dict, pid: str, role: str) -> dict:
     response = {
         "ok": True,
         "role": role,
@@ -1244,30 +1383,102 @@ def api_role(code: str):
         fascists = [pid2 for pid2, r in game["roles"].items() if r == "fascist"]
         response["other_fascists"] = [game["players"][fid]["name"] for fid in fascists]
 
-    return jsonify(response)
+    return response
 
 
-@app.post("/api/game/<code>/end_ack")
-def api_end_ack(code: str):
-    game = GAMES.get(code)
-    if not game:
-        return jsonify({"ok": False, "message": "Game not found."}), 404
-    if not game.get("winner"):
-        return jsonify({"ok": False, "message": "Game is not over."}), 400
+@app.get("/api/game/<code>/role")
+def api_role(code: str):
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False, "message": "Game not found."}), 404
+        if not game.get("started"):
+            return jsonify({"ok": False, "message": "Game not started."}), 400
 
-    pid = ensure_player_id()
-    if pid not in game["players"]:
-        return jsonify({"ok": False, "message": "Not in this lobby."}), 403
+        pid = ensure_player_id()
+        if pid not in game["players"]:
+            return jsonify({"ok": False, "message": "Not in this lobby."}), 403
 
-    acked = game.setdefault("end_ack", set())
-    acked.add(pid)
-    humans = [pid2 for pid2, p in game.get("players", {}).items() if not p.get("is_ai")]
-    dissolved = all(pid2 in acked for pid2 in humans)
-    if dissolved:
-        GAMES.pop(code, None)
-    return jsonify({"ok": True, "dissolved": dissolved})
+        role = game.get("roles", {}).get(pid)
+        if not role:
+            return jsonify({"ok": False, "message": "Role not assigned."}), 400
+
+        # Roles and names only change with the roster (start, joins, leaves).
+        return conditional(
+            f"role-{game['roster_version']}-{pid}",
+            lambda: jsonify(role_payload(game, pid, role)),
+        )
+
+
+@app.post("/api/game/<code>/end_ack")
+def api_end_ack(code: str):
+    with locked_game(code) as game:
+        if not game:
+            return jsonify({"ok": False, "message": "Game not found."}), 404
+        if not game.get("winner"):
+            return jsonify({"ok": False, "message": "Game is not over."}), 400
+
+        pid = ensure_player_id()
+        if pid not in game["players"]:
+            return jsonify({"ok": False, "message": "Not in this lobby."}), 403
+
+        acked = game.setdefault("end_ack", set())
+        acked.add(pid)
+        humans = [pid2 for pid2, p in game.get("players", {}).items() if not p.get("is_ai")]
+        dissolved = all(pid2 in acked for pid2 in humans)
+        touch(game)
+        if dissolved:
+            drop_game(code)
+        return jsonify({"ok": True, "dissolved": dissolved})
+
+
+def retry_stale(view):
+    """Re-run ``view`` when it lost a save race to another worker."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        for _ in range(STALE_RETRIES):
+            try:
+                return view(*args, **kwargs)
+            except StaleGame:
+                continue
+        return jsonify({"ok": False, "message": "The room is busy, try again."}), 409
+    return wrapper
+
+
+if STORE.shared:
+    for endpoint, view in list(app.view_functions.items()):
+        app.view_functions[endpoint] = retry_stale(view)
+
+
+def serve_workers(host: str, port: int, workers: int) -> None:
+    """Fork ``workers`` processes serving one listening socket; they share rooms through STORE."""
+    import socket
+    from werkzeug.serving import make_server
+
+    if not STORE.shared:
+        raise SystemExit("WORKERS > 1 needs a shared GAME_STORE, e.g. sqlite:///rooms.db")
+    listener = socket.create_server((host, port), backlog=128)
+    listener.set_inheritable(True)
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            make_server(host, port, app, threaded=True, fd=listener.fileno()).serve_forever()
+            os._exit(0)
+        children.append(pid)
+    print(f" * {workers} workers serving http://{host}:{port} (store: {os.getenv('GAME_STORE')})")
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
     # For LAN hosting: run with host="0.0.0.0"
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    HOST = os.getenv("HOST", "0.0.0.0")
+    PORT = int(os.getenv("PORT", "5000"))
+    WORKERS = int(os.getenv("WORKERS", "1"))
+    if WORKERS > 1 or STORE.shared:
+        serve_workers(HOST, PORT, WORKERS)
+    else:
+        app.run(host=HOST, port=PORT, debug=True)
@@ -0,0 +1,151 @@
+"""Prometheus metrics in the text exposition format, without the client library.
+
+Counters and histograms are labelled and thread-safe; gauges are read from a
+callback when scraped. ``REGISTRY.render()`` produces the body for /metrics.
+``instrument`` wraps module-level functions with a timing histogram, so code
+like ai.py stays free of metrics calls and pays nothing when metrics are off.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+# Request latencies are around a millisecond; AI decisions are tens of microseconds.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+FAST_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.05)
+SIZE_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: dict = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            series = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        for labels, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _labels(self.labelnames, labels, f'le="{bound}"'), cumulative
+            yield f"{self.name}_sum", _labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _labels(self.labelnames, labels), cumulative
+
+
+class Gauge:
+    """A gauge whose values come from ``collect()``: ``{label values tuple: value}``."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple, collect):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.collect = collect
+
+    def samples(self):
+        for labels, value in sorted(self.collect().items()):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def timed(histogram: Histogram, label):
+    """Decorator recording each call's duration in ``histogram`` under ``label``.
+
+    ``label`` may instead be a function of the call's arguments returning the label.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            value = label(*args, **kwargs) if callable(label) else label
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, value)
+        return inner
+    return wrap
+
+
+def instrument(module, names, histogram: Histogram, label=None) -> None:
+    """Replace ``module.<name>`` for each name with a timed wrapper (calls through the module see it).
+
+    Observations are labelled with the function's name, or by ``label`` as in ``timed``.
+    """
+    for name in names:
+        fn = getattr(module, name)
+        if not hasattr(fn, "__wrapped__"):
+            setattr(module, name, timed(histogram, label or name)(fn))
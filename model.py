@@ -0,0 +1,287 @@
+"""Compact game and player records.
+
+``Game`` and ``Player`` are slotted dataclasses instead of per-room dicts. They
+still answer ``game["phase"]``, ``game.get(...)`` and ``game.setdefault(...)``,
+so the rules in engine.py read the same either way. Policy piles are stored one
+byte per card, and the announcement log keeps only its tail uncompressed.
+"""
+import json
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field, fields
+from typing import Any, Optional
+
+_MISSING = object()
+
+POLICY_CODES = {"liberal": 0, "fascist": 1}
+POLICY_NAMES = ("liberal", "fascist")
+
+
+class PolicyPile(bytearray):
+    """A deck or discard pile holding one byte per card, read and written as policy names."""
+
+    __slots__ = ()
+
+    def __init__(self, cards=()):
+        super().__init__(POLICY_CODES[c] for c in cards)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [POLICY_NAMES[c] for c in bytearray.__getitem__(self, index)]
+        return POLICY_NAMES[bytearray.__getitem__(self, index)]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            bytearray.__setitem__(self, index, bytes(POLICY_CODES[c] for c in value))
+        else:
+            bytearray.__setitem__(self, index, POLICY_CODES[value])
+
+    def __iter__(self):
+        return (POLICY_NAMES[c] for c in bytearray.__iter__(self))
+
+    def __contains__(self, policy):
+        return bytearray.__contains__(self, POLICY_CODES[policy])
+
+    def __repr__(self):
+        return f"PolicyPile({list(self)!r})"
+
+    def __reduce_ex__(self, protocol):
+        return PolicyPile, (list(self),)
+
+    def append(self, policy):
+        bytearray.append(self, POLICY_CODES[policy])
+
+    def extend(self, policies):
+        bytearray.extend(self, (POLICY_CODES[c] for c in policies))
+
+    def count(self, policy):
+        return bytearray.count(self, POLICY_CODES[policy])
+
+
+class GameLog:
+    """Announcement log: the newest ``tail`` entries in a ring buffer, older ones archived.
+
+    Entries are ``{"id": n, "message": ...}`` with increasing ids. Entries pushed
+    out of the tail are zlib-compressed in chunks of ``chunk`` and stay
+    reachable through ``page``. Iteration, ``len`` and indexing see the tail only.
+    """
+
+    __slots__ = ("recent", "spilled", "archive", "chunk")
+
+    def __init__(self, entries=(), tail: int = 50, chunk: int = 100):
+        self.recent: deque = deque(maxlen=max(1, tail))
+        # Entries out of the tail but not yet compressed, oldest first.
+        self.spilled: list = []
+        # (first id, last id, zlib-compressed JSON list) per chunk, oldest first.
+        self.archive: list = []
+        self.chunk = chunk
+        for entry in entries:
+            self.append(entry)
+
+    @property
+    def tail(self) -> int:
+        return self.recent.maxlen
+
+    def __len__(self):
+        return len(self.recent)
+
+    def __iter__(self):
+        return iter(self.recent)
+
+    def __getitem__(self, index):
+        return self.recent[index]
+
+    def __repr__(self):
+        return f"GameLog(tail={self.tail}, recent={len(self.recent)}, archived={self.archived})"
+
+    @property
+    def archived(self) -> int:
+        return sum(last - first + 1 for first, last, _ in self.archive) + len(self.spilled)
+
+    def append(self, entry: dict) -> None:
+        if len(self.recent) == self.recent.maxlen:
+            self.spilled.append(self.recent.popleft())
+            if len(self.spilled) >= self.chunk:
+                blob = zlib.compress(json.dumps(self.spilled, separators=(",", ":")).encode())
+                self.archive.append((self.spilled[0]["id"], self.spilled[-1]["id"], blob))
+                self.spilled = []
+        self.recent.append(entry)
+
+    def entries(self) -> list:
+        """Every entry, archived ones included, oldest first."""
+        return self._archived_before(None) + list(self.recent)
+
+    def page(self, before: int | None = None, limit: int = 50) -> list:
+        """Up to ``limit`` of the newest entries with id below ``before``, oldest first."""
+        if limit <= 0:
+            return []
+        found = [e for e in self.recent if before is None or e["id"] < before][-limit:]
+        if len(found) < limit:
+            older = self._archived_before(before, limit - len(found))
+            found = older + found
+        return found
+
+    def _archived_before(self, before: int | None, limit: int | None = None) -> list:
+        # Walk newest-first, decompressing only the chunks the page reaches.
+        found = [e for e in self.spilled if before is None or e["id"] < before]
+        for first, last, blob in reversed(self.archive):
+            if limit is not None and len(found) >= limit:
+                break
+            if before is not None and first >= before:
+                continue
+            chunk = json.loads(zlib.decompress(blob))
+            found = [e for e in chunk if before is None or e["id"] < before] + found
+        return found if limit is None else found[-limit:] if limit else []
+
+
+class Record:
+    """Dict-style access to a slotted dataclass, so code written against plain dicts keeps working."""
+
+    __slots__ = ()
+    _keys: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # dataclass(slots=True) rebuilds the class, so this also runs once the slots exist.
+        cls._keys = frozenset(cls.__dict__.get("__slots__", ()))
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._keys:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Hot path: no field shares a name with a method here, so skip the _keys check.
+        return getattr(self, key, default)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        # Every slot always exists, so an unset (None) field counts as missing.
+        value = getattr(self, key, _MISSING)
+        if value is _MISSING or value is None:
+            self[key] = value = default
+        return value
+
+    def keys(self) -> tuple:
+        return self.__slots__
+
+    def items(self) -> list:
+        return [(key, getattr(self, key)) for key in self.__slots__]
+
+    def to_dict(self) -> dict:
+        """Plain-dict copy in the shape the game used before these records existed."""
+        out = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, PolicyPile):
+                value = list(value)
+            elif isinstance(value, dict):
+                value = {k: v.to_dict() if isinstance(v, Record) else v for k, v in value.items()}
+            out[f.name] = value
+        return out
+
+
+@dataclass(slots=True, eq=False)
+class Player(Record):
+    name: str
+    is_host: bool = False
+    is_ai: bool = False
+    alive: bool = True
+    # Small-integer seat index, fixed when the game starts.
+    seat: int = -1
+    # AI seats only: the ai.STRATEGIES entry it plays (None for the default).
+    strategy: Optional[str] = None
+
+
+@dataclass(slots=True, eq=False)
+class GameIndex:
+    """Lookups derived from players, roles and order (see engine.derived).
+
+    Rebuilt after executions, joins/leaves and order changes; the containers
+    are shared with callers and must not be mutated.
+    """
+    alive: tuple
+    alive_set: frozenset
+    hitler_id: Optional[str]
+    fascists: tuple
+    team: tuple
+    order_pos: dict
+    # Public per-player records ({"id": ..., **player}) as served by /state and the lobby.
+    players_view: list
+    order_normalized: bool = False
+    eligible_key: Optional[tuple] = None
+    eligible: tuple = ()
+    # Pre-encoded JSON (fastjson.Fragment) built from the above, by name.
+    fragments: dict = field(default_factory=dict)
+
+
+@dataclass(slots=True, eq=False)
+class Game(Record):
+    code: str
+    host_id: Optional[str]
+    players: dict
+    player_count: int = 0
+    policy_deck: PolicyPile = field(default_factory=PolicyPile)
+    policy_discard: PolicyPile = field(default_factory=PolicyPile)
+    roles: dict = field(default_factory=dict)
+    president_id: Optional[str] = None
+    order: list = field(default_factory=list)
+    president_index: int = 0
+    chancellor_id: Optional[str] = None
+    last_president_id: Optional[str] = None
+    last_chancellor_id: Optional[str] = None
+    nominee_id: Optional[str] = None
+    votes: dict = field(default_factory=dict)
+    phase: str = "lobby"
+    liberal_policies: int = 0
+    fascist_policies: int = 0
+    election_tracker: int = 0
+    pending_policies: list = field(default_factory=list)
+    executive_action: Optional[dict] = None
+    veto_unlocked: bool = False
+    veto_requested: bool = False
+    veto_denied: bool = False
+    special_election_return_id: Optional[str] = None
+    private_info: dict = field(default_factory=dict)
+    private_seq: int = 0
+    suspicion: dict = field(default_factory=dict)
+    winner: Optional[str] = None
+    victory_reason: Optional[str] = None
+    last_vote: Optional[dict] = None
+    announcement_seq: int = 0
+    announcement: Optional[dict] = None
+    stats: Optional[dict] = None
+    end_ack: set = field(default_factory=set)
+    investigated: set = field(default_factory=set)
+    # What each player has personally seen of the discard pile and deck top (see belief.py).
+    known_discards: dict = field(default_factory=dict)
+    known_top: dict = field(default_factory=dict)
+    # inference.RoleEvidence when NumPy is available; persisted as inference.encode_evidence.
+    role_evidence: Any = None
+    # Cached GameIndex; None until first needed and after anything it depends on changes.
+    index: Optional[GameIndex] = None
+    # Bumped with every index invalidation: a validator for views built from players and roles.
+    roster_version: int = 0
+    started: bool = False
+    log: GameLog = field(default_factory=GameLog)
+    version: int = 1
+    # Seeds the mid-game reshuffle so journaled actions replay to the same deck.
+    seed: int = 0
+    # (version before, version after, action) for each engine.apply while the journal
+    # collects them; None when persistence is off (see persistence.Journal).
+    applied: Optional[list] = None
+    # Bookkeeping for ?since= deltas on /state (see main.record_state_versions).
+    state_fields: Optional[dict] = None
+    # Encoded public /state views for the current version (see main.public_payload).
+    view_cache: Optional[dict] = None
+    # time.monotonic() of the last human request or open stream (see main.RoomSweeper).
+    last_active: float = field(default_factory=time.monotonic)
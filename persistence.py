@@ -0,0 +1,301 @@
+"""Optional crash-safe persistence: an append-only journal plus periodic snapshots.
+
+Every state transition is queued as one JSON line and written by a background
+thread that batches whatever is queued and fsyncs once per batch (group
+commit). Request threads never wait on the disk, so a crash loses at most the
+last ``commit_interval`` of transitions.
+
+Journal lines carry a global ``seq`` and one of three ops:
+
+    {"seq": ..., "code": ..., "op": "put", "game": {...}}        full room state
+    {"seq": ..., "code": ..., "op": "act", "from": v, "to": v2, "actions": [...]}
+    {"seq": ..., "code": ..., "op": "drop"}
+
+Engine actions are journaled as ``act`` (a few hundred bytes) and replayed
+through ``engine.apply``; anything else that bumps a room's version (joining,
+starting, leaving) is journaled as a ``put``. A snapshot stores every room
+with the ``seq`` it was captured at, so replay only applies journal lines
+newer than that mark and the old journal can be deleted once it is durable.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+import engine
+import inference
+from model import Game, GameLog, Player, PolicyPile
+
+log = logging.getLogger(__name__)
+
+JOURNAL_FILE = "journal.jsonl"
+ROTATED_FILE = "journal.old.jsonl"
+SNAPSHOT_FILE = "snapshot.jsonl"
+
+# Per-process bookkeeping that is rebuilt after a restart rather than stored (role_evidence
+# is stored in its own encoding instead, see encode_game).
+TRANSIENT_FIELDS = {
+    "state_fields", "view_cache", "last_active", "applied", "role_evidence", "index",
+}
+SET_FIELDS = {"end_ack", "investigated"}
+PILE_FIELDS = {"policy_deck", "policy_discard"}
+
+
+def encode_game(game: Game) -> dict:
+    data = game.to_dict()
+    for key in TRANSIENT_FIELDS:
+        data.pop(key, None)
+    for key in SET_FIELDS:
+        data[key] = sorted(data[key])
+    data["log"] = {"tail": game.log.tail, "entries": game.log.entries()}
+    if game.role_evidence is not None:
+        data["role_evidence"] = inference.encode_evidence(game.role_evidence)
+    return data
+
+
+def decode_game(data: dict) -> Game:
+    # Unknown keys are dropped, so a journal written by an older build still loads.
+    data = {key: value for key, value in data.items() if key in Game._keys}
+    evidence = data.pop("role_evidence", None)
+    data["players"] = {pid: Player(**p) for pid, p in data["players"].items()}
+    for key in SET_FIELDS:
+        data[key] = set(data.get(key) or ())
+    for key in PILE_FIELDS:
+        data[key] = PolicyPile(data.get(key) or ())
+    log = data.get("log") or {}
+    if isinstance(log, list):
+        # Written before the log became a GameLog.
+        log = {"entries": log}
+    data["log"] = GameLog(log.get("entries", ()), tail=log.get("tail", engine.LOG_TAIL))
+    game = Game(**data)
+    if game.started:
+        # Written before evidence was stored, it restarts from the prior; journal replay adds to either.
+        game.role_evidence = inference.decode_evidence(game, evidence)
+    return game
+
+
+def _fsync_dir(directory: str) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """Group-committed journal and snapshot writer for one data directory."""
+
+    def __init__(self, directory: str, snapshot_interval: float = 300.0, commit_interval: float = 0.01):
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self.commit_interval = commit_interval
+        self.seq = 0
+        self.durable_seq = 0
+        self.stats = {"entries": 0, "batches": 0, "bytes": 0, "snapshots": 0}
+        self._queue: list = []
+        self._cond = threading.Condition()
+        self._file = None
+        self._thread = None
+        self._rooms = None
+        self._lock_room = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # -- hot path -------------------------------------------------------------
+
+    def _enqueue(self, entry: dict) -> None:
+        with self._cond:
+            self.seq += 1
+            entry["seq"] = self.seq
+            # Encoded now, under the caller's game lock, so later mutations can't leak in.
+            self._queue.append(json.dumps(entry, separators=(",", ":")))
+            self._cond.notify()
+
+    def watch(self, game: Game) -> None:
+        """Start collecting engine actions on ``game`` (call with its lock held)."""
+        if game.applied is None:
+            game.applied = []
+
+    def record(self, code: str, game: Game, before: int) -> None:
+        """Journal the move from version ``before`` to the game's current version."""
+        applied, game.applied = game.applied or [], []
+        expected = before
+        for start, end, _ in applied:
+            if start != expected:
+                break
+            expected = end
+        else:
+            if applied and expected == game.version:
+                self._enqueue({"code": code, "op": "act", "from": before, "to": game.version,
+                               "actions": [action for _, _, action in applied]})
+                return
+        self.put(code, game)
+
+    def put(self, code: str, game: Game) -> None:
+        self._enqueue({"code": code, "op": "put", "game": encode_game(game)})
+
+    def drop(self, code: str) -> None:
+        self._enqueue({"code": code, "op": "drop"})
+
+    # -- writer thread ---------------------------------------------------------
+
+    def start(self, rooms: Callable[[], list], lock_room: Callable) -> None:
+        """Begin writing. ``rooms()`` lists room codes; ``lock_room(code)`` is a
+        context manager yielding that room's game with its lock held."""
+        self._rooms = rooms
+        self._lock_room = lock_room
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._file = open(self._path(JOURNAL_FILE), "a", encoding="utf-8")
+            self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        # Compact whatever was replayed at startup right away.
+        next_snapshot = time.monotonic()
+        while True:
+            with self._cond:
+                timeout = max(0.0, next_snapshot - time.monotonic()) if self.snapshot_interval > 0 else None
+                self._cond.wait_for(lambda: self._queue, timeout=timeout)
+            if self.snapshot_interval > 0 and time.monotonic() >= next_snapshot:
+                self.snapshot()
+                next_snapshot = time.monotonic() + self.snapshot_interval
+                continue
+            if self.commit_interval > 0:
+                # Let concurrent transitions pile into the same fsync.
+                time.sleep(self.commit_interval)
+            self._commit()
+
+    def _commit(self) -> None:
+        with self._cond:
+            batch, self._queue = self._queue, []
+            last = self.seq
+        if batch:
+            data = "\n".join(batch) + "\n"
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.stats["entries"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["bytes"] += len(data)
+        with self._cond:
+            self.durable_seq = max(self.durable_seq, last)
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until everything queued so far is on disk."""
+        with self._cond:
+            target = self.seq
+            self._cond.notify()
+            return self._cond.wait_for(lambda: self.durable_seq >= target, timeout=timeout)
+
+    def snapshot(self) -> None:
+        """Write every room to a fresh snapshot and retire the journal it covers.
+
+        Only called from the writer thread."""
+        self._commit()
+        if self._file is not None:
+            self._file.close()
+        journal, rotated = self._path(JOURNAL_FILE), self._path(ROTATED_FILE)
+        if os.path.exists(rotated):
+            # Left over from a crash mid-snapshot; keep it until this snapshot lands.
+            with open(rotated, "a", encoding="utf-8") as out, open(journal, encoding="utf-8") as src:
+                out.write(src.read())
+                out.flush()
+                os.fsync(out.fileno())
+            os.remove(journal)
+        elif os.path.exists(journal):
+            os.replace(journal, rotated)
+        self._file = open(journal, "a", encoding="utf-8")
+        _fsync_dir(self.directory)
+
+        # Everything in the rotated journal was queued before this mark.
+        with self._cond:
+            start_seq = self.seq
+        lines = [json.dumps({"seq": start_seq})]
+        for code in self._rooms():
+            with self._lock_room(code) as game:
+                if game is None:
+                    continue
+                with self._cond:
+                    mark = self.seq
+                lines.append(json.dumps({"code": code, "seq": mark, "game": encode_game(game)},
+                                        separators=(",", ":")))
+
+        tmp = self._path(SNAPSHOT_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self._path(SNAPSHOT_FILE))
+        if os.path.exists(rotated):
+            os.remove(rotated)
+        _fsync_dir(self.directory)
+        self.stats["snapshots"] += 1
+
+    # -- recovery ---------------------------------------------------------------
+
+    def load(self) -> dict:
+        """Rebuild rooms from the latest snapshot plus the journal tail."""
+        games: dict = {}
+        marks: dict = {}
+        floor = 0
+        path = self._path(SNAPSHOT_FILE)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                header = json.loads(fh.readline() or "{}")
+                floor = header.get("seq", 0)
+                for line in fh:
+                    entry = json.loads(line)
+                    games[entry["code"]] = decode_game(entry["game"])
+                    marks[entry["code"]] = entry["seq"]
+        last = floor
+        for name in (ROTATED_FILE, JOURNAL_FILE):
+            for entry in self._read_journal(self._path(name)):
+                last = max(last, entry["seq"])
+                if entry["seq"] > marks.get(entry["code"], floor):
+                    self._replay(games, entry)
+        self.seq = self.durable_seq = last
+        return games
+
+    @staticmethod
+    def _read_journal(path: str):
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final write from a crash; nothing after it was committed.
+                    log.warning("Ignoring truncated journal line in %s", path)
+                    return
+
+    @staticmethod
+    def _replay(games: dict, entry: dict) -> None:
+        code, op = entry["code"], entry["op"]
+        if op == "put":
+            games[code] = decode_game(entry["game"])
+        elif op == "drop":
+            games.pop(code, None)
+        elif op == "act":
+            game = games.get(code)
+            if game is None or game.version != entry["from"]:
+                log.warning("Skipping journal entry %s for %s: room is not at version %s",
+                            entry["seq"], code, entry["from"])
+                return
+            for action in entry["actions"]:
+                engine.apply(game, action)
+            if game.version != entry["to"]:
+                log.warning("Replay of %s for %s ended at version %s, expected %s",
+                            entry["seq"], code, game.version, entry["to"])
@@ -1,49 +1,125 @@
-ITER = 0
+"""Exact odds for policy draws.
 
-PROB_MAP = {
-        "FFF":{"FFF":0, "FFL":0, "FLF":0, "LFF": 0, "FLL":0, "LFL":0, "LLF":0, "LLL":0},
-        "FFL":{"FFF":0, "FFL":0, "FLF":0, "LFF": 0, "FLL":0, "LFL":0, "LLF":0, "LLL":0},
-        "FLF":{"FFF":0, "FFL":0, "FLF":0, "LFF": 0, "FLL":0, "LFL":0, "LLF":0, "LLL":0},
-        "LFF":{"FFF":0, "FFL":0, "FLF":0, "LFF": 0, "FLL":0, "LFL":0, "LLF":0, "LLL":0},
-        "FLL":{"FFF":0, "FFL":0, "FLF":0, "LFF": 0, "FLL":0, "LFL":0, "LLF":0, "LLL":0},
-        "LFL":{"FFF":0, "FFL":0, "FLF":0, "LFF": 0, "FLL":0, "LFL":0, "LLF":0, "LLL":0},
-        "LLF":{"FFF":0, "FFL":0, "FLF":0, "LFF": 0, "FLL":0, "LFL":0, "LLF":0, "LLL":0},
-        "LLL":{"FFF":0, "FFL":0, "FLF":0, "LFF": 0, "FLL":0, "LFL":0, "LLF":0, "LLL":0}
+Decks are ``(liberal, fascist)`` counts and draws are ordered strings over
+"L"/"F" ("FFL" = fascist, fascist, liberal from the top). Every function is
+memoized on the deck state, so after the first call a query is a dict lookup.
+Results are ``Fraction``s; call ``float()`` where a float is wanted.
+
+The reshuffle follows ``engine.ensure_policy_deck``: when fewer than three
+cards are left and the discard pile is not empty, the discard is shuffled into
+what remains of the deck before drawing.
+"""
+from fractions import Fraction
+from functools import lru_cache
+from itertools import product
+from math import comb
+
+DRAW_SIZE = 3
+STANDARD_DECK = (6, 11)
+PERMUTATIONS = ["".join(p) for p in product("FL", repeat=DRAW_SIZE)]
+
+
+@lru_cache(maxsize=None)
+def draw_probability(liberal: int, fascist: int, draw: str) -> Fraction:
+    """Chance that the top of a (liberal, fascist) deck reads ``draw`` in order."""
+    probability = Fraction(1)
+    for card in draw:
+        total = liberal + fascist
+        if total <= 0:
+            return Fraction(0)
+        if card == "F":
+            probability *= Fraction(fascist, total)
+            fascist -= 1
+        else:
+            probability *= Fraction(liberal, total)
+            liberal -= 1
+        if probability == 0:
+            return probability
+    return probability
+
+
+@lru_cache(maxsize=None)
+def draw_distribution(liberal: int, fascist: int) -> dict:
+    """Every ordered three-card draw from the deck, with its probability."""
+    return {draw: draw_probability(liberal, fascist, draw) for draw in PERMUTATIONS}
+
+
+@lru_cache(maxsize=None)
+def liberal_count_distribution(liberal: int, fascist: int, size: int = DRAW_SIZE) -> dict:
+    """Number of liberals among the top ``size`` cards, order ignored (hypergeometric)."""
+    total = liberal + fascist
+    size = min(size, total)
+    if size <= 0:
+        return {0: Fraction(1)}
+    outcomes = comb(total, size)
+    return {
+        k: Fraction(comb(liberal, k) * comb(fascist, size - k), outcomes)
+        for k in range(size + 1)
+        if k <= liberal and size - k <= fascist
     }
-INIT_PROBABILITES = {"FFF":0, "FFL":0, "FLF":0, "LFF": 0, "FLL":0, "LFL":0, "LLF":0, "LLL":0}
-PERMUTATIONS = ["FFF", "FFL", "FLF", "LFF", "FLL", "LFL", "LLF", "LLL"]
-curr_sum = 1000000
-
-class Node:
-    def __init__(self, liberal_cards, fascist_cards, draw):
-        self.liberal_cards = liberal_cards
-        self.fascist_cards = fascist_cards
-        self.draw = draw
-        self.probability = 1
-        self.calculate_probability()
-        self.children = {
-            "FFF":0,
-            "FFL":0,
-            "FLF":0,
-            "LFF":0,
-            "FLL":0,
-            "LFL":0,
-            "LLF":0,
-            "LLL":0
-            }
-        if self.probability != 0:
-            for i in self.children:
-                self.children[i] = Node(self.liberal_cards, self.fascist_cards, i)
-    
-    def calculate_probability(self):
-        total = self.liberal_cards + self.fascist_cards
-        for c in self.draw:
-            if c == "F":
-                self.probability *= self.fascist_cards/total
-                self.fascist_cards -= 1
-            else:
-                self.probability *= self.liberal_cards/total
-                self.liberal_cards -= 1
-            total -= 1
-
-probability_tree = Node(6, 11, "FFF")
\ No newline at end of file
+
+
+def reshuffle(deck: tuple, discard: tuple, count: int = DRAW_SIZE) -> tuple:
+    """(deck, discard) after the engine's pre-draw reshuffle rule."""
+    if sum(deck) < count and sum(discard) > 0:
+        return (deck[0] + discard[0], deck[1] + discard[1]), (0, 0)
+    return deck, discard
+
+
+def next_draw_distribution(deck: tuple, discard: tuple = (0, 0)) -> dict:
+    deck, _ = reshuffle(deck, discard)
+    return draw_distribution(*deck)
+
+
+def sequence_probability(draws, deck: tuple = STANDARD_DECK, discard: tuple = (0, 0), enacted=None) -> Fraction:
+    """Chance of seeing ``draws`` (a sequence of ordered draws) one government after another.
+
+    ``enacted`` names the card ("L"/"F") enacted from each draw; the other two
+    go to the discard pile. It only matters once the sequence reaches a
+    reshuffle, and a ValueError is raised if it is needed but missing.
+    """
+    return _sequence(tuple(draws), deck, discard, tuple(enacted) if enacted is not None else None)
+
+
+@lru_cache(maxsize=None)
+def _sequence(draws: tuple, deck: tuple, discard: tuple, enacted) -> Fraction:
+    if not draws:
+        return Fraction(1)
+    deck, discard = reshuffle(deck, discard)
+    draw = draws[0]
+    probability = draw_probability(deck[0], deck[1], draw)
+    if probability == 0 or len(draws) == 1:
+        return probability
+    liberal = deck[0] - draw.count("L")
+    fascist = deck[1] - draw.count("F")
+    if enacted is None:
+        if liberal + fascist < DRAW_SIZE:
+            raise ValueError("enacted policies are needed once the sequence reaches a reshuffle")
+        return probability * _sequence(draws[1:], (liberal, fascist), discard, None)
+    card = enacted[0]
+    if card not in draw:
+        return Fraction(0)
+    thrown_liberal = draw.count("L") - (card == "L")
+    thrown_fascist = draw.count("F") - (card == "F")
+    discard = (discard[0] + thrown_liberal, discard[1] + thrown_fascist)
+    return probability * _sequence(draws[1:], (liberal, fascist), discard, enacted[1:])
+
+
+def transition_map(deck: tuple = STANDARD_DECK) -> dict:
+    """P(second draw | first draw) from a fresh deck: ``{first: {second: p}}``."""
+    result = {}
+    for first in PERMUTATIONS:
+        p_first = draw_probability(deck[0], deck[1], first)
+        remaining = (deck[0] - first.count("L"), deck[1] - first.count("F"))
+        result[first] = {
+            second: (draw_probability(remaining[0], remaining[1], second) if p_first else Fraction(0))
+            for second in PERMUTATIONS
+        }
+    return result
+
+
+INIT_PROBABILITES = {draw: float(p) for draw, p in draw_distribution(*STANDARD_DECK).items()}
+PROB_MAP = {
+    first: {second: float(p) for second, p in row.items()}
+    for first, row in transition_map().items()
+}
@@ -0,0 +1,321 @@
+"""Information-set Monte Carlo tree search (single-observer ISMCTS) for AI seats.
+
+Each iteration deals a world the searching player cannot tell apart from the
+real one, then walks a tree of its own moves shared by every world:
+
+- roles are drawn from the player's posterior over deals (inference.py), or
+  uniformly from the deals its own knowledge allows when NumPy is missing;
+- the cards it has not seen are shuffled among the deck, the discard pile and
+  any hand it was not shown, keeping what it has seen (its hand, Policy Peek,
+  its own discards) where it saw them.
+
+At its own decisions descent picks children by UCB1 over the moves legal in
+that world, counting how often each child was available rather than how often
+its parent was visited. Everyone else's moves come from the playout policy, which
+stands in as the model of the other seats. One node is added per iteration,
+the rest of the game is played out, and the path is rewarded by whether the
+player's party won in that world. The most visited root move is returned.
+
+Worlds are ``clone``s that carry the rules state only: no log, caches, journal
+or role evidence. Moves are keyed by what they do, not where: discards and
+enactments by the policy rather than its index in the hand.
+"""
+import bisect
+import copy
+import math
+import random
+import time
+
+import belief
+import engine
+import inference
+from model import Game, Player, PolicyPile
+
+# Seconds of search per decision; main sets it from SEARCH_BUDGET.
+BUDGET = 0.2
+EXPLORATION = 0.7
+# Moves after which a playout that has not finished scores as a draw.
+PLAYOUT_LIMIT = 400
+ROLE_NAMES = {code: role for role, code in inference.ROLE_CODES.items()}
+# Room code of every clone. It is never a real room's code, so tracing (keyed by code) skips worlds.
+WORLD_CODE = "search"
+
+
+class _NullLog:
+    """Stands in for GameLog in worlds: announcements are dropped."""
+
+    __slots__ = ()
+    tail = 0
+
+    def append(self, entry) -> None:
+        pass
+
+
+NULL_LOG = _NullLog()
+_COPIED = frozenset(("players", "policy_deck", "policy_discard", "roles", "order", "votes",
+                     "pending_policies", "suspicion", "stats", "investigated", "known_discards",
+                     "known_top"))
+_SHARED = tuple(name for name in Game.__slots__ if name not in _COPIED)
+
+
+def _pile(cards) -> PolicyPile:
+    pile = PolicyPile()
+    # The raw bytes, without decoding to policy names and back.
+    bytearray.extend(pile, cards)
+    return pile
+
+
+def clone(game: Game) -> Game:
+    """A copy of ``game`` that can be played on without touching the original.
+
+    Only what the rules mutate is copied. The code becomes WORLD_CODE, the log is
+    dropped and the index, role evidence, journal and view caches are left empty.
+    """
+    twin = Game.__new__(Game)
+    for name in _SHARED:
+        setattr(twin, name, getattr(game, name))
+    twin.code = WORLD_CODE
+    twin.players = {
+        pid: Player(p.name, p.is_host, p.is_ai, p.alive, p.seat, p.strategy) for pid, p in game.players.items()
+    }
+    twin.policy_deck = _pile(game.policy_deck)
+    twin.policy_discard = _pile(game.policy_discard)
+    twin.roles = dict(game.roles)
+    twin.order = list(game.order)
+    twin.votes = dict(game.votes)
+    twin.pending_policies = list(game.pending_policies)
+    twin.suspicion = dict(game.suspicion)
+    twin.stats = dict(game.stats) if game.stats is not None else None
+    twin.investigated = set(game.investigated)
+    twin.known_discards = {pid: list(counts) for pid, counts in game.known_discards.items()}
+    twin.known_top = dict(game.known_top)
+    twin.private_info = {}
+    twin.role_evidence = None
+    twin.index = None
+    twin.log = NULL_LOG
+    twin.applied = None
+    twin.state_fields = None
+    twin.view_cache = None
+    return twin
+
+
+def snapshot(game: Game) -> Game:
+    """``clone`` keeping a copy of the role evidence: a room's position to search outside its lock."""
+    twin = clone(game)
+    twin.role_evidence = copy.deepcopy(game.role_evidence)
+    return twin
+
+
+class WorldSampler:
+    """Deals worlds consistent with what ``pid`` knows about ``game``; see the module docstring."""
+
+    def __init__(self, game: Game, pid: str, rng=random):
+        self.game = game
+        self.pid = pid
+        self.rng = rng
+        self.seats = [(other, inference.deal_seat(game, other)) for other in game.players]
+        roles = game.roles
+        known_fascists = engine.known_fascists_for(game, pid)
+        self.fixed = {pid: roles[pid], **{fid: roles[fid] for fid in known_fascists}}
+        self.evidence = game.role_evidence
+        self.deals = self.cumulative = None
+        if roles[pid] != "fascist" and self.evidence is not None:
+            weights = self.evidence.posterior(inference.knowledge_mask(self.evidence, game, pid, known_fascists))
+            self.deals = self.evidence.roles
+            self.cumulative = weights.cumsum().tolist()
+
+    def roles(self) -> dict:
+        game = self.game
+        if len(self.fixed) == len(game.roles):
+            return dict(game.roles)
+        if self.deals is not None:
+            index = bisect.bisect_right(self.cumulative, self.rng.random() * self.cumulative[-1])
+            row = self.deals[min(index, len(self.deals) - 1)].tolist()
+            # Players who joined after the deal keep the liberal role they joined with.
+            return {other: ROLE_NAMES[row[seat]] if seat is not None else game.roles[other]
+                    for other, seat in self.seats}
+        # No evidence: any deal that keeps what it knows and leaves the executed alive as non-Hitler.
+        unknown = [other for other in game.roles if other not in self.fixed]
+        pool = [game.roles[other] for other in unknown]
+        dead = {other for other in unknown if not game.players[other].alive}
+        for _ in range(100):
+            self.rng.shuffle(pool)
+            if not any(role == "hitler" and other in dead for other, role in zip(unknown, pool)):
+                break
+        return {**dict(zip(unknown, pool)), **self.fixed}
+
+    def deal_cards(self, world: Game) -> None:
+        game, pid = self.game, self.pid
+        top = game.known_top.get(pid) or []
+        hand = belief.known_hand(game, pid)
+        seen = game.known_discards.get(pid, (0, 0))
+        # Everything it has not seen, in the real game's order; only the make-up of this is public.
+        hidden = game.policy_deck[len(top):] + list(game.policy_discard)
+        if not hand:
+            hidden += game.pending_policies
+        seen_discards = ["liberal"] * seen[0] + ["fascist"] * seen[1]
+        for policy in seen_discards:
+            hidden.remove(policy)
+        self.rng.shuffle(hidden)
+        deck_unseen = len(game.policy_deck) - len(top)
+        world.policy_deck = PolicyPile(list(top) + hidden[:deck_unseen])
+        rest = hidden[deck_unseen:]
+        pending = len(game.pending_policies)
+        if not hand and pending:
+            world.pending_policies, rest = rest[:pending], rest[pending:]
+        world.policy_discard = PolicyPile(seen_discards + rest)
+
+    def sample(self) -> Game:
+        world = clone(self.game)
+        world.roles = self.roles()
+        self.deal_cards(world)
+        # Mid-game reshuffles are seeded from the game; vary them between worlds.
+        world.seed = self.rng.getrandbits(63)
+        return world
+
+
+def action_key(game: Game, action: dict) -> tuple:
+    """What ``action`` does, comparable across worlds (see the module docstring)."""
+    kind = action["type"]
+    if kind == "president_discard":
+        return action["player_id"], kind, game.pending_policies[action["discard_index"]]
+    if kind == "chancellor_enact" and not action.get("veto"):
+        return action["player_id"], kind, game.pending_policies[action["enact_index"]]
+    return (action["player_id"], kind, action.get("chancellor_id") or action.get("target_id"),
+            action.get("vote"), action.get("veto"), action.get("approve"))
+
+
+def moves(game: Game, pid: str) -> dict:
+    """Legal actions of ``pid`` by action_key, one per key."""
+    found: dict = {}
+    for action in engine.legal_actions(game, pid):
+        found.setdefault(action_key(game, action), action)
+    return found
+
+
+def next_actor(game: Game, pid: str | None = None) -> str | None:
+    """Whoever moves next; ``pid`` if it is one of several ballots still open."""
+    waiting = engine.waiting_on(game)
+    if pid is not None and pid in waiting:
+        return pid
+    return waiting[0] if waiting else None
+
+
+def step(world: Game, actor: str, policy=None, skip: str | None = None) -> None:
+    """Play ``actor``'s move with ``policy(game, pid)``, or a uniformly random one when it has none.
+
+    A vote round is cast in one go (every open ballot except ``skip``'s) without
+    apply's per-ballot checks.
+    """
+    if world.phase == "vote":
+        votes = world.votes
+        for pid in engine.waiting_on(world):
+            if pid == skip:
+                continue
+            action = policy(world, pid) if policy is not None else None
+            votes[pid] = action["vote"] if action else random.random() < 0.5
+        if len(votes) == len(engine.alive_ids(world)):
+            engine.resolve_vote(world)
+        engine.touch(world)
+        return
+    action = policy(world, actor) if policy is not None else None
+    try:
+        if action is None:
+            raise engine.IllegalAction("no move")
+        engine.apply(world, action)
+    except engine.IllegalAction:
+        engine.apply(world, random.choice(engine.legal_actions(world, actor)))
+
+
+def playout(world: Game, policy=None, limit: int = PLAYOUT_LIMIT) -> str | None:
+    """Play ``world`` to the end with ``policy`` (see ``step``).
+
+    Returns the winning party, or None if it is still going after ``limit`` moves.
+    """
+    for _ in range(limit):
+        actor = next_actor(world)
+        if actor is None:
+            break
+        step(world, actor, policy)
+    return world.winner
+
+
+class Node:
+    __slots__ = ("children", "visits", "available", "reward")
+
+    def __init__(self):
+        self.children: dict = {}
+        self.visits = 0
+        self.available = 0
+        self.reward = 0.0
+
+    def ucb(self, exploration: float) -> float:
+        return self.reward / self.visits + exploration * math.sqrt(math.log(self.available) / self.visits)
+
+
+def search(game: Game, pid: str, budget: float | None = None, rollout=None, max_iterations: int | None = None,
+           exploration: float = EXPLORATION, rng=random) -> tuple:
+    """ISMCTS for ``pid``'s pending decision: (action or None, {"iterations", "seconds", "visits"}).
+
+    Runs for ``budget`` seconds (default BUDGET) or ``max_iterations``, whichever ends first.
+    ``rollout`` is the playout policy (see ``step``), and also plays everyone else's moves inside
+    the tree.
+    """
+    started = time.perf_counter()
+    options = moves(game, pid)
+    stats = {"iterations": 0, "seconds": 0.0, "visits": {}}
+    if len(options) <= 1:
+        return next(iter(options.values()), None), stats
+
+    deadline = started + (BUDGET if budget is None else budget)
+    sampler = WorldSampler(game, pid, rng)
+    party = engine.party_for_role(game.roles[pid])
+    root = Node()
+    iterations = 0
+    while (max_iterations is None or iterations < max_iterations) and time.perf_counter() < deadline:
+        world = sampler.sample()
+        node, path, actor = root, [], pid
+        while actor is not None:
+            if actor != pid:
+                # In a vote round pid's own ballot stays open for the tree.
+                step(world, actor, rollout, skip=pid)
+                actor = next_actor(world, pid)
+                continue
+            legal = moves(world, pid)
+            untried = []
+            for key in legal:
+                child = node.children.get(key)
+                if child is None:
+                    untried.append(key)
+                else:
+                    child.available += 1
+            if untried:
+                key = rng.choice(untried)
+                node.children[key] = node = Node()
+                node.available = 1
+            else:
+                key = max(legal, key=lambda k: node.children[k].ucb(exploration))
+                node = node.children[key]
+            engine.apply(world, legal[key])
+            path.append(node)
+            if untried:
+                break
+            actor = next_actor(world, pid)
+        winner = playout(world, rollout) if world.phase != "game_over" else world.winner
+        reward = 0.5 if winner is None else float(winner == party)
+        for node in path:
+            node.visits += 1
+            node.reward += reward
+        iterations += 1
+
+    stats["iterations"] = iterations
+    stats["seconds"] = time.perf_counter() - started
+    stats["visits"] = {key: child.visits for key, child in root.children.items()}
+    tried = [key for key in options if key in root.children]
+    if not tried:
+        return next(iter(options.values())), stats
+    return options[max(tried, key=lambda k: root.children[k].visits)], stats
+
+
+def best_action(game: Game, pid: str, budget: float | None = None, rollout=None) -> dict | None:
+    return search(game, pid, budget, rollout)[0]
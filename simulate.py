@@ -0,0 +1,117 @@
+"""Headless AI self-play: plays complete games through the engine, no Flask.
+
+    python simulate.py --games 100000 --players 7 --workers 8
+
+Reports win rates by victory reason, the average per-game stats from
+``default_stats()``, and throughput in games/second overall and per core.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+import engine
+from ai import take_turn
+
+CHUNK_SIZE = 500
+
+
+def play_game(player_count: int) -> dict:
+    players: dict = {}
+    engine.add_ai_players(players, player_count)
+    game = engine.new_game("sim", None, players)
+    engine.start_game(game)
+    while game["phase"] != "game_over":
+        if not take_turn(game):
+            raise RuntimeError(f"AI made no progress in phase {game['phase']}")
+    return game
+
+
+def run_chunk(args: tuple) -> dict:
+    seed, games, player_count = args
+    random.seed(seed)
+    reasons: Counter = Counter()
+    winners: Counter = Counter()
+    stats: Counter = Counter()
+    started = time.process_time()
+    for _ in range(games):
+        game = play_game(player_count)
+        reasons[game["victory_reason"]] += 1
+        winners[game["winner"]] += 1
+        stats.update(game["stats"])
+    return {
+        "games": games,
+        "reasons": reasons,
+        "winners": winners,
+        "stats": stats,
+        "cpu": time.process_time() - started,
+    }
+
+
+def simulate(games: int, player_count: int, workers: int, seed: int) -> dict:
+    chunks = []
+    remaining = games
+    while remaining > 0:
+        size = min(CHUNK_SIZE, remaining)
+        chunks.append((seed + len(chunks), size, player_count))
+        remaining -= size
+
+    totals = {"games": 0, "reasons": Counter(), "winners": Counter(), "stats": Counter(), "cpu": 0.0}
+    started = time.perf_counter()
+    if workers <= 1:
+        results = map(run_chunk, chunks)
+        pool = None
+    else:
+        pool = Pool(workers)
+        results = pool.imap_unordered(run_chunk, chunks)
+    try:
+        for result in results:
+            totals["games"] += result["games"]
+            totals["cpu"] += result["cpu"]
+            for key in ("reasons", "winners", "stats"):
+                totals[key].update(result[key])
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    totals["wall"] = time.perf_counter() - started
+    return totals
+
+
+def report(totals: dict, player_count: int, workers: int) -> None:
+    games = totals["games"]
+    print(f"{games} games, {player_count} players, {workers} worker(s)")
+    print("\nwinner")
+    for winner, count in totals["winners"].most_common():
+        print(f"  {winner:<20} {count:>9}  {count / games:6.1%}")
+    print("\nvictory_reason")
+    for reason, count in totals["reasons"].most_common():
+        print(f"  {reason:<20} {count:>9}  {count / games:6.1%}")
+    print("\nper-game stats (mean)")
+    for key in engine.default_stats():
+        print(f"  {key:<20} {totals['stats'][key] / games:9.2f}")
+    print("\nthroughput")
+    print(f"  wall                 {games / totals['wall']:9.0f} games/s")
+    print(f"  per core             {games / totals['wall'] / workers:9.0f} games/s")
+    if totals["cpu"]:
+        print(f"  per core (cpu time)  {games / totals['cpu']:9.0f} games/s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Play AI-only Secret Hitler games headlessly.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=10, choices=sorted(engine.ROLE_COUNTS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    totals = simulate(args.games, args.players, args.workers, args.seed)
+    report(totals, args.players, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
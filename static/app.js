@@ -1,3 +1,17 @@
+/* ============ CONDITIONAL GET ============ */
+// Remember the last ETag per endpoint and send it back; a 304 resolves to null
+// so the caller keeps what it already rendered.
+const etags = new Map();
+const fetchIfChanged = async (url) => {
+    const path = url.split("?")[0];
+    const headers = etags.has(path) ? { "If-None-Match": etags.get(path) } : {};
+    const res = await fetch(url, { cache: "no-store", headers });
+    if (res.status === 304) return null;
+    const tag = res.headers.get("ETag");
+    if (tag && res.ok) etags.set(path, tag);
+    return res;
+};
+
 /* ============ LOBBY ============ */
 (() => {
     const copyBtn = document.getElementById("copyCode");
@@ -62,7 +76,8 @@
         if (roleRevealed || roleLoading) return;
         roleLoading = true;
         try {
-            const res = await fetch(`/api/game/${code}/role`, { cache: "no-store" });
+            const res = await fetchIfChanged(`/api/game/${code}/role`);
+            if (!res) return;
             const data = await res.json();
             if (!res.ok || !data.ok) return;
             openRoleModal(data);
@@ -74,13 +89,7 @@
         }
     };
 
-    async function refresh() {
-        try {
-        const res = await fetch(`/api/game/${code}`, { cache: "no-store" });
-        if (!res.ok) return;
-        const data = await res.json();
-        if (!data.ok) return;
-
+    const renderLobby = (data) => {
         listEl.innerHTML = "";
         started = !!data.started;
         for (const p of data.players) {
@@ -105,13 +114,43 @@
         if (started && !roleRevealed) {
             revealRole();
         }
+    };
+
+    async function refresh() {
+        try {
+        const res = await fetchIfChanged(`/api/game/${code}`);
+        if (!res || !res.ok) return;
+        const data = await res.json();
+        if (!data.ok) return;
+        renderLobby(data);
         } catch {
         // ignore
         }
     }
 
-    refresh();
-    setInterval(refresh, 2000);
+    // Prefer the server-pushed event stream; fall back to polling without it.
+    let pollTimer = null;
+    const startPolling = () => {
+        if (pollTimer) return;
+        refresh();
+        pollTimer = setInterval(refresh, 2000);
+    };
+
+    if (window.EventSource) {
+        const events = new EventSource(`/api/game/${code}/events?view=lobby`);
+        events.onmessage = (e) => {
+            const data = JSON.parse(e.data);
+            if (!data.ok) return;
+            renderLobby(data);
+            if (data.started) events.close();
+        };
+        events.addEventListener("gone", () => events.close());
+        events.onerror = () => {
+            if (events.readyState === EventSource.CLOSED) startPolling();
+        };
+    } else {
+        startPolling();
+    }
 
     if (startBtn) {
         startBtn.addEventListener("click", async () => {
@@ -224,7 +263,8 @@
         if (revealed || loading) return revealed;
         loading = true;
         try {
-            const res = await fetch(`/api/game/${code}/role`, { cache: "no-store" });
+            const res = await fetchIfChanged(`/api/game/${code}/role`);
+            if (!res) return revealed;
             const data = await res.json();
             if (!res.ok || !data.ok) return false;
 
@@ -355,8 +395,11 @@ const SFX = (() => {
     let currentAction = null;
     let actionBusy = false;
     let endShown = false;
-    let lastLogCount = 0;
+    let lastLogId = 0;
+    let oldestLogId = 0;
+    let loadingEarlierLog = false;
     let lastVoteId = null;
+    let syncedState = null;
     let voteResultShown = false;
 
     const PHASE_NAMES = {
@@ -479,20 +522,58 @@ const SFX = (() => {
     };
 
     // ---- Game Log ----
+    const logItem = (entry) => {
+        const li = document.createElement("li");
+        li.className = "gameLogItem";
+        li.textContent = entry.message;
+        return li;
+    };
+
     const renderGameLog = (log) => {
-        if (!gameLogList || !log) return;
-        if (log.length === lastLogCount) return;
-        lastLogCount = log.length;
-        gameLogList.innerHTML = "";
+        if (!gameLogList || !log || !log.length) return;
+        const first = log[0].id;
+        const last = log[log.length - 1].id;
+        if (last === lastLogId) return;
+        if (!lastLogId || last < lastLogId || first > lastLogId + 1) {
+            // First render, a new game, or we fell further behind than the server's tail.
+            gameLogList.innerHTML = "";
+            lastLogId = first - 1;
+            oldestLogId = first;
+        }
         for (const entry of log) {
-            const li = document.createElement("li");
-            li.className = "gameLogItem";
-            li.textContent = entry.message;
-            gameLogList.appendChild(li);
+            if (entry.id > lastLogId) gameLogList.appendChild(logItem(entry));
         }
+        lastLogId = last;
         gameLogList.scrollTop = gameLogList.scrollHeight;
     };
 
+    // Only the recent tail comes with the state; older entries are paged in on scroll.
+    const loadEarlierLog = async () => {
+        if (loadingEarlierLog || oldestLogId <= 1) return;
+        loadingEarlierLog = true;
+        try {
+            const res = await fetch(`/api/game/${code}/log?before=${oldestLogId}&limit=50`, { cache: "no-store" });
+            const data = await res.json();
+            if (!res.ok || !data.ok || !data.entries.length) return;
+            const height = gameLogList.scrollHeight;
+            const items = document.createDocumentFragment();
+            for (const entry of data.entries) items.appendChild(logItem(entry));
+            gameLogList.insertBefore(items, gameLogList.firstChild);
+            oldestLogId = data.entries[0].id;
+            gameLogList.scrollTop += gameLogList.scrollHeight - height;
+        } catch {
+            // ignore
+        } finally {
+            loadingEarlierLog = false;
+        }
+    };
+
+    if (gameLogList) {
+        gameLogList.addEventListener("scroll", () => {
+            if (gameLogList.scrollTop === 0) loadEarlierLog();
+        });
+    }
+
     // ---- Phase Banner ----
     const renderPhaseBanner = (data, byId) => {
         if (!phaseBanner || !phaseBannerText) return;
@@ -1161,9 +1242,27 @@ const SFX = (() => {
         }
     };
 
+    // Merge a ?since= delta into the last full state we rendered.
+    const mergeState = (data) => {
+        if (!data.delta || !syncedState) return data;
+        const { log, ...changed } = data;
+        const merged = { ...syncedState, ...changed };
+        // Rendered entries stay in the list; only the recent ones are needed for the next delta.
+        merged.log = syncedState.log.concat(log || []).slice(-200);
+        return merged;
+    };
+
+    const stateUrl = () => {
+        if (!syncedState) return `/api/game/${code}/state`;
+        const log = syncedState.log || [];
+        const logSince = log.length ? log[log.length - 1].id : 0;
+        return `/api/game/${code}/state?since=${syncedState.version}&log_since=${logSince}`;
+    };
+
     const refresh = async () => {
         try {
-            const res = await fetch(`/api/game/${code}/state`, { cache: "no-store" });
+            const res = await fetchIfChanged(stateUrl());
+            if (!res) return;
             if (!res.ok) {
                 if (res.status === 404) {
                     dissolveRoom();
@@ -1172,12 +1271,37 @@ const SFX = (() => {
             }
             const data = await res.json();
             if (!data.ok) return;
-            renderState(data);
+            syncedState = mergeState(data);
+            renderState(syncedState);
         } catch {
             // ignore
         }
     };
 
-    refresh();
-    setInterval(refresh, 1500);
+    let pollTimer = null;
+    const startPolling = () => {
+        if (pollTimer) return;
+        refresh();
+        pollTimer = setInterval(refresh, 1500);
+    };
+
+    if (window.EventSource) {
+        // The first event is a full state, later ones are deltas against it.
+        const events = new EventSource(`/api/game/${code}/events`);
+        events.onmessage = (e) => {
+            const data = JSON.parse(e.data);
+            if (!data.ok) return;
+            syncedState = mergeState(data);
+            renderState(syncedState);
+        };
+        events.addEventListener("gone", () => {
+            events.close();
+            refresh();
+        });
+        events.onerror = () => {
+            if (events.readyState === EventSource.CLOSED) startPolling();
+        };
+    } else {
+        startPolling();
+    }
 })();
@@ -0,0 +1,149 @@
+"""Where rooms live: in this process's memory, or in a store shared by worker processes.
+
+main.py keeps every room it is working on in ``GAMES`` either way. With the
+default ``MemoryStore`` that dict is the only copy and nothing else happens.
+A shared store (``shared = True``) holds the authoritative copy of every room
+with its version: ``locked_game`` reloads a room when the stored version has
+moved on, and saves it with a compare-and-set on the version it started from.
+Losing that race raises ``StaleGame``; the caller's copy is discarded and the
+request is retried against the fresh one.
+
+``open_store`` picks the backend from the GAME_STORE setting:
+
+    memory (default)              this process only
+    sqlite:///path/to/rooms.db    a SQLite file shared by every worker on the host
+
+Another backend (LMDB, a Redis-protocol server) only needs the same methods.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import fastjson
+from model import Game
+from persistence import decode_game, encode_game
+
+
+class StaleGame(Exception):
+    """Another worker saved the room first; reload it and try again."""
+
+    def __init__(self, code: str):
+        super().__init__(f"room {code} changed in another worker")
+        self.code = code
+
+
+class MemoryStore:
+    """Rooms live only in this process (``main.GAMES``); every operation is a no-op."""
+
+    shared = False
+
+    def create(self, code: str, game: Game) -> bool:
+        return True
+
+    def load(self, code: str, have: Game | None) -> Game | None:
+        return have
+
+    def save(self, code: str, game: Game, expected: int) -> bool:
+        return True
+
+    def delete(self, code: str) -> None:
+        pass
+
+    def version(self, code: str) -> int | None:
+        return None
+
+    def purge(self, idle_seconds: float) -> list:
+        return []
+
+
+class SQLiteStore:
+    """Rooms as JSON rows in a SQLite file (WAL mode), one connection per thread."""
+
+    shared = True
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        # A forked worker must not share the parent's connections.
+        os.register_at_fork(after_in_child=self._forget_connections)
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS rooms (
+                    code TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    updated REAL NOT NULL,
+                    data TEXT NOT NULL
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            # WAL keeps readers consistent; losing the last commits on power loss is acceptable here.
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _forget_connections(self) -> None:
+        self._local = threading.local()
+
+    @staticmethod
+    def _encode(game: Game) -> str:
+        return fastjson.dumps(encode_game(game))
+
+    def create(self, code: str, game: Game) -> bool:
+        try:
+            self._connect().execute(
+                "INSERT INTO rooms (code, version, updated, data) VALUES (?, ?, ?, ?)",
+                (code, game.version, time.time(), self._encode(game)),
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def load(self, code: str, have: Game | None) -> Game | None:
+        # Only ship the body when our copy is out of date.
+        row = self._connect().execute(
+            "SELECT version, CASE WHEN version = ? THEN NULL ELSE data END FROM rooms WHERE code = ?",
+            (have.version if have is not None else None, code),
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] is None:
+            return have
+        return decode_game(fastjson.loads(row[1]))
+
+    def save(self, code: str, game: Game, expected: int) -> bool:
+        cursor = self._connect().execute(
+            "UPDATE rooms SET version = ?, updated = ?, data = ? WHERE code = ? AND version = ?",
+            (game.version, time.time(), self._encode(game), code, expected),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, code: str) -> None:
+        self._connect().execute("DELETE FROM rooms WHERE code = ?", (code,))
+
+    def version(self, code: str) -> int | None:
+        row = self._connect().execute("SELECT version FROM rooms WHERE code = ?", (code,)).fetchone()
+        return row[0] if row else None
+
+    def purge(self, idle_seconds: float) -> list:
+        """Delete rooms nobody has saved for ``idle_seconds``; returns their codes."""
+        cutoff = time.time() - idle_seconds
+        db = self._connect()
+        codes = [code for (code,) in db.execute("SELECT code FROM rooms WHERE updated < ?", (cutoff,))]
+        if codes:
+            db.execute("DELETE FROM rooms WHERE updated < ?", (cutoff,))
+        return codes
+
+
+def open_store(spec: str | None):
+    if not spec or spec == "memory":
+        return MemoryStore()
+    if spec.startswith("sqlite:///"):
+        return SQLiteStore(spec[len("sqlite:///"):])
+    raise ValueError(f"unknown GAME_STORE {spec!r} (expected memory or sqlite:///path)")
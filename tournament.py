@@ -0,0 +1,230 @@
+"""AI-vs-AI tournament tables run by the server, with Elo ratings per strategy and role.
+
+Tables are ordinary rooms, so /spectate works on them. Every seat is an AI
+playing a strategy drawn from ``ai.STRATEGIES``, leaving out the CPU-bound
+``SEARCH_STRATEGIES`` unless they are named. A fixed pool of worker
+threads (the concurrency cap) plays one table each at a time, stepping it
+with take_turn; the AI scheduler leaves these rooms alone. Human rooms come
+first:
+
+- workers run at a lower OS scheduling priority where the platform allows it;
+- each step waits ``step_delay`` seconds, and while ``busy()`` reports human
+  requests in flight it keeps waiting, up to ``max_yield`` seconds a step.
+
+Each finished table updates a rating for every (strategy, role) that sat at it,
+and for each strategy overall, against the average rating of the other team.
+"""
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+
+from ai import SEARCH_STRATEGIES, STRATEGIES, take_turn
+from engine import add_ai_players, party_for_role
+
+ANY_ROLE = "any"
+
+
+class Ratings:
+    """Team Elo. Each team's change, k * (result - expected) against the other team's average
+    rating, is shared equally between its seats, so both teams move by the same amount; a key
+    with several seats at the table (or on both sides) collects each of their shares.
+    """
+
+    def __init__(self, k: float = 32.0, initial: float = 1500.0):
+        self.k = k
+        self.initial = initial
+        # (strategy, role or ANY_ROLE) -> rating
+        self.rating: dict = {}
+        # Seats played and won, by the same keys.
+        self.seats: Counter = Counter()
+        self.wins: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, seats: list, winner: str) -> None:
+        """``seats`` is [(strategy, role)] for everyone at the table; ``winner`` the winning party."""
+        with self._lock:
+            self._update([((strategy, role), role) for strategy, role in seats], winner)
+            self._update([((strategy, ANY_ROLE), role) for strategy, role in seats], winner)
+
+    def _update(self, seats: list, winner: str) -> None:
+        teams: dict = {"liberal": [], "fascist": []}
+        for key, role in seats:
+            teams[party_for_role(role)].append(key)
+        average = {
+            party: sum(self.rating.get(key, self.initial) for key in keys) / len(keys)
+            for party, keys in teams.items()
+        }
+        deltas: Counter = Counter()
+        for party, keys in teams.items():
+            other = average["fascist" if party == "liberal" else "liberal"]
+            expected = 1.0 / (1.0 + 10 ** ((other - average[party]) / 400.0))
+            won = party == winner
+            share = self.k * (won - expected) / len(keys)
+            for key in keys:
+                deltas[key] += share
+                self.seats[key] += 1
+                self.wins[key] += won
+        for key, delta in deltas.items():
+            self.rating[key] = self.rating.get(key, self.initial) + delta
+
+    def table(self) -> list:
+        with self._lock:
+            rows = [
+                {
+                    "strategy": strategy,
+                    "role": role,
+                    "rating": round(rating, 1),
+                    "seats": self.seats[(strategy, role)],
+                    "win_rate": round(self.wins[(strategy, role)] / self.seats[(strategy, role)], 3),
+                }
+                for (strategy, role), rating in self.rating.items()
+            ]
+        return sorted(rows, key=lambda row: (row["role"] != ANY_ROLE, row["role"], -row["rating"]))
+
+
+class Tournament:
+    """Plays tables on ``tables`` worker threads; see the module docstring."""
+
+    def __init__(self, tables: int, players: int = 7, strategies=None, step_delay: float = 0.25,
+                 max_yield: float = 1.0, history: int = 50):
+        self.tables = tables
+        self.players = players
+        self.strategies = list(strategies or (name for name in STRATEGIES if name not in SEARCH_STRATEGIES))
+        unknown = [name for name in self.strategies if name not in STRATEGIES]
+        if unknown:
+            raise ValueError(f"unknown strategies {unknown}; expected some of {sorted(STRATEGIES)}")
+        self.step_delay = step_delay
+        self.max_yield = max_yield
+        self.ratings = Ratings()
+        self.results: deque = deque(maxlen=history)
+        # Codes of the tables being played right now.
+        self.active: set = set()
+        self.counts: Counter = Counter()
+        self.yielded = 0.0
+        self.started = None
+        self._hooks = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list = []
+
+    def __bool__(self) -> bool:
+        return self.tables > 0
+
+    def start(self, open_table, locked_game, close_table, busy) -> None:
+        """Start the workers once. ``open_table(players)`` registers a started room and returns its
+        code (None if there is no room for one), ``locked_game`` is main's, ``close_table(code)``
+        disposes of a finished room and ``busy()`` says whether human requests are in flight.
+        """
+        with self._lock:
+            if self._threads or not self.tables:
+                return
+            self.started = time.time()
+            self._hooks = (open_table, locked_game, close_table, busy)
+            self._threads = [
+                threading.Thread(target=self._work, name=f"tournament-{i}", daemon=True)
+                for i in range(self.tables)
+            ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _work(self) -> None:
+        try:
+            # Linux schedules threads individually, so this lowers just this worker.
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+        while not self._stop.is_set():
+            if not self.play_table():
+                # No room for a table (MAX_GAMES) or it was evicted; try again later.
+                self._stop.wait(5.0)
+
+    def _pause(self, busy) -> None:
+        self._stop.wait(self.step_delay)
+        started = time.monotonic()
+        deadline = started + self.max_yield
+        while busy() and time.monotonic() < deadline and not self._stop.is_set():
+            time.sleep(0.005)
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            with self._lock:
+                self.yielded += waited
+
+    def seat_players(self) -> dict:
+        players: dict = {}
+        for _ in range(self.players):
+            add_ai_players(players, 1, random.choice(self.strategies))
+        return players
+
+    def play_table(self) -> bool:
+        open_table, locked_game, close_table, busy = self._hooks
+        code = open_table(self.seat_players())
+        if code is None:
+            return False
+        with self._lock:
+            self.active.add(code)
+        started = time.monotonic()
+        steps = 0
+        result = None
+        try:
+            while not self._stop.is_set():
+                self._pause(busy)
+                with locked_game(code) as game:
+                    if game is None:
+                        break
+                    if game.phase == "game_over":
+                        result = self._record(code, game, time.monotonic() - started, steps)
+                        break
+                    if not take_turn(game):
+                        break
+                steps += 1
+        finally:
+            with self._lock:
+                self.active.discard(code)
+                self.counts["finished" if result else "abandoned"] += 1
+            close_table(code)
+        return result is not None
+
+    def _record(self, code: str, game, seconds: float, steps: int) -> dict:
+        seats = [(game.players[pid].strategy, game.roles[pid]) for pid in game.players]
+        winner = game.winner
+        self.ratings.record(seats, winner)
+        result = {
+            "code": code,
+            "finished": time.time(),
+            "winner": winner,
+            "reason": game.get("victory_reason"),
+            "seconds": round(seconds, 3),
+            "steps": steps,
+            "seats": [{"strategy": strategy, "role": role} for strategy, role in seats],
+        }
+        with self._lock:
+            self.results.append(result)
+            self.counts[f"{winner}_wins"] += 1
+        return result
+
+    def summary(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+            running = sorted(self.active)
+            recent = list(self.results)[::-1]
+            yielded = self.yielded
+        elapsed = time.time() - self.started if self.started else 0.0
+        return {
+            "tables": self.tables,
+            "players": self.players,
+            "strategies": self.strategies,
+            "step_delay": self.step_delay,
+            "running": running,
+            "finished": counts.get("finished", 0),
+            "abandoned": counts.get("abandoned", 0),
+            "wins": {party: counts.get(f"{party}_wins", 0) for party in ("liberal", "fascist")},
+            "games_per_minute": round(counts.get("finished", 0) / elapsed * 60, 2) if elapsed else 0.0,
+            "yielded_seconds": round(yielded, 3),
+            "ratings": self.ratings.table(),
+            "recent": recent,
+        }
@@ -0,0 +1,192 @@
+"""Per-room diagnostics switched on at runtime: a sampling profiler and a timeline.
+
+``enable(code)`` starts recording for one room; nothing is recorded (and the
+engine is left unwrapped) while no room is traced. The timeline is a bounded
+list of wall-clock events: every state transition, request handler, AI
+scheduler step and the engine's ``apply``, ``resolve_vote`` and
+``apply_policy``, each with its duration. With profiling on, a sampler thread
+reads the stacks of whichever threads are working on the room every
+``interval`` seconds and counts them as folded stacks (flamegraph format).
+"""
+import functools
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+import engine
+
+# Engine entry points timed while any room is traced; the first argument is the game.
+ENGINE_HOOKS = ("apply", "resolve_vote", "apply_policy")
+TIMELINE_LIMIT = 5000
+
+# code -> RoomTrace; empty unless someone is tracing, which is what every hook checks first.
+TRACES: dict = {}
+_lock = threading.Lock()
+_originals: dict = {}
+_sampler = None
+
+
+class RoomTrace:
+    __slots__ = ("code", "started", "profile", "interval", "timeline", "samples", "threads")
+
+    def __init__(self, code: str, profile: bool, interval: float):
+        self.code = code
+        self.started = time.time()
+        self.profile = profile
+        self.interval = interval
+        self.timeline: deque = deque(maxlen=TIMELINE_LIMIT)
+        # folded stack -> sample count
+        self.samples: Counter = Counter()
+        # ident -> nesting depth of threads currently working on this room
+        self.threads: dict = {}
+
+    def event(self, kind: str, name: str, seconds: float | None = None, **extra) -> None:
+        entry = {"t": time.time(), "kind": kind, "name": name}
+        if seconds is not None:
+            entry["ms"] = round(seconds * 1e3, 3)
+        entry.update(extra)
+        self.timeline.append(entry)
+
+    def enter(self) -> None:
+        ident = threading.get_ident()
+        self.threads[ident] = self.threads.get(ident, 0) + 1
+
+    def leave(self) -> None:
+        ident = threading.get_ident()
+        depth = self.threads.get(ident, 1) - 1
+        if depth:
+            self.threads[ident] = depth
+        else:
+            self.threads.pop(ident, None)
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "code": self.code,
+            "started": self.started,
+            "profile": self.profile,
+            "interval": self.interval,
+            "events": len(self.timeline),
+            "samples": sum(self.samples.values()),
+        }
+
+
+def enable(code: str, profile: bool = True, interval: float = 0.005) -> RoomTrace:
+    global _sampler
+    with _lock:
+        trace = TRACES.get(code)
+        if trace is None:
+            if not TRACES:
+                _hook_engine()
+            trace = TRACES[code] = RoomTrace(code, profile, interval)
+        else:
+            trace.profile, trace.interval = profile, interval
+        if profile and _sampler is None:
+            _sampler = threading.Thread(target=_sample, name="trace-sampler", daemon=True)
+            _sampler.start()
+    return trace
+
+
+def disable(code: str) -> RoomTrace | None:
+    with _lock:
+        trace = TRACES.pop(code, None)
+        if not TRACES:
+            _unhook_engine()
+    return trace
+
+
+def span(code: str, kind: str, name: str, **extra):
+    """Context manager timing a block into the room's timeline; a no-op when it is not traced."""
+    trace = TRACES.get(code)
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, kind, name, extra)
+
+
+class _Span:
+    __slots__ = ("trace", "kind", "name", "extra", "started")
+
+    def __init__(self, trace: RoomTrace, kind: str, name: str, extra: dict):
+        self.trace, self.kind, self.name, self.extra = trace, kind, name, extra
+
+    def __enter__(self):
+        self.trace.enter()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.leave()
+        self.trace.event(self.kind, self.name, time.perf_counter() - self.started, **self.extra)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _engine_wrapper(name: str, fn):
+    @functools.wraps(fn)
+    def traced(game, *args, **kwargs):
+        trace = TRACES.get(game.code)
+        if trace is None:
+            return fn(game, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return fn(game, *args, **kwargs)
+        finally:
+            extra = {"action": args[0].get("type")} if name == "apply" and args else {}
+            trace.event("engine", name, time.perf_counter() - started, version=game.version, **extra)
+    return traced
+
+
+def _hook_engine() -> None:
+    for name in ENGINE_HOOKS:
+        fn = getattr(engine, name)
+        _originals[name] = fn
+        setattr(engine, name, _engine_wrapper(name, fn))
+
+
+def _unhook_engine() -> None:
+    for name, fn in _originals.items():
+        setattr(engine, name, fn)
+    _originals.clear()
+
+
+def _fold(frame) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def _sample() -> None:
+    global _sampler
+    while True:
+        with _lock:
+            profiled = [trace for trace in TRACES.values() if trace.profile]
+            if not profiled:
+                # Under the lock, so enable() starts a new sampler rather than relying on this one.
+                _sampler = None
+                return
+        frames = sys._current_frames()
+        for trace in profiled:
+            for ident in list(trace.threads):
+                frame = frames.get(ident)
+                if frame is not None:
+                    trace.samples[_fold(frame)] += 1
+        del frames
+        time.sleep(min(trace.interval for trace in profiled))